@@ -0,0 +1,282 @@
+"""Throughput benchmarks of the fixation pipeline on synthetic recordings.
+
+The classes follow the asv conventions (``params``, ``setup`` and ``time_*``
+methods) and are run by ``benchmarks/run.py``. Each parameter is the number of
+rows of one synthetic export (see :mod:`gazeplot.synthetic`); the exports are
+generated once into ``benchmarks/.data`` and reused by later runs.
+"""
+
+import io
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from gazeplot import columns as col  # noqa: E402
+from gazeplot.paths import DEFAULT_IMAGE  # noqa: E402
+
+DATA_DIR = Path(__file__).resolve().parent / ".data"
+SIZES = [10_000, 100_000, 1_000_000]
+SEED = 0
+
+
+def recording(rows: int) -> Path:
+    """Synthetic export of ``rows`` rows, generated on first use."""
+    path = DATA_DIR / f"synthetic-{rows}-seed{SEED}.tsv"
+    if not path.exists():
+        from gazeplot.synthetic import write_recording
+
+        tmp = path.with_suffix(".tmp")
+        write_recording(tmp, rows, seed=SEED)
+        tmp.replace(path)
+    return path
+
+
+class Parse:
+    params = SIZES
+    param_names = ["rows"]
+
+    def setup(self, rows):
+        self.path = recording(rows)
+
+    def time_load_plot_columns(self, rows):
+        from gazeplot.loader import load_recording
+
+        load_recording(self.path)
+
+    def time_load_all_columns(self, rows):
+        from gazeplot.loader import load_recording
+
+        load_recording(self.path, columns=None)
+
+    def time_stream_fixations(self, rows):
+        from gazeplot.stream import stream_fixations
+
+        stream_fixations([self.path])
+
+
+class Filter:
+    params = SIZES
+    param_names = ["rows"]
+
+    def setup(self, rows):
+        from gazeplot.loader import load_recording
+
+        self.samples = load_recording(recording(rows))
+
+    def time_select_fixations(self, rows):
+        from gazeplot.filters import select_fixations
+
+        select_fixations(self.samples, col.DEFAULT_STIMULUS)
+
+
+class Aggregate:
+    params = SIZES
+    param_names = ["rows"]
+
+    def setup(self, rows):
+        from gazeplot.filters import select_fixations
+        from gazeplot.loader import load_recording
+
+        self.samples = select_fixations(load_recording(recording(rows)), col.DEFAULT_STIMULUS)
+
+    def time_aggregate_fixations(self, rows):
+        from gazeplot.events import aggregate_fixations
+
+        aggregate_fixations(self.samples)
+
+
+def _fixations(rows):
+    from gazeplot.pipeline import load_fixations
+    from gazeplot.stimulus import load_stimulus
+
+    return load_fixations([recording(rows)]), load_stimulus(DEFAULT_IMAGE, col.DEFAULT_STIMULUS)
+
+
+def _synthetic_fixations(rows):
+    """``rows`` random fixations of participants with 200 fixations each.
+
+    Only participant, centroid and duration are set; suites add the
+    columns they need.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(SEED)
+    names = [f"P{i}" for i in range(-(-rows // 200))]
+    return pd.DataFrame({
+        col.PARTICIPANT: pd.Categorical.from_codes(np.arange(rows) // 200, categories=names),
+        col.FIXATION_X: rng.random(rows),
+        col.FIXATION_Y: rng.random(rows),
+        col.GAZE_EVENT_DURATION: rng.lognormal(5.4, 0.5, rows).astype(np.float32),
+    })
+
+
+class Heatmap:
+    params = SIZES
+    param_names = ["rows"]
+
+    def setup(self, rows):
+        self.fix, self.stimulus = _fixations(rows)
+
+    def time_density(self, rows):
+        from gazeplot.heatmap import density
+
+        density(self.fix, self.stimulus)
+
+
+class Render:
+    params = SIZES
+    param_names = ["rows"]
+
+    def setup(self, rows):
+        from gazeplot.render import FigureRenderer
+
+        self.fix, stimulus = _fixations(rows)
+        self.scatter = FigureRenderer(stimulus, mode="scatter")
+        self.heatmap = FigureRenderer(stimulus, mode="heatmap")
+
+    def time_render_scatter(self, rows):
+        self.scatter.render(self.fix, "Participant1", io.BytesIO())
+
+    def time_render_heatmap(self, rows):
+        self.heatmap.render(self.fix, "Participant1", io.BytesIO())
+
+
+class Samples:
+    params = SIZES
+    param_names = ["rows"]
+
+    def setup(self, rows):
+        from gazeplot.samples import convert_recording
+
+        self.store = convert_recording(recording(rows), DATA_DIR / "samples")
+        ts = self.store.timestamps
+        self.start = int(ts[len(ts) // 2]) if len(ts) else 0
+
+    def time_window_10s(self, rows):
+        window = self.store.window(self.start, self.start + 10_000)
+        float(window[col.PUPIL_LEFT].mean())
+
+
+class Classify:
+    params = SIZES
+    param_names = ["rows"]
+
+    def setup(self, rows):
+        import numpy as np
+
+        from gazeplot.samples import convert_recording
+
+        store = convert_recording(recording(rows), DATA_DIR / "samples")
+        self.t = store.timestamps
+        self.xy = np.column_stack([store[col.GAZE_X], store[col.GAZE_Y]])
+
+    def time_ivt(self, rows):
+        from gazeplot.classify import DetectionParams, detect_fixations
+
+        detect_fixations(self.t, self.xy, params=DetectionParams(method="ivt"))
+
+    def time_idt(self, rows):
+        from gazeplot.classify import DetectionParams, detect_fixations
+
+        detect_fixations(self.t, self.xy, params=DetectionParams(method="idt"))
+
+
+class Statistics:
+    params = SIZES
+    param_names = ["rows"]
+
+    def setup(self, rows):
+        self.fix = _synthetic_fixations(rows)
+        self.fix[col.RECORDING] = self.fix[col.PARTICIPANT]
+
+    def time_cohort_statistics(self, rows):
+        from gazeplot.stats import cohort_statistics
+
+        cohort_statistics(self.fix)
+
+
+class Replay:
+    params = SIZES
+    param_names = ["rows"]
+
+    def setup(self, rows):
+        from gazeplot.replay import ReplayOptions, ReplayRenderer, frame_times
+
+        fix, stimulus = _fixations(rows)
+        self.renderer = ReplayRenderer(stimulus, fix, "Participant1")
+        self.times = frame_times(fix, ReplayOptions())[:250]
+
+    def time_blit_frames(self, rows):
+        for t in self.times:
+            self.renderer.frame(t)
+
+
+class Pyramid:
+    params = SIZES
+    param_names = ["rows"]
+
+    def setup(self, rows):
+        import tempfile
+
+        from gazeplot.pyramid import build_pyramid
+
+        self.fix = _synthetic_fixations(rows)
+        self.size = (1920, 1080)  # full-HD stimulus
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pyramid = build_pyramid(self.fix, self.size, Path(self.tmp.name) / "bench.grid")
+        self.half = list(self.fix[col.PARTICIPANT].cat.categories[::2])
+
+    def teardown(self, rows):
+        self.tmp.cleanup()
+
+    def time_build(self, rows):
+        from gazeplot.pyramid import build_pyramid
+
+        build_pyramid(self.fix, self.size, Path(self.tmp.name) / "build.grid")
+
+    def time_cohort_density(self, rows):
+        self.pyramid.density(level=2)
+
+    def time_half_cohort_density(self, rows):
+        self.pyramid.density(level=2, participants=self.half)
+
+    def time_density_from_fixations(self, rows):
+        from gazeplot.heatmap import bin_fixations, smooth
+
+        smooth(bin_fixations(self.fix, self.pyramid.shape(2)), 20 / self.pyramid.cell_size(2))
+
+
+class Records:
+    params = SIZES
+    param_names = ["rows"]
+
+    def setup(self, rows):
+        import numpy as np
+        import pandas as pd
+
+        from gazeplot.records import FixationArray
+
+        self.fix = fix = _synthetic_fixations(rows)
+        fix[col.RECORDING] = fix[col.PARTICIPANT]
+        fix[col.STIMULUS] = pd.Categorical([col.DEFAULT_STIMULUS] * rows)
+        fix[col.EYE_MOVEMENT_INDEX] = np.arange(rows)
+        fix[col.START] = np.arange(rows) * 300
+        fix[col.END] = fix[col.START] + 250
+        self.duration = fix.columns.get_loc(col.GAZE_EVENT_DURATION)
+        self.records = FixationArray.from_frame(fix)
+
+    def time_from_frame(self, rows):
+        from gazeplot.records import FixationArray
+
+        FixationArray.from_frame(self.fix)
+
+    def time_iterate(self, rows):
+        for fixation in self.records:
+            fixation.duration
+
+    def time_iterate_itertuples(self, rows):
+        for fixation in self.fix.itertuples(index=False):
+            fixation[self.duration]
@@ -0,0 +1,155 @@
+"""Run the pipeline benchmarks and store the results for later comparison.
+
+Collects the benchmark classes of ``benchmarks/bench_*.py``, calls ``setup``
+once per parameter and times every ``time_*`` method ``--repeat`` times. The
+best time and the resulting rows per second are printed and written to
+``benchmarks/results/<date>-<commit>.json`` together with the commit, Python
+and library versions, so throughput can be tracked across versions.
+
+Usage::
+
+    python benchmarks/run.py                          # sizes 10⁴, 10⁵, 10⁶
+    python benchmarks/run.py --sizes 1e7 -k Parse     # only the parse benchmarks
+    python benchmarks/run.py --compare benchmarks/results/<older>.json
+"""
+
+import argparse
+import importlib.util
+import inspect
+import json
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+RESULTS_DIR = HERE / "results"
+
+LIBRARIES = ("pandas", "numpy", "matplotlib", "pyarrow")
+
+
+def load_suites() -> list[type]:
+    """Benchmark classes (those with ``time_*`` methods) of ``bench_*.py``."""
+    suites = []
+    for path in sorted(HERE.glob("bench_*.py")):
+        spec = importlib.util.spec_from_file_location(path.stem, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ == module.__name__ and any(
+                name.startswith("time_") for name in vars(cls)
+            ):
+                suites.append(cls)
+    return suites
+
+
+def git_commit() -> tuple[str, bool]:
+    """Short hash of HEAD and whether the work tree has local changes."""
+    def git(*args: str) -> str:
+        proc = subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True)
+        return proc.stdout.strip()
+
+    dirty = bool(git("status", "--porcelain", "--untracked-files=no"))
+    return git("rev-parse", "--short", "HEAD") or "unknown", dirty
+
+
+def environment() -> dict:
+    versions = {}
+    for name in LIBRARIES:
+        try:
+            versions[name] = __import__(name).__version__
+        except ImportError:
+            versions[name] = None
+    commit, dirty = git_commit()
+    return {
+        "commit": commit,
+        "dirty": dirty,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "versions": versions,
+    }
+
+
+def run(suites: list[type], sizes: list[int] | None, repeat: int, pattern: str | None) -> list[dict]:
+    results = []
+    for cls in suites:
+        methods = sorted(name for name in vars(cls) if name.startswith("time_"))
+        methods = [m for m in methods if not pattern or re.search(pattern, f"{cls.__name__}.{m}")]
+        if not methods:
+            continue
+        for rows in sizes or cls.params:
+            bench = cls()
+            bench.setup(rows)
+            for method in methods:
+                times = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    getattr(bench, method)(rows)
+                    times.append(time.perf_counter() - start)
+                best = min(times)
+                result = {
+                    "benchmark": f"{cls.__name__}.{method}",
+                    "rows": rows,
+                    "best_s": round(best, 6),
+                    "median_s": round(statistics.median(times), 6),
+                    "rows_per_s": round(rows / best) if best else None,
+                }
+                results.append(result)
+                print(
+                    f"{result['benchmark']:<36} {rows:>12,} rows {best * 1000:>10.1f} ms"
+                    f" {result['rows_per_s'] or 0:>14,} rows/s",
+                    flush=True,
+                )
+            if hasattr(bench, "teardown"):
+                bench.teardown(rows)
+    return results
+
+
+def compare(results: list[dict], previous: Path) -> None:
+    """Print the speed-up of each benchmark against an earlier result file."""
+    before = json.loads(previous.read_text())
+    old = {(r["benchmark"], r["rows"]): r["best_s"] for r in before["results"]}
+    print(f"\nCompared with {before['commit']} ({before['date']}):")
+    for r in results:
+        ref = old.get((r["benchmark"], r["rows"]))
+        if ref:
+            print(f"{r['benchmark']:<36} {r['rows']:>12,} rows {ref / r['best_s']:>8.2f}x")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", nargs="+", type=lambda s: int(float(s)), default=None,
+        help="rows per synthetic recording (default: each suite's params)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark; the fastest one counts")
+    parser.add_argument("-k", dest="pattern", default=None, help="only benchmarks matching this regex")
+    parser.add_argument(
+        "-o", "--output", type=Path, default=None,
+        help="result file (default: benchmarks/results/<date>-<commit>.json)",
+    )
+    parser.add_argument("--compare", type=Path, default=None, help="earlier result file to compare with")
+    args = parser.parse_args(argv)
+
+    env = environment()
+    results = run(load_suites(), args.sizes, args.repeat, args.pattern)
+    output = args.output
+    if output is None:
+        stamp = env["date"][:19].replace(":", "").replace("-", "")
+        output = RESULTS_DIR / f"{stamp}-{env['commit']}{'-dirty' if env['dirty'] else ''}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({**env, "results": results}, indent=1))
+    print(f"Results written to {output}")
+    if args.compare is not None:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
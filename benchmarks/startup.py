@@ -0,0 +1,76 @@
+"""Startup-time benchmark for the ``gazeplot`` command line.
+
+Runs ``python -X importtime -m gazeplot <args>`` a few times, sums the
+cumulative import time of the top-level imports and fails when
+
+- a heavy module (pandas, NumPy, matplotlib, PIL, pyarrow) gets imported, or
+- the best import time exceeds ``--budget-ms``.
+
+Usage::
+
+    python benchmarks/startup.py                  # checks `gazeplot --help`
+    python benchmarks/startup.py --budget-ms 80 -- plot --help
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ("pandas", "numpy", "matplotlib", "PIL", "pyarrow", "scipy")
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_profile(args: list[str]) -> tuple[float, set[str]]:
+    """Total top-level import time in ms and the set of imported modules."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "gazeplot", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    total_us = 0
+    modules = set()
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, name = match.groups()
+        modules.add(name)
+        if len(indent) == 1:  # top-level import
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="allowed import time")
+    parser.add_argument("--repeat", type=int, default=5, help="runs; the fastest one counts")
+    parser.add_argument("--json", type=Path, default=None, help="also write the result here")
+    parser.add_argument("command", nargs="*", default=["--help"], help="gazeplot arguments")
+    args = parser.parse_args(argv)
+
+    runs = [import_profile(args.command) for _ in range(args.repeat)]
+    best = min(ms for ms, _ in runs)
+    modules = runs[0][1]
+    heavy = sorted(
+        name for name in modules if name.split(".")[0] in HEAVY_MODULES and "." not in name
+    )
+
+    print(f"gazeplot {' '.join(args.command)}: {best:.1f} ms import time (budget {args.budget_ms:g} ms)")
+    if heavy:
+        print(f"heavy modules imported at startup: {', '.join(heavy)}")
+    if args.json is not None:
+        args.json.write_text(json.dumps(
+            {"command": args.command, "import_ms": best, "heavy_modules": heavy}, indent=1
+        ))
+    return 1 if heavy or best > args.budget_ms else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""Shared eye-tracking pipeline behind the ``fixations_plot_*.py`` scripts.
+
+The stages mirror the original scripts: load → filter → aggregate → normalize → plot.
+
+The public names below are imported lazily on first access, so that
+``python -m gazeplot --help`` and other cheap entry points don't pay for
+pandas, NumPy and matplotlib.
+"""
+
+from importlib import import_module
+
+_EXPORTS = {
+    "Fixation": ".records",
+    "FixationArray": ".records",
+    "GridPyramid": ".pyramid",
+    "QualityRules": ".quality",
+    "Stimulus": ".stimulus",
+    "aggregate_fixations": ".events",
+    "bin_fixations": ".heatmap",
+    "build_pyramid": ".pyramid",
+    "concat_recordings": ".loader",
+    "density": ".heatmap",
+    "fixation_mask": ".filters",
+    "iter_fixation_samples": ".stream",
+    "load_fixation_array": ".pipeline",
+    "load_recording": ".loader",
+    "load_recordings": ".loader",
+    "load_stimulus": ".stimulus",
+    "quality_mask": ".quality",
+    "recording_quality": ".quality",
+    "select_fixations": ".filters",
+    "smooth": ".heatmap",
+    "split_participants": ".filters",
+    "split_stimuli": ".filters",
+    "stream_fixations": ".stream",
+    "to_pixels": ".normalize",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,231 @@
+"""Areas of interest (AOIs) and per-participant AOI metrics.
+
+AOIs are rectangles or polygons loaded from a JSON (or, with PyYAML, YAML)
+file such as ``data/Question-pic.aoi.json``::
+
+    {"stimulus": "Question-pic", "units": "pixels", "size": [404, 488],
+     "aois": [{"name": "legend", "rect": [x0, y0, x1, y1]},
+              {"name": "bars", "polygon": [[x, y], ...]}]}
+
+Coordinates have their origin at the top-left of the stimulus, like the
+``Fixation point X/Y (MCSnorm)`` columns. With ``"units": "pixels"`` they are
+divided by ``size``; otherwise they are already normalized.
+
+Hit testing buckets the fixations into a uniform grid once, so each AOI only
+tests the fixations of the grid cells its bounding box covers. Rectangles are
+then resolved by their bounds and polygons by a vectorized crossing-number
+test.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import columns as col
+
+# Columns of the AOI metrics table
+AOI = "AOI"
+FIXATION_COUNT = "Fixation count"
+DWELL_TIME = "Dwell time"
+TIME_TO_FIRST_FIXATION = "Time to first fixation"
+VISITS = "Visits"
+REVISITS = "Revisits"
+
+
+@dataclass(frozen=True)
+class AreaOfInterest:
+    """A named region in normalized stimulus coordinates."""
+
+    name: str
+    vertices: np.ndarray  # (k, 2) polygon, x/y in 0–1
+    is_rect: bool = False
+
+    @property
+    def bounds(self) -> tuple[float, float, float, float]:
+        """``(x0, y0, x1, y1)`` bounding box."""
+        x0, y0 = self.vertices.min(axis=0)
+        x1, y1 = self.vertices.max(axis=0)
+        return float(x0), float(y0), float(x1), float(y1)
+
+    @classmethod
+    def rect(cls, name: str, x0: float, y0: float, x1: float, y1: float) -> AreaOfInterest:
+        vertices = np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], dtype=np.float64)
+        return cls(name, vertices, is_rect=True)
+
+    @classmethod
+    def polygon(cls, name: str, points) -> AreaOfInterest:
+        vertices = np.asarray(points, dtype=np.float64)
+        if vertices.ndim != 2 or vertices.shape[1] != 2 or len(vertices) < 3:
+            raise ValueError(f"AOI {name!r} needs at least three [x, y] points!")
+        return cls(name, vertices)
+
+    def contains(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Boolean mask of the points ``(x, y)`` inside the AOI."""
+        x0, y0, x1, y1 = self.bounds
+        inside = (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
+        if self.is_rect:
+            return inside
+        # Crossing-number test, vectorized over points and looped over edges
+        result = np.zeros_like(inside)
+        px, py = x[inside], y[inside]
+        odd = np.zeros(len(px), dtype=bool)
+        xs, ys = self.vertices[:, 0], self.vertices[:, 1]
+        for (ax, ay), (bx, by) in zip(
+            zip(xs, ys), zip(np.roll(xs, -1), np.roll(ys, -1))
+        ):
+            crosses = (ay > py) != (by > py)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                x_cross = ax + (py - ay) * (bx - ax) / (by - ay)
+            odd ^= crosses & (px < x_cross)
+        result[inside] = odd
+        return result
+
+
+def parse_aois(spec: dict) -> list[AreaOfInterest]:
+    """AOIs from an already decoded definition (see module docstring)."""
+    if spec.get("units", "normalized") == "pixels":
+        if "size" not in spec:
+            raise ValueError('AOI definitions in pixels need a "size": [width, height]!')
+        w, h = spec["size"]
+    else:
+        w, h = 1, 1
+
+    aois = []
+    for entry in spec["aois"]:
+        name = entry["name"]
+        if "rect" in entry:
+            x0, y0, x1, y1 = entry["rect"]
+            aois.append(AreaOfInterest.rect(name, x0 / w, y0 / h, x1 / w, y1 / h))
+        elif "polygon" in entry:
+            points = [(x / w, y / h) for x, y in entry["polygon"]]
+            aois.append(AreaOfInterest.polygon(name, points))
+        else:
+            raise ValueError(f'AOI {name!r} needs a "rect" or a "polygon"!')
+    return aois
+
+
+def load_aois(path: str | os.PathLike) -> list[AreaOfInterest]:
+    """Read AOI definitions from a JSON or YAML file."""
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as exc:
+            raise ImportError("YAML AOI files need the optional PyYAML package") from exc
+        spec = yaml.safe_load(text)
+    else:
+        spec = json.loads(text)
+    return parse_aois(spec)
+
+
+class GridIndex:
+    """Points bucketed into a uniform ``cells × cells`` grid over [0, 1]²."""
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, cells: int = 64):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.cells = cells
+        cx = self._cell(self.x)
+        cy = self._cell(self.y)
+        cell_ids = cy * cells + cx
+        self.order = np.argsort(cell_ids, kind="stable")
+        # offsets[i]:offsets[i + 1] are the positions in order of cell i
+        self.offsets = np.searchsorted(cell_ids[self.order], np.arange(cells * cells + 1))
+
+    def _cell(self, v: np.ndarray) -> np.ndarray:
+        # Missing coordinates land in cell 0 and are dropped again in hits()
+        cell = np.nan_to_num(v * self.cells, nan=0.0, posinf=self.cells, neginf=0.0)
+        return np.clip(cell.astype(np.intp), 0, self.cells - 1)
+
+    def candidates(self, bounds: tuple[float, float, float, float]) -> np.ndarray:
+        """Indices of the points in the grid cells touched by ``bounds``."""
+        x0, y0, x1, y1 = bounds
+        cx0, cx1 = self._cell(np.array([x0, x1]))
+        cy0, cy1 = self._cell(np.array([y0, y1]))
+        rows = np.arange(cy0, cy1 + 1) * self.cells
+        starts = self.offsets[rows + cx0]
+        stops = self.offsets[rows + cx1 + 1]
+        if len(starts) == 0:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate([self.order[a:b] for a, b in zip(starts, stops)])
+
+    def hits(self, aoi: AreaOfInterest) -> np.ndarray:
+        """Indices of the points inside ``aoi``."""
+        idx = self.candidates(aoi.bounds)
+        finite = np.isfinite(self.x[idx]) & np.isfinite(self.y[idx])
+        idx = idx[finite]
+        return idx[aoi.contains(self.x[idx], self.y[idx])]
+
+
+def hit_matrix(fix: pd.DataFrame, aois: list[AreaOfInterest], cells: int = 64) -> np.ndarray:
+    """``(n_fixations, n_aois)`` boolean matrix of AOI membership.
+
+    AOIs may overlap, so a fixation can hit several of them.
+    """
+    index = GridIndex(fix[col.FIXATION_X].to_numpy(), fix[col.FIXATION_Y].to_numpy(), cells)
+    hits = np.zeros((len(fix), len(aois)), dtype=bool)
+    for j, aoi in enumerate(aois):
+        hits[index.hits(aoi), j] = True
+    return hits
+
+
+def assign_aois(fix: pd.DataFrame, aois: list[AreaOfInterest]) -> pd.Series:
+    """Categorical name of the first AOI each fixation falls into (``NaN`` for none)."""
+    hits = hit_matrix(fix, aois)
+    first = np.where(hits.any(axis=1), hits.argmax(axis=1), -1)
+    labels = pd.Categorical.from_codes(first, categories=[aoi.name for aoi in aois])
+    return pd.Series(labels, index=fix.index, name=AOI)
+
+
+def aoi_metrics(fix: pd.DataFrame, aois: list[AreaOfInterest]) -> pd.DataFrame:
+    """Per-participant, per-AOI metrics of an aggregated fixation table.
+
+    ``fix`` holds one row per fixation (see :mod:`gazeplot.events`). For each
+    participant and recording the table lists fixation count, dwell time (sum
+    of fixation durations), time to first fixation (ms after the first
+    fixation on the stimulus), visits (runs of consecutive fixations in the
+    AOI) and revisits (visits after the first one).
+    """
+    keys = [col.PARTICIPANT, col.RECORDING]
+    fix = fix.sort_values([*keys, col.START], ignore_index=True)
+    names = [aoi.name for aoi in aois]
+    hits = hit_matrix(fix, aois)
+
+    group = fix.groupby(keys, sort=False, observed=True).ngroup().to_numpy()
+    new_group = np.r_[True, group[1:] != group[:-1]]
+    previous = np.vstack([np.zeros((1, len(aois)), dtype=bool), hits[:-1]])
+    previous[new_group] = False
+    entries = hits & ~previous
+
+    duration = fix[col.GAZE_EVENT_DURATION].to_numpy(dtype=np.float64)[:, None]
+    start = fix[col.START].to_numpy(dtype=np.float64)
+    onset = fix.groupby(keys, sort=False, observed=True)[col.START].transform("min").to_numpy()
+    latency = np.where(hits, (start - onset)[:, None], np.inf)
+
+    frame_keys = fix[keys]
+
+    def per_group(values: np.ndarray, how: str) -> pd.DataFrame:
+        values = pd.DataFrame(values, columns=names)
+        return values.groupby([frame_keys[k] for k in keys], sort=True, observed=True).agg(how)
+
+    counts = per_group(hits.astype(np.int64), "sum")
+    metrics = pd.concat(
+        {
+            FIXATION_COUNT: counts,
+            DWELL_TIME: per_group(hits * duration, "sum"),
+            TIME_TO_FIRST_FIXATION: per_group(latency, "min").replace(np.inf, np.nan),
+            VISITS: per_group(entries.astype(np.int64), "sum"),
+        },
+        axis=1,
+    )
+    table = metrics.stack(level=1, future_stack=True).rename_axis([*keys, AOI]).reset_index()
+    table[REVISITS] = (table[VISITS] - 1).clip(lower=0)
+    table[AOI] = pd.Categorical(table[AOI], categories=names)
+    return table.sort_values([*keys, AOI], ignore_index=True)
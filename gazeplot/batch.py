@@ -0,0 +1,175 @@
+"""Headless batch rendering of every recording in a worker pool.
+
+Each worker decodes the stimulus image and builds a reusable Agg figure once
+in its initializer, then parses one recording per task and writes one figure
+per participant directly to disk.
+
+With ``stimulus=None`` every stimulus of a recording is rendered from the
+same parse: the fixation table is split by stimulus in one groupby, and each
+worker decodes an image and builds its figure the first time the stimulus
+comes up.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from . import columns as col
+from .paths import DATA_DIR, DEFAULT_IMAGE, RECORDING_PATTERN
+from .quality import QualityRules
+from .render import FigureRenderer
+from .stimulus import Stimulus, StimulusCache, load_stimulus
+
+
+@dataclass(frozen=True)
+class BatchOptions:
+    """Settings shared by all tasks of a batch run."""
+
+    output_dir: Path
+    stimulus: str | None = col.DEFAULT_STIMULUS  # None: every stimulus with an image
+    image: Path = DEFAULT_IMAGE
+    image_dir: Path = DATA_DIR  # images of the stimuli when ``stimulus`` is None
+    dpi: int = 100
+    format: str = "png"
+    mode: str = "scatter"
+    sigma: float | None = None
+    cache_dir: Path | None = None
+    use_cache: bool = True
+    chunksize: int | None = None
+    quality: QualityRules | None = None
+
+
+@dataclass
+class BatchResult:
+    """Figures written per recording and the recordings that failed."""
+
+    written: dict[Path, list[Path]] = field(default_factory=dict)
+    failed: dict[Path, str] = field(default_factory=dict)
+
+
+# Per-process state set up by _init_worker
+_options: BatchOptions | None = None
+_renderer: FigureRenderer | None = None
+_stimuli: StimulusCache | None = None
+_renderers: dict[str, FigureRenderer] = {}
+
+
+def discover_recordings(data_dir: str | os.PathLike, pattern: str = RECORDING_PATTERN) -> list[Path]:
+    """Recording exports in ``data_dir``, sorted by name."""
+    return sorted(Path(data_dir).glob(pattern))
+
+
+def make_renderer(options: BatchOptions, stimulus: Stimulus | None = None) -> FigureRenderer:
+    """Renderer for ``stimulus`` (default: the one of ``options``) and the figure mode."""
+    if stimulus is None:
+        stimulus = load_stimulus(options.image, options.stimulus)
+    return FigureRenderer(stimulus, mode=options.mode, sigma=options.sigma)
+
+
+def _init_worker(options: BatchOptions) -> None:
+    global _options, _renderer, _stimuli
+    _options = options
+    _renderers.clear()
+    if options.stimulus is None:
+        _renderer = None
+        _stimuli = StimulusCache(options.image_dir)
+    else:
+        _renderer = make_renderer(options)
+
+
+def render_fixations(
+    fix, renderer: FigureRenderer, options: BatchOptions, output_dir: Path | None = None
+) -> list[Path]:
+    """Write one figure per participant and recording of the fixation table ``fix``.
+
+    Figures go to ``output_dir``, by default ``options.output_dir``. The
+    recording is part of the file name, so the recordings of one participant
+    rendered by different workers do not overwrite each other.
+    """
+    from .filters import split_participants
+    from .plot import output_name
+
+    output_dir = options.output_dir if output_dir is None else output_dir
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for participant, fix_participant in split_participants(fix).items():
+        recordings = fix_participant.groupby(col.RECORDING, sort=False, observed=True)
+        for recording, sub in recordings:
+            name = output_name(participant, options.mode, options.format, str(recording))
+            target = output_dir / name
+            renderer.render(sub, participant, target, dpi=options.dpi)
+            written.append(target)
+    return written
+
+
+def render_stimuli(fix, stimuli: StimulusCache, options: BatchOptions) -> list[Path]:
+    """Render the fixations of every stimulus in ``fix`` into one directory per stimulus.
+
+    Stimuli without an image (e.g. the calibration) are skipped.
+    """
+    from .filters import split_stimuli
+    from .plot import slugify
+
+    written = []
+    for name, sub in split_stimuli(fix).items():
+        if name not in stimuli:
+            continue
+        if name not in _renderers:
+            _renderers[name] = make_renderer(options, stimuli.get(name))
+        written += render_fixations(
+            sub, _renderers[name], options, options.output_dir / slugify(name)
+        )
+    return written
+
+
+def render_recording(path: Path) -> list[Path]:
+    """Render every participant of the recording at ``path``; return written files."""
+    from .cache import RecordingCache
+    from .pipeline import load_fixations
+
+    options = _options
+    cache = RecordingCache(options.cache_dir) if options.use_cache else None
+    fix = load_fixations(
+        [path], options.stimulus, cache=cache, chunksize=options.chunksize, quality=options.quality
+    )
+    if options.stimulus is None:
+        return render_stimuli(fix, _stimuli, options)
+    return render_fixations(fix, _renderer, options)
+
+
+def render_batch(
+    paths: list[Path],
+    options: BatchOptions,
+    workers: int | None = None,
+) -> BatchResult:
+    """Render all ``paths`` with ``workers`` processes (default: CPU count).
+
+    A recording that raises is reported in :attr:`BatchResult.failed` instead
+    of aborting the batch. ``workers=1`` renders in the calling process.
+    """
+    options.output_dir.mkdir(parents=True, exist_ok=True)
+    result = BatchResult()
+
+    if workers == 1:
+        _init_worker(options)
+        for path in paths:
+            try:
+                result.written[path] = render_recording(path)
+            except Exception as exc:  # noqa: BLE001 - reported per recording
+                result.failed[path] = f"{type(exc).__name__}: {exc}"
+        return result
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(options,)
+    ) as pool:
+        futures = {pool.submit(render_recording, path): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result.written[path] = future.result()
+            except Exception as exc:  # noqa: BLE001 - reported per recording
+                result.failed[path] = f"{type(exc).__name__}: {exc}"
+    return result
@@ -0,0 +1,191 @@
+"""On-disk columnar cache of parsed recordings.
+
+The exports in ``data/`` never change after they were written, yet every run
+used to parse them from TSV again. After the first parse each recording is
+stored as an uncompressed Feather (Arrow IPC) file, which later runs memory
+map and read without copying the numeric columns.
+
+Cache entries are named after the SHA-256 of the export's content and the
+schema, so edited or replaced files are re-parsed automatically. The hash is
+only recomputed when a file's path, mtime or size no longer match the index.
+
+Feather support needs the optional ``pyarrow`` package; without it
+:class:`RecordingCache` simply parses the TSV every time.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pandas as pd
+
+from .schema import PLOT_COLUMNS, SCHEMA
+
+if TYPE_CHECKING:
+    from .quality import QualityRules
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - optional dependency
+    feather = None
+
+_SCHEMA_DIGEST = hashlib.sha256(
+    json.dumps(sorted(SCHEMA.items())).encode()
+).hexdigest()[:12]
+
+
+def default_cache_dir() -> Path:
+    """``$GAZEPLOT_CACHE_DIR``, else ``gazeplot`` below the user cache dir."""
+    if "GAZEPLOT_CACHE_DIR" in os.environ:
+        return Path(os.environ["GAZEPLOT_CACHE_DIR"])
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "gazeplot"
+
+
+def file_digest(path: str | os.PathLike, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of the file content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while chunk := fh.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _atomic_write(path: Path, write) -> None:
+    """Call ``write(tmp_path)`` and move the result into place.
+
+    Concurrent workers may populate the cache at the same time; renaming a
+    finished file keeps readers from ever seeing a partial entry.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class RecordingCache:
+    """Feather cache of parsed recording exports below ``directory``."""
+
+    def __init__(self, directory: str | os.PathLike | None = None):
+        self.directory = Path(directory) if directory is not None else default_cache_dir()
+        self._index_path = self.directory / "index.json"
+
+    @staticmethod
+    def available() -> bool:
+        """Whether ``pyarrow`` is installed so entries can be written."""
+        return feather is not None
+
+    def _read_index(self) -> dict:
+        try:
+            return json.loads(self._index_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def content_hash(self, path: str | os.PathLike) -> str:
+        """Content hash of ``path``, reusing the indexed one if the file is unchanged."""
+        path = Path(path).resolve()
+        stat = path.stat()
+        key = str(path)
+        index = self._read_index()
+        entry = index.get(key)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry["sha256"]
+
+        sha = file_digest(path)
+        index[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        _atomic_write(self._index_path, lambda tmp: Path(tmp).write_text(json.dumps(index, indent=1)))
+        return sha
+
+    def entry_path(self, path: str | os.PathLike) -> Path:
+        """Location of the cache entry for the export at ``path``."""
+        return self.directory / f"{self.content_hash(path)}-{_SCHEMA_DIGEST}.feather"
+
+    def load(
+        self,
+        path: str | os.PathLike,
+        columns: Sequence[str] | None = PLOT_COLUMNS,
+    ) -> pd.DataFrame:
+        """Return the recording at ``path``, parsing and caching it on a miss.
+
+        The whole export is cached once so that later calls asking for other
+        ``columns`` are served from the same entry.
+        """
+        from .loader import load_recording
+
+        if not self.available():
+            return load_recording(path, columns)
+
+        entry = self.entry_path(path)
+        if not entry.exists():
+            df = load_recording(path, columns=None)
+            self.directory.mkdir(parents=True, exist_ok=True)
+            _atomic_write(
+                entry,
+                lambda tmp: feather.write_feather(df, tmp, compression="uncompressed"),
+            )
+            return df if columns is None else df[list(columns)]
+
+        table = feather.read_table(
+            entry, columns=None if columns is None else list(columns), memory_map=True
+        )
+        return table.to_pandas(split_blocks=True)
+
+    def load_fixations(
+        self,
+        path: str | os.PathLike,
+        stimulus: str | Sequence[str] | None,
+        quality: QualityRules | None = None,
+    ) -> pd.DataFrame:
+        """Aggregated fixation table of ``path`` on ``stimulus``, cached per recording.
+
+        Lets summaries over many recordings reuse the small per-recording
+        event tables instead of re-reading and re-aggregating every export.
+        """
+        from .events import AGGREGATION_VERSION, EVENT_KEYS, aggregate_fixations
+        from .filters import select_fixations
+        from .quality import QUALITY_COLUMNS
+
+        columns = PLOT_COLUMNS + QUALITY_COLUMNS if quality else PLOT_COLUMNS
+        if not self.available():
+            return aggregate_fixations(
+                select_fixations(self.load(path, columns), stimulus, quality=quality)
+            )
+
+        if stimulus is None:
+            key = "\0all"
+        else:
+            key = stimulus if isinstance(stimulus, str) else "\n".join(sorted(stimulus))
+        if quality:
+            key += f"\0{quality!r}"
+        # Tables aggregated another way are never reused
+        key += f"\0{AGGREGATION_VERSION}\0{EVENT_KEYS!r}"
+        slug = hashlib.sha256(key.encode()).hexdigest()[:8]
+        entry = self.directory / f"{self.content_hash(path)}-{_SCHEMA_DIGEST}-fix-{slug}.feather"
+        if entry.exists():
+            return feather.read_table(entry, memory_map=True).to_pandas()
+
+        fix = aggregate_fixations(
+            select_fixations(self.load(path, columns), stimulus, quality=quality)
+        )
+        _atomic_write(
+            entry,
+            lambda tmp: feather.write_feather(fix, tmp, compression="uncompressed"),
+        )
+        return fix
+
+    def clear(self) -> None:
+        """Delete every cache entry and the index."""
+        for entry in self.directory.glob("*.feather"):
+            entry.unlink()
+        self._index_path.unlink(missing_ok=True)
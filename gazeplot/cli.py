@@ -0,0 +1,1102 @@
+"""Command line interface: ``python -m gazeplot <command> ...``.
+
+Only the standard library is imported at module level. pandas, NumPy,
+matplotlib and the pipeline modules are imported inside the commands that
+use them, so ``--help``, argument errors and cache hits start quickly. Run
+``python benchmarks/startup.py`` to check the startup cost.
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import shutil
+import sys
+from pathlib import Path
+
+from . import columns as col
+from .paths import DATA_DIR, DEFAULT_IMAGE, RECORDING_PATTERN, RESULTS_DIR
+from .profiling import Profiler, stage
+
+
+class CommandError(Exception):
+    """Stops a command; :func:`main` prints the message and returns status 1."""
+
+
+def make_cache(args: argparse.Namespace):
+    """Recording cache selected by --cache-dir/--no-cache (``None`` when disabled)."""
+    if args.no_cache:
+        return None
+    from .cache import RecordingCache
+
+    return RecordingCache(args.cache_dir)
+
+
+def make_detector(args: argparse.Namespace):
+    """Fixation filter parameters selected by --detect (``None`` without it)."""
+    if args.detect is None:
+        return None
+    from .classify import DetectionParams
+
+    options = {
+        name: getattr(args, name)
+        for name in ("threshold", "dispersion", "min_duration", "max_gap", "merge_time",
+                     "merge_angle", "pixel_size")
+        if getattr(args, name) is not None
+    }
+    return DetectionParams(method=args.detect, **options)
+
+
+def make_quality(args: argparse.Namespace):
+    """Exclusion rules selected by --min-tracking/--max-accuracy/--min-validity."""
+    from .quality import QualityRules
+
+    rules = QualityRules(args.min_tracking, args.max_accuracy, args.min_validity)
+    return rules if rules else None
+
+
+def stimulus_images(args: argparse.Namespace, fix):
+    """Fixations per stimulus and the image cache selected by --stimulus/--all-stimuli."""
+    from .stimulus import StimulusCache
+
+    if not args.all_stimuli:
+        return {args.stimulus: fix}, StimulusCache(images={args.stimulus: args.image})
+
+    from .filters import split_stimuli
+
+    stimuli = StimulusCache(args.image_dir)
+    groups = {}
+    for name, sub in split_stimuli(fix).items():
+        if name in stimuli:
+            groups[name] = sub
+        else:
+            print(f"Skipping {name}: no image in {args.image_dir}", file=sys.stderr)
+    return groups, stimuli
+
+
+def cmd_plot(args: argparse.Namespace) -> int:
+    from .filters import split_participants
+    from .normalize import to_pixels
+    from .pipeline import load_fixations
+    from .plot import output_name, slugify
+
+    cache = make_cache(args)
+    fix = load_fixations(
+        expand_recordings(args.recordings), None if args.all_stimuli else args.stimulus,
+        args.participant,
+        cache=cache, chunksize=args.chunksize,
+        detector=make_detector(args), quality=make_quality(args),
+    )
+    print(f"Number of fixations: {len(fix)}")
+    by_stimulus, stimuli = stimulus_images(args, fix)
+
+    if args.output_dir is None and not args.show:
+        args.output_dir = RESULTS_DIR
+
+    if args.show:
+        # The "TkAgg" backend opens the plot window outside of JetBrains IDEs
+        # instead of embedding it in them.
+        import matplotlib
+
+        matplotlib.use(args.backend)
+        import matplotlib.pyplot as plt
+
+        from .plot import participant_figure
+    else:
+        # Headless: one reusable Agg figure per stimulus, pyplot is never imported
+        from .render import FigureRenderer
+
+    status = 0
+    for name, stimulus_fix in by_stimulus.items():
+        stimulus = stimuli.get(name)
+        print(f"Image size of {name}: {stimulus.width} × {stimulus.height} pixels")
+        groups = split_participants(stimulus_fix)
+        output_dir = args.output_dir
+        if output_dir is not None:
+            if args.all_stimuli:
+                output_dir = output_dir / slugify(name)
+            output_dir.mkdir(parents=True, exist_ok=True)
+        if not args.show:
+            renderer = FigureRenderer(stimulus, mode=args.mode, sigma=args.sigma)
+
+        for participant in args.participant or list(groups):
+            sub = groups.get(participant)
+            if sub is None or sub.empty:
+                print(f"No fixations found for {participant} on {name}!", file=sys.stderr)
+                status = 1
+                continue
+            print(f"Fixations for {participant}: {len(sub)}")
+            target = None
+            if output_dir is not None:
+                target = output_dir / output_name(participant, args.mode, args.format)
+            if args.show:
+                fig = participant_figure(
+                    to_pixels(sub.copy(), stimulus), stimulus, participant,
+                    mode=args.mode, sigma=args.sigma, fig=plt.figure(figsize=(6, 6)),
+                )
+                if target is not None:
+                    with stage("save"):
+                        fig.savefig(target, dpi=args.dpi)
+            else:
+                renderer.render(sub, participant, target, dpi=args.dpi)
+
+    if args.show:
+        plt.show()
+    return status
+
+
+def cmd_batch(args: argparse.Namespace) -> int:
+    from .batch import BatchOptions, discover_recordings, render_batch
+
+    paths = discover_recordings(args.data_dir, args.pattern)
+    if not paths:
+        raise CommandError(f"No recordings matching {args.pattern} in {args.data_dir}!")
+    print(f"Rendering {len(paths)} recordings with {args.workers or 'all'} workers")
+
+    options = BatchOptions(
+        output_dir=args.output_dir,
+        stimulus=None if args.all_stimuli else args.stimulus,
+        image=args.image,
+        image_dir=args.image_dir,
+        dpi=args.dpi,
+        format=args.format,
+        mode=args.mode,
+        sigma=args.sigma,
+        cache_dir=args.cache_dir,
+        use_cache=not args.no_cache,
+        chunksize=args.chunksize,
+        quality=make_quality(args),
+    )
+    result = render_batch(paths, options, workers=args.workers)
+    for path, written in sorted(result.written.items()):
+        print(f"{path.name}: {len(written)} figures")
+    for path, error in sorted(result.failed.items()):
+        print(f"{path.name}: failed ({error})", file=sys.stderr)
+    return 1 if result.failed else 0
+
+
+def cmd_replay(args: argparse.Namespace) -> int:
+    from .filters import split_participants
+    from .pipeline import load_fixations
+    from .plot import slugify
+    from .replay import ReplayOptions, render_replay
+    from .stimulus import load_stimulus
+
+    paths = expand_recordings(args.recordings)
+    if args.format == "mp4" and shutil.which("ffmpeg") is None:
+        print("MP4 output needs ffmpeg on the PATH; use --format gif or frames", file=sys.stderr)
+        return 1
+
+    fix = load_fixations(
+        paths, args.stimulus, args.participant,
+        cache=make_cache(args), chunksize=args.chunksize,
+        detector=make_detector(args), quality=make_quality(args),
+    )
+    require_fixations(fix, args.stimulus)
+
+    stimulus = load_stimulus(args.image, args.stimulus)
+    options = ReplayOptions(fps=args.fps, speed=args.speed, window=args.window, dpi=args.dpi)
+    suffix = "" if args.format == "frames" else f".{args.format}"
+    for participant, sub in split_participants(fix).items():
+        target = args.output_dir / f"replay_{slugify(participant)}{suffix}"
+        frames = render_replay(sub, stimulus, participant, target, options, workers=args.workers)
+        print(f"{participant}: {frames} frames written to {target}")
+    return 0
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from .server import FixationServer, RecordingIndex
+    from .stimulus import StimulusCache
+
+    index = RecordingIndex(
+        args.data_dir, args.pattern, cache=make_cache(args), quality=make_quality(args)
+    )
+    stimuli = StimulusCache(args.image_dir, images={col.DEFAULT_STIMULUS: DEFAULT_IMAGE})
+    server = FixationServer(index, stimuli, cache_size=args.cache_size, interval=args.interval)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_pyramid(args: argparse.Namespace) -> int:
+    from .pipeline import load_fixations
+    from .pyramid import build_pyramid, pyramid_path
+
+    paths = expand_recordings(args.recordings)
+
+    fix = load_fixations(
+        paths, None if args.all_stimuli else args.stimulus,
+        cache=make_cache(args), chunksize=args.chunksize, workers=args.workers,
+        detector=make_detector(args), quality=make_quality(args),
+    )
+    require_fixations(fix, args.stimulus)
+
+    by_stimulus, stimuli = stimulus_images(args, fix)
+    for name, stimulus_fix in by_stimulus.items():
+        target = pyramid_path(args.output_dir, name)
+        pyramid = build_pyramid(
+            stimulus_fix, stimuli.get(name).size, target,
+            stimulus=name, cell=args.cell, levels=args.levels,
+        )
+        print(f"{name}: {len(pyramid.participants)} participants, {pyramid.levels} levels -> {target}")
+    return 0
+
+
+def cmd_heatmap(args: argparse.Namespace) -> int:
+    from .heatmap import DEFAULT_SIGMA
+    from .plot import pyramid_figure, slugify
+    from .pyramid import GridPyramid
+    from .stimulus import StimulusCache, load_stimulus
+
+    pyramid = GridPyramid(args.pyramid)
+    name = pyramid.stimulus or col.DEFAULT_STIMULUS
+    if args.image is not None:
+        stimulus = load_stimulus(args.image, name)
+    else:
+        stimulus = StimulusCache(args.image_dir, images={col.DEFAULT_STIMULUS: DEFAULT_IMAGE}).get(name)
+
+    participants = args.participant
+    who = "all participants" if participants is None else ", ".join(participants)
+    if args.group is not None:
+        from .stats import load_groups
+
+        if args.groups is None:
+            print("--group needs a --groups file!", file=sys.stderr)
+            return 1
+        labels = load_groups(args.groups)
+        members = set(labels.index[labels.isin(args.group)])
+        participants = [p for p in pyramid.participants if p in members and (
+            args.participant is None or p in args.participant)]
+        who = f"group {', '.join(args.group)}"
+    elif participants is not None:
+        unknown = sorted(set(participants) - set(pyramid.participants))
+        if unknown:
+            print(f"Not in {args.pyramid}: {', '.join(unknown)}", file=sys.stderr)
+            return 1
+
+    bounds = tuple(args.zoom)
+    level = args.level
+    if level is None:
+        # Cells no smaller than the pixels of the drawn axes
+        level = pyramid.level_for(round(0.8 * 8 * args.dpi), bounds[0], bounds[2])
+    grid, snapped = pyramid.density(
+        bounds, level, participants, args.kind,
+        sigma=args.sigma if args.sigma is not None else DEFAULT_SIGMA,
+    )
+    kind = "Dwell time" if args.kind == "dwell" else "Fixation count"
+    fig = pyramid_figure(grid, snapped, stimulus, f"{kind} heatmap of {who} on {name}")
+    output = args.output or RESULTS_DIR / f"heatmap_{slugify(name)}.png"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with stage("save"):
+        fig.savefig(output, dpi=args.dpi)
+    print(f"Level {level} heatmap of {who} written to {output}")
+    return 0
+
+
+def expand_recordings(patterns: list[str | Path]) -> list[Path]:
+    """Expand glob patterns (kept literal by shells such as cmd.exe) into paths.
+
+    Raises :class:`CommandError` when nothing matches.
+    """
+    paths: list[Path] = []
+    for pattern in map(str, patterns):
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        paths.extend(Path(match) for match in matches)
+    if not paths:
+        raise CommandError(f"No recordings matching {' '.join(map(str, patterns))}!")
+    return paths
+
+
+def require_fixations(fix, stimulus: str) -> None:
+    """Raise :class:`CommandError` when the fixation table ``fix`` is empty."""
+    if fix.empty:
+        raise CommandError(f"No fixations found on {stimulus}!")
+
+
+def cmd_summary(args: argparse.Namespace) -> int:
+    from .normalize import to_pixels
+    from .pipeline import load_fixations
+    from .plot import slugify, summary_figure
+
+    paths = expand_recordings(args.recordings)
+
+    cache = make_cache(args)
+    fix = load_fixations(
+        paths, None if args.all_stimuli else args.stimulus,
+        cache=cache, chunksize=args.chunksize, workers=args.workers,
+        detector=make_detector(args), quality=make_quality(args),
+    )
+    require_fixations(fix, args.stimulus)
+    print(f"Recordings: {len(paths)}, participants: {fix[col.PARTICIPANT].nunique()}")
+    print(f"Total number of fixations: {len(fix)}")
+
+    if args.show:
+        import matplotlib
+
+        matplotlib.use(args.backend)
+        import matplotlib.pyplot as plt
+
+    output = args.output
+    if output is None and not args.show:
+        prefix = "heatmap" if args.mode == "heatmap" else "fixations"
+        output = RESULTS_DIR / f"{prefix}_summary.{args.format}"
+
+    by_stimulus, stimuli = stimulus_images(args, fix)
+    for name, stimulus_fix in by_stimulus.items():
+        stimulus = stimuli.get(name)
+        fig = plt.figure(figsize=(8, 8)) if args.show else None
+        fig = summary_figure(
+            to_pixels(stimulus_fix, stimulus), stimulus, mode=args.mode, sigma=args.sigma, fig=fig
+        )
+        if output is not None:
+            target = output.parent / slugify(name) / output.name if args.all_stimuli else output
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with stage("save"):
+                fig.savefig(target, dpi=args.dpi)
+    if args.show:
+        plt.show()
+    return 0
+
+
+def cmd_aoi(args: argparse.Namespace) -> int:
+    from .aoi import aoi_metrics, load_aois
+    from .pipeline import load_fixations
+
+    aoi_file = args.aois or DATA_DIR / f"{args.stimulus}.aoi.json"
+    aois = load_aois(aoi_file)
+    paths = expand_recordings(args.recordings)
+    cache = make_cache(args)
+    fix = load_fixations(
+        paths, args.stimulus, cache=cache, chunksize=args.chunksize, detector=make_detector(args),
+        quality=make_quality(args),
+    )
+    require_fixations(fix, args.stimulus)
+
+    table = aoi_metrics(fix, aois)
+    if args.output is None:
+        table.to_csv(sys.stdout, index=False)
+    else:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        table.to_csv(args.output, index=False)
+        print(f"AOI metrics for {len(aois)} AOIs written to {args.output}")
+    return 0
+
+
+def cmd_stats(args: argparse.Namespace) -> int:
+    from .pipeline import load_fixations
+    from .stats import GROUP, KEYS, cohort_statistics, load_groups, write_statistics
+
+    paths = expand_recordings(args.recordings)
+    if args.by == "group" and args.groups is None:
+        print("--by group needs a --groups file!", file=sys.stderr)
+        return 1
+
+    cache = make_cache(args)
+    fix = load_fixations(
+        paths, None if args.all_stimuli else args.stimulus,
+        cache=cache, chunksize=args.chunksize, workers=args.workers,
+        detector=make_detector(args), quality=make_quality(args),
+    )
+    require_fixations(fix, args.stimulus)
+
+    groups = load_groups(args.groups) if args.groups is not None else None
+    by = {"recording": KEYS, "participant": [col.PARTICIPANT], "group": [GROUP]}[args.by]
+    if groups is not None and args.by != "group":
+        by = [GROUP, *by]
+    if args.all_stimuli:
+        by = [col.STIMULUS, *by]
+    with stage("statistics") as st:
+        table = cohort_statistics(fix, by, groups)
+        st.rows = len(table)
+    if args.output is None:
+        table.to_csv(sys.stdout, index=False)
+    else:
+        write_statistics(table, args.output)
+        print(f"Statistics of {len(table)} groups written to {args.output}")
+    return 0
+
+
+def cmd_scanpath(args: argparse.Namespace) -> int:
+    from .pipeline import load_fixations
+    from .scanpath import saccades, transition_matrix
+    from .stimulus import load_stimulus
+
+    paths = expand_recordings(args.recordings)
+    cache = make_cache(args)
+    fix = load_fixations(
+        paths, args.stimulus, cache=cache, chunksize=args.chunksize, detector=make_detector(args),
+        quality=make_quality(args),
+    )
+    require_fixations(fix, args.stimulus)
+
+    stimulus = load_stimulus(args.image, args.stimulus)
+    table = saccades(fix, stimulus.size)
+    if args.output is None:
+        table.to_csv(sys.stdout, index=False)
+    else:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        table.to_csv(args.output, index=False)
+        print(f"{len(table)} saccades written to {args.output}")
+
+    if args.transitions is not None:
+        transitions = transition_matrix(fix, scanpath_labels(args, fix)).to_frame()
+        args.transitions.parent.mkdir(parents=True, exist_ok=True)
+        transitions.to_csv(args.transitions, index=False)
+        print(f"Transition counts written to {args.transitions}")
+    return 0
+
+
+def scanpath_labels(args: argparse.Namespace, fix):
+    """AOI or grid-cell labels of ``fix`` as selected by --aois/--grid."""
+    if args.grid is not None:
+        from .scanpath import grid_labels
+
+        return grid_labels(fix, *args.grid)
+    from .aoi import assign_aois, load_aois
+
+    return assign_aois(fix, load_aois(args.aois or DATA_DIR / f"{args.stimulus}.aoi.json"))
+
+
+def cmd_similarity(args: argparse.Namespace) -> int:
+    from .pipeline import load_fixations
+    from .similarity import (
+        distance_matrix,
+        grid_substitution_costs,
+        label_sequences,
+        similarity_frame,
+    )
+
+    paths = expand_recordings(args.recordings)
+    cache = make_cache(args)
+    fix = load_fixations(
+        paths, args.stimulus, cache=cache, chunksize=args.chunksize, detector=make_detector(args),
+        quality=make_quality(args),
+    )
+    require_fixations(fix, args.stimulus)
+
+    index, sequences = label_sequences(fix, scanpath_labels(args, fix), collapse=not args.keep_repeats)
+    substitution = None
+    if args.weighted:
+        if args.grid is None:
+            print("--weighted needs --grid", file=sys.stderr)
+            return 2
+        substitution = grid_substitution_costs(*args.grid)
+    distances = distance_matrix(sequences, substitution=substitution, workers=args.workers)
+    table = similarity_frame(index, distances)
+    if args.output is None:
+        table.to_csv(sys.stdout)
+    else:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        table.to_csv(args.output)
+        print(f"{len(table)} × {len(table)} distance matrix written to {args.output}")
+    return 0
+
+
+def add_label_arguments(parser: argparse.ArgumentParser) -> None:
+    labels = parser.add_mutually_exclusive_group()
+    labels.add_argument(
+        "--aois", type=Path, default=None,
+        help="label fixations by AOI (default: data/<stimulus>.aoi.json)",
+    )
+    labels.add_argument(
+        "--grid", type=int, nargs=2, default=None, metavar=("NX", "NY"),
+        help="label fixations by an NX × NY grid instead of AOIs",
+    )
+
+
+def add_mode_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--format", choices=("png", "svg", "pdf"), default="png",
+        help="file format of written figures",
+    )
+    parser.add_argument(
+        "--mode", choices=("scatter", "heatmap"), default="scatter",
+        help="draw fixation circles or a duration-weighted density heatmap",
+    )
+    parser.add_argument(
+        "--sigma", type=float, default=None, metavar="PX",
+        help="Gaussian smoothing of the heatmap in image pixels (default: 20)",
+    )
+
+
+def cmd_watch(args: argparse.Namespace) -> int:
+    from .batch import BatchOptions, discover_recordings
+    from .incremental import build, watch
+
+    options = BatchOptions(
+        output_dir=args.output_dir,
+        stimulus=args.stimulus,
+        image=args.image,
+        dpi=args.dpi,
+        format=args.format,
+        mode=args.mode,
+        sigma=args.sigma,
+        cache_dir=args.cache_dir,
+        use_cache=not args.no_cache,
+        chunksize=args.chunksize,
+        quality=make_quality(args),
+    )
+
+    def report(result) -> None:
+        for target in result.rebuilt:
+            print(f"rebuilt {target.name}")
+        for path, error in sorted(result.failed.items()):
+            print(f"{path.name}: failed ({error})", file=sys.stderr)
+        print(f"{len(result.rebuilt)} rebuilt, {result.up_to_date} up to date")
+
+    if args.once:
+        result = build(
+            discover_recordings(args.data_dir, args.pattern), options, summary=not args.no_summary
+        )
+        report(result)
+        return 1 if result.failed else 0
+
+    print(f"Watching {args.data_dir} every {args.interval:g} s (Ctrl+C to stop)")
+    try:
+        watch(
+            args.data_dir, options, pattern=args.pattern, interval=args.interval,
+            summary=not args.no_summary, on_build=report,
+        )
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_generate(args: argparse.Namespace) -> int:
+    from .synthetic import write_dataset
+
+    for path in write_dataset(
+        args.output_dir, args.rows, args.recordings, seed=args.seed, stimulus=args.stimulus
+    ):
+        print(f"Wrote {path}")
+    return 0
+
+
+def add_detection_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group(
+        "fixation detection", "reclassify the raw gaze samples instead of using the exported events"
+    )
+    group.add_argument(
+        "--detect", choices=["ivt", "idt"], default=None,
+        help="velocity (I-VT) or dispersion (I-DT) based fixation filter",
+    )
+    group.add_argument(
+        "--threshold", type=float, default=None, metavar="DEG/S",
+        help="I-VT velocity threshold (default: 30)",
+    )
+    group.add_argument(
+        "--dispersion", type=float, default=None, metavar="DEG",
+        help="I-DT dispersion threshold (default: 1.0)",
+    )
+    group.add_argument(
+        "--min-duration", type=float, default=None, metavar="MS",
+        help="discard shorter fixations (default: 60)",
+    )
+    group.add_argument(
+        "--max-gap", type=float, default=None, metavar="MS",
+        help="interpolate gaps up to this length (default: 75, 0 disables)",
+    )
+    group.add_argument(
+        "--merge-time", type=float, default=None, metavar="MS",
+        help="merge fixations closer in time (default: 75, 0 disables)",
+    )
+    group.add_argument(
+        "--merge-angle", type=float, default=None, metavar="DEG",
+        help="... and closer in visual angle (default: 0.5)",
+    )
+    group.add_argument(
+        "--pixel-size", type=float, default=None, metavar="MM",
+        help="physical size of a screen pixel (default: 0.2715)",
+    )
+
+
+def add_quality_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group(
+        "data quality", "exclude poorly tracked recordings and invalid fixations"
+    )
+    group.add_argument(
+        "--min-tracking", type=float, default=None, metavar="RATIO",
+        help="drop recordings with a smaller share of valid eye tracker samples, e.g. 0.7",
+    )
+    group.add_argument(
+        "--max-accuracy", type=float, default=None, metavar="DEG",
+        help="drop recordings with a larger average validation accuracy",
+    )
+    group.add_argument(
+        "--min-validity", type=float, default=None, metavar="RATIO",
+        help="drop fixations with a smaller share of valid samples",
+    )
+
+
+def cmd_quality(args: argparse.Namespace) -> int:
+    from .loader import load_recordings
+    from .quality import EXCLUDED, QUALITY_COLUMNS, recording_quality
+    from .schema import PLOT_COLUMNS
+
+    paths = expand_recordings(args.recordings)
+    df = load_recordings(
+        paths, PLOT_COLUMNS + QUALITY_COLUMNS, cache=make_cache(args), workers=args.workers
+    )
+    rules = make_quality(args)
+    with stage("quality") as st:
+        report = recording_quality(df, rules)
+        st.rows = len(df)
+    if args.output is None:
+        report.to_csv(sys.stdout, index=False)
+    else:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        report.to_csv(args.output, index=False)
+        print(f"Quality of {len(report)} recordings written to {args.output}")
+    if rules is not None:
+        print(f"{int(report[EXCLUDED].sum())} of {len(report)} recordings excluded", file=sys.stderr)
+    return 0
+
+
+def cmd_samples(args: argparse.Namespace) -> int:
+    from .samples import convert_recording
+
+    paths = expand_recordings(args.recordings)
+    for path in paths:
+        store = convert_recording(path, args.output_dir, force=args.force)
+        print(f"{path.name}: {len(store)} samples, stimuli {', '.join(store.stimuli)} -> {store.directory}")
+    return 0
+
+
+def add_stimulus_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--all-stimuli", action="store_true",
+        help="process every stimulus with an image in --image-dir (one subdirectory each)",
+    )
+    parser.add_argument(
+        "--image-dir", type=Path, default=DATA_DIR,
+        help="stimulus images named like the stimuli, for --all-stimuli (default: data/)",
+    )
+
+
+def add_input_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--cache-dir", type=Path, default=None,
+        help="directory of the parsed-recording cache (default: ~/.cache/gazeplot)",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="always parse the TSV exports"
+    )
+    parser.add_argument(
+        "--chunksize", type=int, default=None, metavar="ROWS",
+        help="stream the exports in blocks of ROWS rows (bounded memory, no cache)",
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="gazeplot",
+        description="Plot eye-tracking fixations from Tobii Pro Lab exports.",
+    )
+    parser.add_argument(
+        "--profile", type=Path, default=None, metavar="JSON",
+        help="write wall/CPU time, peak RSS and rows per pipeline stage to JSON",
+    )
+    parser.add_argument(
+        "--cprofile", type=Path, default=None, metavar="PSTATS",
+        help="also dump cProfile stats (for snakeviz, flameprof or gprof2dot)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    plot = commands.add_parser("plot", help="one fixation figure per participant")
+    plot.add_argument("recordings", nargs="+", type=Path, help="TSV recording exports")
+    plot.add_argument(
+        "-p", "--participant", nargs="+", default=None,
+        help="participants to plot (default: every participant in the recordings)",
+    )
+    plot.add_argument("--stimulus", default=col.DEFAULT_STIMULUS, help="presented stimulus name")
+    plot.add_argument("--image", type=Path, default=DEFAULT_IMAGE, help="stimulus image file")
+    add_stimulus_arguments(plot)
+    plot.add_argument("-o", "--output-dir", type=Path, default=None, help="write PNGs here (default: results/ unless --show)")
+    plot.add_argument("--dpi", type=int, default=100, help="resolution of written figures")
+    add_mode_arguments(plot)
+    add_input_arguments(plot)
+    add_detection_arguments(plot)
+    add_quality_arguments(plot)
+    plot.add_argument("--show", action="store_true", help="open the figures in a window")
+    plot.add_argument("--backend", default="TkAgg", help="matplotlib backend used with --show")
+    plot.set_defaults(func=cmd_plot)
+
+    summary = commands.add_parser(
+        "summary", help="one figure with the fixations of all participants"
+    )
+    summary.add_argument(
+        "recordings", nargs="*", default=[str(DATA_DIR / RECORDING_PATTERN)],
+        help="TSV exports or glob patterns (default: data/*.tsv)",
+    )
+    summary.add_argument("--stimulus", default=col.DEFAULT_STIMULUS, help="presented stimulus name")
+    summary.add_argument("--image", type=Path, default=DEFAULT_IMAGE, help="stimulus image file")
+    add_stimulus_arguments(summary)
+    summary.add_argument(
+        "-o", "--output", type=Path, default=None,
+        help="write the figure here (default: results/fixations_summary.png unless --show)",
+    )
+    summary.add_argument("--dpi", type=int, default=100, help="resolution of the written figure")
+    summary.add_argument(
+        "-j", "--workers", type=int, default=None,
+        help="threads loading recordings concurrently (default: number of CPUs)",
+    )
+    add_mode_arguments(summary)
+    add_input_arguments(summary)
+    add_detection_arguments(summary)
+    add_quality_arguments(summary)
+    summary.add_argument("--show", action="store_true", help="open the figure in a window")
+    summary.add_argument("--backend", default="TkAgg", help="matplotlib backend used with --show")
+    summary.set_defaults(func=cmd_summary)
+
+    aoi = commands.add_parser("aoi", help="per-participant AOI metrics table")
+    aoi.add_argument(
+        "recordings", nargs="*", default=[str(DATA_DIR / RECORDING_PATTERN)],
+        help="TSV exports or glob patterns (default: data/*.tsv)",
+    )
+    aoi.add_argument(
+        "--aois", type=Path, default=None,
+        help="AOI definition file (default: data/<stimulus>.aoi.json)",
+    )
+    aoi.add_argument("--stimulus", default=col.DEFAULT_STIMULUS, help="presented stimulus name")
+    aoi.add_argument("-o", "--output", type=Path, default=None, help="CSV file (default: stdout)")
+    add_input_arguments(aoi)
+    add_detection_arguments(aoi)
+    add_quality_arguments(aoi)
+    aoi.set_defaults(func=cmd_aoi)
+
+    stats = commands.add_parser(
+        "stats", help="fixation statistics per recording, participant or group"
+    )
+    stats.add_argument(
+        "recordings", nargs="*", default=[str(DATA_DIR / RECORDING_PATTERN)],
+        help="TSV exports or glob patterns (default: data/*.tsv)",
+    )
+    stats.add_argument("--stimulus", default=col.DEFAULT_STIMULUS, help="presented stimulus name")
+    stats.add_argument(
+        "--all-stimuli", action="store_true", help="one row per stimulus instead of --stimulus"
+    )
+    stats.add_argument(
+        "--by", choices=("recording", "participant", "group"), default="recording",
+        help="rows of the table (default: recording)",
+    )
+    stats.add_argument(
+        "--groups", type=Path, default=None,
+        help='CSV assigning participants to groups ("Participant name", "Group")',
+    )
+    stats.add_argument(
+        "-o", "--output", type=Path, default=None,
+        help="CSV or .parquet file (default: CSV on stdout)",
+    )
+    stats.add_argument(
+        "-j", "--workers", type=int, default=None,
+        help="threads loading recordings concurrently (default: number of CPUs)",
+    )
+    add_input_arguments(stats)
+    add_detection_arguments(stats)
+    add_quality_arguments(stats)
+    stats.set_defaults(func=cmd_stats)
+
+    scanpath = commands.add_parser(
+        "scanpath", help="saccade table and AOI/grid transition counts"
+    )
+    scanpath.add_argument(
+        "recordings", nargs="*", default=[str(DATA_DIR / RECORDING_PATTERN)],
+        help="TSV exports or glob patterns (default: data/*.tsv)",
+    )
+    scanpath.add_argument("--stimulus", default=col.DEFAULT_STIMULUS, help="presented stimulus name")
+    scanpath.add_argument("--image", type=Path, default=DEFAULT_IMAGE, help="stimulus image file")
+    scanpath.add_argument(
+        "-o", "--output", type=Path, default=None, help="saccade CSV (default: stdout)"
+    )
+    scanpath.add_argument(
+        "--transitions", type=Path, default=None, help="also write transition counts as CSV"
+    )
+    add_label_arguments(scanpath)
+    add_input_arguments(scanpath)
+    add_detection_arguments(scanpath)
+    add_quality_arguments(scanpath)
+    scanpath.set_defaults(func=cmd_scanpath)
+
+    similarity = commands.add_parser(
+        "similarity", help="pairwise scanpath edit-distance matrix"
+    )
+    similarity.add_argument(
+        "recordings", nargs="*", default=[str(DATA_DIR / RECORDING_PATTERN)],
+        help="TSV exports or glob patterns (default: data/*.tsv)",
+    )
+    similarity.add_argument("--stimulus", default=col.DEFAULT_STIMULUS, help="presented stimulus name")
+    similarity.add_argument(
+        "-o", "--output", type=Path, default=None, help="distance matrix CSV (default: stdout)"
+    )
+    add_label_arguments(similarity)
+    similarity.add_argument(
+        "--weighted", action="store_true",
+        help="substitution cost from grid-cell distance (needs --grid)",
+    )
+    similarity.add_argument(
+        "--keep-repeats", action="store_true",
+        help="do not merge consecutive fixations on the same label",
+    )
+    similarity.add_argument(
+        "-j", "--workers", type=int, default=None,
+        help="worker processes (default: number of CPUs)",
+    )
+    add_input_arguments(similarity)
+    add_detection_arguments(similarity)
+    add_quality_arguments(similarity)
+    similarity.set_defaults(func=cmd_similarity)
+
+    batch = commands.add_parser(
+        "batch", help="render every recording of a directory headlessly in parallel"
+    )
+    batch.add_argument(
+        "data_dir", nargs="?", type=Path, default=DATA_DIR, help="directory of TSV exports"
+    )
+    batch.add_argument(
+        "--pattern", default=RECORDING_PATTERN, help="glob of the exports in DATA_DIR"
+    )
+    batch.add_argument("--stimulus", default=col.DEFAULT_STIMULUS, help="presented stimulus name")
+    batch.add_argument("--image", type=Path, default=DEFAULT_IMAGE, help="stimulus image file")
+    add_stimulus_arguments(batch)
+    batch.add_argument("-o", "--output-dir", type=Path, default=RESULTS_DIR, help="write PNGs here")
+    batch.add_argument("--dpi", type=int, default=100, help="resolution of written figures")
+    batch.add_argument(
+        "-j", "--workers", type=int, default=None,
+        help="worker processes (default: number of CPUs)",
+    )
+    add_mode_arguments(batch)
+    add_input_arguments(batch)
+    add_quality_arguments(batch)
+    batch.set_defaults(func=cmd_batch)
+
+    watch = commands.add_parser(
+        "watch", help="re-render only the figures whose recordings changed"
+    )
+    watch.add_argument(
+        "data_dir", nargs="?", type=Path, default=DATA_DIR, help="directory of TSV exports"
+    )
+    watch.add_argument(
+        "--pattern", default=RECORDING_PATTERN, help="glob of the exports in DATA_DIR"
+    )
+    watch.add_argument("--stimulus", default=col.DEFAULT_STIMULUS, help="presented stimulus name")
+    watch.add_argument("--image", type=Path, default=DEFAULT_IMAGE, help="stimulus image file")
+    watch.add_argument("-o", "--output-dir", type=Path, default=RESULTS_DIR, help="write PNGs here")
+    watch.add_argument("--dpi", type=int, default=100, help="resolution of written figures")
+    watch.add_argument("--once", action="store_true", help="build once and exit instead of polling")
+    watch.add_argument(
+        "--interval", type=float, default=2.0, help="seconds between checks of DATA_DIR"
+    )
+    watch.add_argument("--no-summary", action="store_true", help="skip the summary figure")
+    add_mode_arguments(watch)
+    add_input_arguments(watch)
+    add_quality_arguments(watch)
+    watch.set_defaults(func=cmd_watch)
+
+    replay = commands.add_parser(
+        "replay", help="animated replay of the fixations in time order (MP4, GIF or frames)"
+    )
+    replay.add_argument(
+        "recordings", nargs="*", default=[str(DATA_DIR / RECORDING_PATTERN)],
+        help="TSV exports or glob patterns (default: data/*.tsv)",
+    )
+    replay.add_argument(
+        "-p", "--participant", nargs="+", default=None,
+        help="participants to replay (default: every participant in the recordings)",
+    )
+    replay.add_argument("--stimulus", default=col.DEFAULT_STIMULUS, help="presented stimulus name")
+    replay.add_argument("--image", type=Path, default=DEFAULT_IMAGE, help="stimulus image file")
+    replay.add_argument(
+        "-o", "--output-dir", type=Path, default=RESULTS_DIR, help="write the replays here"
+    )
+    replay.add_argument(
+        "--format", choices=("mp4", "gif", "frames"), default="mp4",
+        help="video (needs ffmpeg), animated GIF or a directory of PNG frames (default: mp4)",
+    )
+    replay.add_argument("--fps", type=float, default=25, help="frames per second (default: 25)")
+    replay.add_argument(
+        "--speed", type=float, default=1.0, help="playback speed relative to the recording"
+    )
+    replay.add_argument(
+        "--window", type=float, default=2000, metavar="MS",
+        help="how long fixations stay visible after they end (default: 2000)",
+    )
+    replay.add_argument("--dpi", type=int, default=100, help="resolution of the frames")
+    replay.add_argument(
+        "-j", "--workers", type=int, default=None,
+        help="worker processes rendering chunks of frames (default: number of CPUs)",
+    )
+    add_input_arguments(replay)
+    add_detection_arguments(replay)
+    add_quality_arguments(replay)
+    replay.set_defaults(func=cmd_replay)
+
+    serve = commands.add_parser(
+        "serve", help="local HTTP server for fixation tables and figures"
+    )
+    serve.add_argument(
+        "data_dir", nargs="?", type=Path, default=DATA_DIR, help="directory of TSV exports"
+    )
+    serve.add_argument(
+        "--pattern", default=RECORDING_PATTERN, help="glob of the exports in DATA_DIR"
+    )
+    serve.add_argument(
+        "--image-dir", type=Path, default=DATA_DIR,
+        help="stimulus images named like the stimuli (default: data/)",
+    )
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    serve.add_argument("--port", type=int, default=8000, help="port to listen on")
+    serve.add_argument(
+        "--cache-size", type=int, default=128, help="rendered figures kept in memory"
+    )
+    serve.add_argument(
+        "--interval", type=float, default=2.0, help="seconds between checks of DATA_DIR"
+    )
+    add_input_arguments(serve)
+    add_quality_arguments(serve)
+    serve.set_defaults(func=cmd_serve)
+
+    pyramid = commands.add_parser(
+        "pyramid", help="precompute per-participant heatmap grids at several resolutions"
+    )
+    pyramid.add_argument(
+        "recordings", nargs="*", default=[str(DATA_DIR / RECORDING_PATTERN)],
+        help="TSV exports or glob patterns (default: data/*.tsv)",
+    )
+    pyramid.add_argument("--stimulus", default=col.DEFAULT_STIMULUS, help="presented stimulus name")
+    pyramid.add_argument("--image", type=Path, default=DEFAULT_IMAGE, help="stimulus image file")
+    add_stimulus_arguments(pyramid)
+    pyramid.add_argument(
+        "-o", "--output-dir", type=Path, default=RESULTS_DIR / "pyramids",
+        help="write <stimulus>.grid directories here (default: results/pyramids)",
+    )
+    pyramid.add_argument(
+        "--cell", type=int, default=4, metavar="PX",
+        help="stimulus pixels per cell of the finest level (default: 4)",
+    )
+    pyramid.add_argument(
+        "--levels", type=int, default=5, help="number of levels, each halving the last (default: 5)"
+    )
+    pyramid.add_argument(
+        "-j", "--workers", type=int, default=None,
+        help="threads loading recordings concurrently (default: number of CPUs)",
+    )
+    add_input_arguments(pyramid)
+    add_detection_arguments(pyramid)
+    add_quality_arguments(pyramid)
+    pyramid.set_defaults(func=cmd_pyramid)
+
+    heatmap = commands.add_parser(
+        "heatmap", help="cohort, group or zoomed heatmap from a precomputed pyramid"
+    )
+    heatmap.add_argument("pyramid", type=Path, help="a .grid directory written by the pyramid command")
+    heatmap.add_argument(
+        "--image", type=Path, default=None,
+        help="stimulus image file (default: looked up by stimulus name in --image-dir)",
+    )
+    heatmap.add_argument(
+        "--image-dir", type=Path, default=DATA_DIR,
+        help="stimulus images named like the stimuli (default: data/)",
+    )
+    heatmap.add_argument(
+        "-p", "--participant", nargs="+", default=None,
+        help="participants to sum (default: all participants)",
+    )
+    heatmap.add_argument(
+        "--groups", type=Path, default=None,
+        help='CSV assigning participants to groups ("Participant name", "Group")',
+    )
+    heatmap.add_argument("--group", nargs="+", default=None, help="groups of --groups to sum")
+    heatmap.add_argument(
+        "--kind", choices=("dwell", "count"), default="dwell",
+        help="weigh by dwell time or count fixations (default: dwell)",
+    )
+    heatmap.add_argument(
+        "--zoom", type=float, nargs=4, default=(0.0, 0.0, 1.0, 1.0), metavar=("X0", "Y0", "X1", "Y1"),
+        help="normalized part of the stimulus to show, y from the top (default: all of it)",
+    )
+    heatmap.add_argument(
+        "--level", type=int, default=None,
+        help="pyramid level to draw (default: the coarsest one that still fills the figure)",
+    )
+    heatmap.add_argument(
+        "--sigma", type=float, default=None, help="Gaussian width in stimulus pixels (default: 20)"
+    )
+    heatmap.add_argument(
+        "-o", "--output", type=Path, default=None,
+        help="write the figure here (default: results/heatmap_<stimulus>.png)",
+    )
+    heatmap.add_argument("--dpi", type=int, default=100, help="resolution of the written figure")
+    heatmap.set_defaults(func=cmd_heatmap)
+
+    quality = commands.add_parser(
+        "quality", help="tracking ratio, validity and calibration accuracy per recording"
+    )
+    quality.add_argument(
+        "recordings", nargs="*", default=[str(DATA_DIR / RECORDING_PATTERN)],
+        help="TSV exports or glob patterns (default: data/*.tsv)",
+    )
+    quality.add_argument("-o", "--output", type=Path, default=None, help="CSV file (default: stdout)")
+    quality.add_argument(
+        "-j", "--workers", type=int, default=None,
+        help="threads loading recordings concurrently (default: number of CPUs)",
+    )
+    add_input_arguments(quality)
+    add_quality_arguments(quality)
+    quality.set_defaults(func=cmd_quality)
+
+    samples = commands.add_parser(
+        "samples", help="convert the raw gaze samples into memory-mapped stores"
+    )
+    samples.add_argument(
+        "recordings", nargs="*", default=[str(DATA_DIR / RECORDING_PATTERN)],
+        help="TSV exports or glob patterns (default: data/*.tsv)",
+    )
+    samples.add_argument(
+        "-o", "--output-dir", type=Path, default=None,
+        help="store directory (default: ~/.cache/gazeplot/samples)",
+    )
+    samples.add_argument("--force", action="store_true", help="rewrite stores that are up to date")
+    samples.set_defaults(func=cmd_samples)
+
+    generate = commands.add_parser(
+        "generate", help="write synthetic exports in the Tobii Pro Lab format"
+    )
+    generate.add_argument("output_dir", type=Path, help="directory for the TSV files")
+    generate.add_argument(
+        "-n", "--rows", type=lambda s: int(float(s)), default=100_000,
+        help="rows per recording, e.g. 1e6 (default: 100000)",
+    )
+    generate.add_argument("-r", "--recordings", type=int, default=1, help="number of recordings")
+    generate.add_argument("--stimulus", default=col.DEFAULT_STIMULUS, help="presented stimulus name")
+    generate.add_argument("--seed", type=int, default=0, help="random seed")
+    generate.set_defaults(func=cmd_generate)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    rules = [getattr(args, name, None) for name in ("min_tracking", "max_accuracy", "min_validity")]
+    if getattr(args, "detect", None) and any(rule is not None for rule in rules):
+        parser.error("the quality rules apply to the exported fixations, not to --detect")
+    try:
+        if args.profile is None and args.cprofile is None:
+            return args.func(args)
+
+        with Profiler(cprofile=args.cprofile is not None) as profiler:
+            with stage(args.command):
+                status = args.func(args)
+    except CommandError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    if args.profile is not None:
+        profiler.write_report(args.profile)
+        print(f"Stage profile written to {args.profile}", file=sys.stderr)
+    if args.cprofile is not None:
+        profiler.dump_cprofile(args.cprofile)
+        print(f"cProfile stats written to {args.cprofile}", file=sys.stderr)
+    return status
@@ -0,0 +1,43 @@
+"""Column names of the Tobii Pro Lab data export used by the pipeline."""
+
+RECORDING_TIMESTAMP = "Recording timestamp"
+PARTICIPANT = "Participant name"
+RECORDING = "Recording name"
+STIMULUS = "Presented Stimulus name"
+EYE_MOVEMENT_TYPE = "Eye movement type"
+EYE_MOVEMENT_INDEX = "Eye movement type index"
+GAZE_EVENT_DURATION = "Gaze event duration"
+FIXATION_X = "Fixation point X (MCSnorm)"
+FIXATION_Y = "Fixation point Y (MCSnorm)"
+
+# Raw sample stream of the eye tracker rows
+SENSOR = "Sensor"
+GAZE_X = "Gaze point X"
+GAZE_Y = "Gaze point Y"
+GAZE_X_NORM = "Gaze point X (MCSnorm)"
+GAZE_Y_NORM = "Gaze point Y (MCSnorm)"
+PUPIL_LEFT = "Pupil diameter left"
+PUPIL_RIGHT = "Pupil diameter right"
+VALIDITY_LEFT = "Validity left"
+VALIDITY_RIGHT = "Validity right"
+EYE_Z_LEFT = "Eye position left Z (DACSmm)"
+EYE_Z_RIGHT = "Eye position right Z (DACSmm)"
+
+# Calibration results, repeated on every row of a recording
+CALIBRATION_ACCURACY = "Average calibration accuracy (degrees)"
+VALIDATION_ACCURACY = "Average validation accuracy (degrees)"
+
+# Columns added by the event stage (one row per fixation)
+START = "Start timestamp"
+END = "End timestamp"
+SAMPLES = "Sample count"
+
+# Pixel coordinates added by the normalize stage
+X_PX = "X_px"
+Y_PX = "Y_px"
+
+# Stimulus and eye movement type analysed by the original scripts
+DEFAULT_STIMULUS = "Question-pic"
+FIXATION = "Fixation"
+EYE_TRACKER = "Eye Tracker"
+VALID = "Valid"
@@ -0,0 +1,103 @@
+"""Event stage: collapse per-sample rows into one record per gaze event.
+
+The Tobii export repeats every gaze event on each sample row (~60 Hz), so a
+single fixation shows up as ~20 identical rows. Aggregating them keeps one row
+per fixation with its centroid, duration, start/end timestamps and the number
+of samples it spans.
+"""
+
+from __future__ import annotations
+
+import pandas as pd
+
+from . import columns as col
+from .profiling import stage
+
+# A fixation that outlasts a stimulus change counts once for each stimulus
+EVENT_KEYS = [col.PARTICIPANT, col.RECORDING, col.EYE_MOVEMENT_INDEX, col.STIMULUS]
+
+# Version of the aggregation; bump it when the fixation table changes in a way
+# EVENT_KEYS does not show, so cached tables (see gazeplot.cache) are rebuilt
+AGGREGATION_VERSION = 3
+
+
+_SUM_X = "_sum_x"
+_SUM_Y = "_sum_y"
+_COUNT_X = "_count_x"
+_COUNT_Y = "_count_y"
+
+
+def partial_fixations(samples: pd.DataFrame) -> pd.DataFrame:
+    """Per-event partial aggregates of a block of fixation samples.
+
+    An event may be split across blocks (e.g. chunks of a streamed file), so
+    the centroid is kept as sums and counts until :func:`finalize_fixations`.
+    Partials of several blocks are merged with :func:`combine_partials`.
+    """
+    grouped = samples.groupby(EVENT_KEYS, sort=False, observed=True)
+    return grouped.agg(
+        **{
+            _SUM_X: (col.FIXATION_X, "sum"),
+            _SUM_Y: (col.FIXATION_Y, "sum"),
+            _COUNT_X: (col.FIXATION_X, "count"),
+            _COUNT_Y: (col.FIXATION_Y, "count"),
+            col.GAZE_EVENT_DURATION: (col.GAZE_EVENT_DURATION, "first"),
+            col.START: (col.RECORDING_TIMESTAMP, "min"),
+            col.END: (col.RECORDING_TIMESTAMP, "max"),
+            col.SAMPLES: (col.RECORDING_TIMESTAMP, "size"),
+        }
+    ).reset_index()
+
+
+def combine_partials(partials: pd.DataFrame) -> pd.DataFrame:
+    """Merge rows of stacked partial aggregates that belong to the same event."""
+    grouped = partials.groupby(EVENT_KEYS, sort=False, observed=True)
+    return grouped.agg(
+        **{
+            _SUM_X: (_SUM_X, "sum"),
+            _SUM_Y: (_SUM_Y, "sum"),
+            _COUNT_X: (_COUNT_X, "sum"),
+            _COUNT_Y: (_COUNT_Y, "sum"),
+            col.GAZE_EVENT_DURATION: (col.GAZE_EVENT_DURATION, "first"),
+            col.START: (col.START, "min"),
+            col.END: (col.END, "max"),
+            col.SAMPLES: (col.SAMPLES, "sum"),
+        }
+    ).reset_index()
+
+
+def finalize_fixations(partials: pd.DataFrame) -> pd.DataFrame:
+    """Turn (combined) partial aggregates into the final fixation table."""
+    events = partials.drop(columns=[_SUM_X, _SUM_Y, _COUNT_X, _COUNT_Y])
+    events.insert(4, col.FIXATION_X, partials[_SUM_X] / partials[_COUNT_X])
+    events.insert(5, col.FIXATION_Y, partials[_SUM_Y] / partials[_COUNT_Y])
+    events[col.EYE_MOVEMENT_INDEX] = events[col.EYE_MOVEMENT_INDEX].astype("int64")
+    # Each stimulus part of a fixation gets its share of the exported duration,
+    # by sample count, so dwell times summed over stimuli are not inflated
+    event = events.groupby(EVENT_KEYS[:-1], sort=False, observed=True)[col.SAMPLES]
+    share = events[col.SAMPLES] / event.transform("sum")
+    events[col.GAZE_EVENT_DURATION] = (events[col.GAZE_EVENT_DURATION] * share).astype("float32")
+    return events.sort_values([col.PARTICIPANT, col.RECORDING, col.START], ignore_index=True)
+
+
+def aggregate_fixations(samples: pd.DataFrame) -> pd.DataFrame:
+    """Return one row per fixation event of the sample-level ``samples``.
+
+    ``samples`` is expected to hold fixation rows only (see
+    :func:`gazeplot.filters.select_fixations`). The result keeps the export
+    column names for participant, recording, stimulus, event index, centroid
+    and duration, and adds ``Start timestamp``, ``End timestamp`` and
+    ``Sample count``.
+    """
+    with stage("aggregate") as st:
+        events = finalize_fixations(partial_fixations(samples))
+        st.rows = len(events)
+    return events
+
+
+def empty_fixations() -> pd.DataFrame:
+    """Fixation table without rows, with the columns and dtypes of :func:`aggregate_fixations`."""
+    from .schema import PLOT_COLUMNS, dtypes_for
+
+    samples = {name: pd.Series(dtype=dtype) for name, dtype in dtypes_for(PLOT_COLUMNS).items()}
+    return finalize_fixations(partial_fixations(pd.DataFrame(samples)))
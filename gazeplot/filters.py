@@ -0,0 +1,73 @@
+"""Filter stage: keep the fixation rows of one or more stimuli."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+import pandas as pd
+
+from . import columns as col
+from .profiling import stage
+
+if TYPE_CHECKING:
+    from .quality import QualityRules
+
+
+def fixation_mask(
+    df: pd.DataFrame,
+    stimulus: str | Iterable[str] | None = col.DEFAULT_STIMULUS,
+    participants: Iterable[str] | None = None,
+    quality: QualityRules | None = None,
+) -> pd.Series:
+    """Boolean mask of fixation rows on ``stimulus``.
+
+    ``stimulus`` may also be several names, or ``None`` for every presented
+    stimulus. When ``participants`` is given, only rows of those participants
+    are kept. ``quality`` rules additionally drop poorly tracked recordings and
+    invalid fixations (see :func:`gazeplot.quality.quality_mask`).
+    """
+    if isinstance(stimulus, str):
+        on_stimulus = df[col.STIMULUS] == stimulus
+    elif stimulus is None:
+        on_stimulus = df[col.STIMULUS].notna()
+    else:
+        on_stimulus = df[col.STIMULUS].isin(list(stimulus))
+    mask = on_stimulus & (df[col.EYE_MOVEMENT_TYPE] == col.FIXATION)
+    if participants is not None:
+        mask &= df[col.PARTICIPANT].isin(list(participants))
+    if quality:
+        from .quality import quality_mask
+
+        mask &= quality_mask(df, quality)
+    return mask
+
+
+def select_fixations(
+    df: pd.DataFrame,
+    stimulus: str | Iterable[str] | None = col.DEFAULT_STIMULUS,
+    participants: Iterable[str] | None = None,
+    quality: QualityRules | None = None,
+) -> pd.DataFrame:
+    """Return a copy of the fixation rows selected by :func:`fixation_mask`."""
+    with stage("filter") as st:
+        # Use .copy() so later stages can add columns without SettingWithCopyWarning
+        fix = df.loc[fixation_mask(df, stimulus, participants, quality)].copy()
+        st.rows = len(fix)
+    return fix
+
+
+def split_participants(fix: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Split a fixation table into one frame per participant in a single pass."""
+    return {
+        str(name): group
+        for name, group in fix.groupby(col.PARTICIPANT, sort=True, observed=True)
+    }
+
+
+def split_stimuli(fix: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Split a fixation table into one frame per stimulus in a single pass."""
+    return {
+        str(name): group
+        for name, group in fix.groupby(col.STIMULUS, sort=True, observed=True)
+    }
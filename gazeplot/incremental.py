@@ -0,0 +1,280 @@
+"""Incremental rebuilds and a polling watch mode.
+
+A dependency manifest in the output directory maps every written figure to
+the content hashes of its input recordings, the stimulus image and the
+rendering parameters. A build only re-renders the figures whose entry no
+longer matches. The summary figure is rebuilt from the per-recording fixation
+tables kept in :class:`gazeplot.cache.RecordingCache`, so unchanged
+recordings are not parsed again.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .batch import BatchOptions, discover_recordings, make_renderer, render_fixations
+from .cache import RecordingCache, _atomic_write, file_digest
+from .events import AGGREGATION_VERSION
+from .loader import concat_recordings
+from .paths import RECORDING_PATTERN
+from .pipeline import load_fixations
+from .render import FigureRenderer
+
+MANIFEST_NAME = ".gazeplot-manifest.json"
+MANIFEST_VERSION = 2  # 2: figure names include the recording
+
+
+@dataclass
+class BuildReport:
+    """Figures written by one incremental build."""
+
+    rebuilt: list[Path] = field(default_factory=list)
+    up_to_date: int = 0
+    failed: dict[Path, str] = field(default_factory=dict)
+
+
+def _params(options: BatchOptions) -> dict:
+    """Rendering parameters a figure depends on."""
+    return {
+        "stimulus": options.stimulus,
+        "mode": options.mode,
+        "sigma": options.sigma,
+        "dpi": options.dpi,
+        "format": options.format,
+        "quality": repr(options.quality) if options.quality else None,
+        "aggregation": AGGREGATION_VERSION,
+    }
+
+
+def summary_name(mode: str, fmt: str = "png") -> str:
+    prefix = "heatmap" if mode == "heatmap" else "fixations"
+    return f"{prefix}_summary.{fmt}"
+
+
+class Manifest:
+    """``figure name → {inputs, image, params}`` stored as JSON.
+
+    Builds that wrote no figure (a recording without fixations on the
+    stimulus) are kept under ``empty``, keyed by recording or summary name,
+    so they count as current too. ``hashes`` remembers the content hash of
+    each input by mtime and size when the recording cache is disabled.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.figures: dict[str, dict] = {}
+        self.empty: dict[str, dict] = {}
+        self.hashes: dict[str, dict] = {}
+        # Figures listed by a manifest of another version, removed by build
+        self.outdated: list[str] = []
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.figures = data["figures"]
+            self.empty = data.get("empty", {})
+            self.hashes = data.get("hashes", {})
+        elif isinstance(data.get("figures"), dict):
+            self.outdated = list(data["figures"])
+
+    def save(self) -> None:
+        payload = json.dumps(
+            {
+                "version": MANIFEST_VERSION,
+                "figures": self.figures,
+                "empty": self.empty,
+                "hashes": self.hashes,
+            },
+            indent=1,
+        )
+        _atomic_write(self.path, lambda tmp: Path(tmp).write_text(payload))
+
+    def content_hash(self, path: Path) -> str:
+        """Content hash of ``path``, reused while its mtime and size are unchanged."""
+        stat = path.stat()
+        entry = self.hashes.get(str(path))
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry["sha256"]
+        sha = file_digest(path)
+        self.hashes[str(path)] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha}
+        return sha
+
+    def is_current(self, name: str, inputs: dict[str, str], image: str, params: dict) -> bool:
+        entry = self.figures.get(name)
+        return (
+            entry is not None
+            and entry["inputs"] == inputs
+            and entry["image"] == image
+            and entry["params"] == params
+            and (self.path.parent / name).exists()
+        )
+
+    def record(self, name: str, inputs: dict[str, str], image: str, params: dict) -> None:
+        self.figures[name] = {"inputs": inputs, "image": image, "params": params}
+
+    def forget(self, name: str) -> None:
+        """Drop the entry of figure ``name`` and delete the figure file."""
+        self.figures.pop(name, None)
+        (self.path.parent / Path(name).name).unlink(missing_ok=True)
+
+    def is_empty(self, key: str, inputs: dict[str, str], image: str, params: dict) -> bool:
+        """Whether the last build of ``key`` from these inputs wrote no figure."""
+        return self.empty.get(key) == {"inputs": inputs, "image": image, "params": params}
+
+    def record_empty(self, key: str, inputs: dict[str, str], image: str, params: dict) -> None:
+        self.empty[key] = {"inputs": inputs, "image": image, "params": params}
+
+    def figures_of(self, recording: str, mode: str) -> list[str]:
+        """Per-participant figures of kind ``mode`` built from ``recording`` alone."""
+        return [
+            name
+            for name, entry in self.figures.items()
+            if list(entry["inputs"]) == [recording] and entry["params"]["mode"] == mode
+        ]
+
+
+def build(
+    paths: list[Path],
+    options: BatchOptions,
+    *,
+    summary: bool = True,
+    renderer: FigureRenderer | None = None,
+) -> BuildReport:
+    """Bring the figures of ``paths`` in ``options.output_dir`` up to date.
+
+    Pass a ``renderer`` to reuse its figure across builds (see :func:`watch`).
+    """
+    options.output_dir.mkdir(parents=True, exist_ok=True)
+    # Without the cache, hashes are remembered in the manifest instead
+    cache = RecordingCache(options.cache_dir) if options.use_cache else None
+    manifest = Manifest(options.output_dir / MANIFEST_NAME)
+    image = file_digest(options.image)
+    params = _params(options)
+    report = BuildReport()
+    for name in manifest.outdated:
+        manifest.forget(name)
+
+    hashes = {}
+    for path in paths:
+        path = path.resolve()
+        try:
+            hashes[str(path)] = (cache or manifest).content_hash(path)
+        except FileNotFoundError:
+            continue  # removed since it was discovered
+    manifest.hashes = {key: entry for key, entry in manifest.hashes.items() if key in hashes}
+    renderer = renderer or make_renderer(options)
+    stimulus = renderer.stimulus
+    tables = {}
+
+    def fixations(key: str):
+        if key not in tables:
+            if options.use_cache:
+                tables[key] = cache.load_fixations(key, options.stimulus, options.quality)
+            else:
+                tables[key] = load_fixations(
+                    [key], options.stimulus, chunksize=options.chunksize, quality=options.quality
+                )
+        return tables[key]
+
+    for key, sha in hashes.items():
+        inputs = {key: sha}
+        built = manifest.figures_of(key, options.mode)
+        if built and all(manifest.is_current(name, inputs, image, params) for name in built):
+            report.up_to_date += len(built)
+            continue
+        if not built and manifest.is_empty(key, inputs, image, params):
+            continue
+        try:
+            written = render_fixations(fixations(key), renderer, options)
+        except Exception as exc:  # noqa: BLE001 - reported per recording
+            report.failed[Path(key)] = f"{type(exc).__name__}: {exc}"
+            continue
+        names = {target.name for target in written}
+        for name in built:
+            if name in names:
+                del manifest.figures[name]
+            else:
+                manifest.forget(name)
+        manifest.empty.pop(key, None)
+        for target in written:
+            manifest.record(target.name, inputs, image, params)
+        if not written:
+            manifest.record_empty(key, inputs, image, params)
+        report.rebuilt.extend(written)
+
+    # Forget (and delete) figures of recordings that disappeared from the input set
+    for name, entry in list(manifest.figures.items()):
+        if not set(entry["inputs"]) <= set(hashes):
+            manifest.forget(name)
+    for name, entry in list(manifest.empty.items()):
+        if not set(entry["inputs"]) <= set(hashes):
+            del manifest.empty[name]
+
+    if summary and hashes:
+        from .normalize import to_pixels
+        from .plot import summary_figure
+
+        name = summary_name(options.mode, options.format)
+        inputs = {key: sha for key, sha in hashes.items() if Path(key) not in report.failed}
+        if manifest.is_current(name, inputs, image, params):
+            report.up_to_date += 1
+        elif manifest.is_empty(name, inputs, image, params):
+            pass
+        else:
+            frames = [table for table in map(fixations, inputs) if not table.empty]
+            manifest.forget(name)
+            manifest.empty.pop(name, None)
+            if frames:
+                fix = concat_recordings(frames)
+                fig = summary_figure(
+                    to_pixels(fix, stimulus), stimulus, mode=options.mode, sigma=options.sigma
+                )
+                target = options.output_dir / name
+                fig.savefig(target, dpi=options.dpi)
+                manifest.record(name, inputs, image, params)
+                report.rebuilt.append(target)
+            else:
+                # No recording has fixations on the stimulus (or all failed)
+                manifest.record_empty(name, inputs, image, params)
+
+    manifest.save()
+    return report
+
+
+def watch(
+    data_dir: str | os.PathLike,
+    options: BatchOptions,
+    *,
+    pattern: str = RECORDING_PATTERN,
+    interval: float = 2.0,
+    summary: bool = True,
+    on_build: Callable[[BuildReport], None] | None = None,
+) -> None:
+    """Poll ``data_dir`` and rebuild whenever an export is added or modified.
+
+    Runs until interrupted. Only the stat signature of the directory is
+    checked between builds, so idle polling is cheap.
+    """
+    renderer = make_renderer(options)
+    seen = None
+    while True:
+        paths, signature = [], []
+        for path in discover_recordings(data_dir, pattern):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # removed since the directory was listed
+            paths.append(path)
+            signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+        if signature != seen:
+            report = build(paths, options, summary=summary, renderer=renderer)
+            if on_build is not None:
+                on_build(report)
+            seen = signature
+        time.sleep(interval)
@@ -0,0 +1,99 @@
+"""Load stage: read Tobii Pro Lab TSV exports into pandas."""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .profiling import stage
+from .schema import CATEGORY, PLOT_COLUMNS, dtypes_for
+
+if TYPE_CHECKING:
+    from .cache import RecordingCache
+
+# The exports start with a UTF-8 byte order mark glued to "Recording timestamp"
+ENCODING = "utf-8-sig"
+
+
+def read_header(path: str | os.PathLike) -> list[str]:
+    """Column names of the export at ``path``."""
+    return list(pd.read_csv(path, sep="\t", nrows=0, encoding=ENCODING).columns)
+
+
+def load_recording(
+    path: str | os.PathLike,
+    columns: Sequence[str] | None = PLOT_COLUMNS,
+) -> pd.DataFrame:
+    """Read a single tab-separated recording export.
+
+    Only ``columns`` are parsed (default: the columns the fixation plots need),
+    using the dtypes from :mod:`gazeplot.schema`. Pass ``columns=None`` to read
+    every column of the export.
+    """
+    names = read_header(path) if columns is None else list(columns)
+    dtypes = dtypes_for(names)
+    # The parser builds categories per internal chunk and cannot merge a chunk
+    # where a sparse column (e.g. "Event") is all empty, so long exports are
+    # parsed as strings and categorized afterwards, which is also faster.
+    categorical = [name for name, dtype in dtypes.items() if dtype == CATEGORY]
+    df = pd.read_csv(
+        path,
+        sep="\t",
+        usecols=names,
+        dtype={**dtypes, **dict.fromkeys(categorical, "str")},
+        encoding=ENCODING,
+    )[names]
+    for name in categorical:
+        df[name] = df[name].astype(CATEGORY)
+    return df
+
+
+def concat_recordings(frames: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """Stack recording frames, keeping categorical columns categorical.
+
+    ``pd.concat`` falls back to ``object`` when the categories of two frames
+    differ, so the categories are unified first.
+    """
+    if len(frames) == 1:
+        return frames[0]
+    frames = [frame.copy(deep=False) for frame in frames]
+    for name, dtype in frames[0].dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            categories = union_categoricals(
+                [frame[name] for frame in frames], ignore_order=True
+            ).categories
+            for frame in frames:
+                frame[name] = frame[name].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_recordings(
+    paths: Iterable[str | os.PathLike],
+    columns: Sequence[str] | None = PLOT_COLUMNS,
+    cache: RecordingCache | None = None,
+    workers: int | None = 1,
+) -> pd.DataFrame:
+    """Read several recording exports and stack them into one frame.
+
+    With a ``cache``, previously parsed recordings are read from it instead of
+    from the TSV files. ``workers`` threads load recordings concurrently
+    (``None``: one per CPU); pandas' C parser and Arrow release the GIL.
+    """
+    paths = list(paths)
+    load = load_recording if cache is None else cache.load
+    with stage("load") as st:
+        if workers == 1 or len(paths) < 2:
+            frames = [load(path, columns) for path in paths]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                frames = list(pool.map(lambda path: load(path, columns), paths))
+        if not frames:
+            raise ValueError("No recordings given!")
+        df = concat_recordings(frames)
+        st.rows = len(df)
+    return df
@@ -0,0 +1,21 @@
+"""Normalize stage: convert MCSnorm coordinates to stimulus pixels."""
+
+from __future__ import annotations
+
+import pandas as pd
+
+from . import columns as col
+from .profiling import stage
+from .stimulus import Stimulus
+
+
+def to_pixels(fix: pd.DataFrame, stimulus: Stimulus) -> pd.DataFrame:
+    """Add ``X_px``/``Y_px`` columns scaled to the stimulus size.
+
+    The export gives fixation coordinates normalized to the 0–1 range, so
+    multiplying by the image width and height yields pixel positions.
+    """
+    with stage("normalize"):
+        fix[col.X_PX] = fix[col.FIXATION_X] * stimulus.width
+        fix[col.Y_PX] = fix[col.FIXATION_Y] * stimulus.height
+    return fix
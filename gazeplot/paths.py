@@ -0,0 +1,9 @@
+"""Default locations inside the repository checkout."""
+
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT / "data"
+RESULTS_DIR = ROOT / "results"
+DEFAULT_IMAGE = DATA_DIR / "Question-pic.PNG"
+RECORDING_PATTERN = "*.tsv"
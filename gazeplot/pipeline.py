@@ -0,0 +1,81 @@
+"""End-to-end helpers chaining the load, filter and event stages."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+import pandas as pd
+
+from . import columns as col
+from .events import aggregate_fixations
+from .filters import select_fixations
+from .loader import load_recordings
+from .quality import QUALITY_COLUMNS, QualityRules
+from .schema import PLOT_COLUMNS
+from .stream import stream_fixations
+
+if TYPE_CHECKING:
+    from .cache import RecordingCache
+    from .classify import DetectionParams
+    from .records import FixationArray
+
+
+def load_fixations(
+    paths: Iterable[str | os.PathLike],
+    stimulus: str | Iterable[str] | None = col.DEFAULT_STIMULUS,
+    participants: Iterable[str] | None = None,
+    *,
+    cache: RecordingCache | None = None,
+    chunksize: int | None = None,
+    workers: int | None = 1,
+    detector: DetectionParams | None = None,
+    quality: QualityRules | None = None,
+) -> pd.DataFrame:
+    """Fixation table (one row per event) of the recordings at ``paths``.
+
+    ``stimulus`` selects one or several stimuli, ``None`` keeps all of them;
+    split the result with :func:`gazeplot.filters.split_stimuli`.
+
+    With ``chunksize`` the exports are streamed (see :mod:`gazeplot.stream`)
+    and ``cache`` is ignored; otherwise they are loaded whole by ``workers``
+    threads, from ``cache`` when one is given. With ``detector`` the
+    fixations are detected anew from the raw gaze samples instead (see
+    :mod:`gazeplot.classify`); their sample stores are kept next to ``cache``
+    or, without one, in a temporary directory. ``quality`` rules drop poorly tracked
+    recordings and invalid fixations (see :mod:`gazeplot.quality`); they
+    apply to the exported fixations only.
+    """
+    paths = list(paths)
+    participants = None if participants is None else list(participants)
+    if stimulus is not None and not isinstance(stimulus, str):
+        stimulus = list(stimulus)
+    if detector is not None:
+        from .classify import classify_recordings
+
+        if quality:
+            raise ValueError("Quality rules apply to the exported fixations, not to detected ones")
+        if cache is not None:
+            store_dir = cache.directory / "samples"
+            return classify_recordings(paths, detector, stimulus, participants, store_dir=store_dir)
+        # Caching is off: convert into sample stores that are deleted afterwards
+        with tempfile.TemporaryDirectory(prefix="gazeplot-samples-") as store_dir:
+            return classify_recordings(paths, detector, stimulus, participants, store_dir=store_dir)
+    if chunksize:
+        return stream_fixations(paths, stimulus, participants, chunksize=chunksize, quality=quality)
+    columns = PLOT_COLUMNS + QUALITY_COLUMNS if quality else PLOT_COLUMNS
+    df = load_recordings(paths, columns, cache=cache, workers=workers)
+    return aggregate_fixations(select_fixations(df, stimulus, participants, quality))
+
+
+def load_fixation_array(paths: Iterable[str | os.PathLike], *args, **kwargs) -> FixationArray:
+    """:func:`load_fixations` as a :class:`gazeplot.records.FixationArray`.
+
+    Takes the same arguments; use it when the fixations are consumed by
+    Python loops rather than pandas.
+    """
+    from .records import FixationArray
+
+    return FixationArray.from_frame(load_fixations(paths, *args, **kwargs))
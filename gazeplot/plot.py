@@ -0,0 +1,224 @@
+"""Plot stage: draw fixations on top of the stimulus image.
+
+Figures are built with the object-oriented API on an Agg canvas, so pyplot is
+never imported unless a caller passes in a pyplot-managed figure (e.g. to
+show it in a window).
+"""
+
+from __future__ import annotations
+
+import re
+
+import numpy as np
+import pandas as pd
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+
+from . import columns as col
+from .profiling import stage
+from .stimulus import Stimulus
+
+# Colors assigned to participants in the summary figure, cycled as needed
+SUMMARY_COLORS = ["red", "blue", "green", "orange", "purple", "cyan"]
+
+
+def slugify(name: str) -> str:
+    """``name`` reduced to lower-case letters, digits and underscores."""
+    return re.sub(r"[^0-9A-Za-z]+", "_", name).strip("_").lower()
+
+
+def output_name(
+    participant: str, mode: str = "scatter", fmt: str = "png", recording: str | None = None
+) -> str:
+    """File name of the figure written for ``participant`` (in ``recording``, if given)."""
+    slug = slugify(participant)
+    if recording is not None:
+        slug += f"_{slugify(recording)}"
+    prefix = "heatmap" if mode == "heatmap" else "fixations"
+    return f"{prefix}_{slug}.{fmt}"
+
+
+def new_figure(figsize: tuple[float, float]) -> Figure:
+    """Figure attached to an Agg canvas, without going through pyplot."""
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def draw_stimulus(ax: Axes, stimulus: Stimulus, aspect: str | None = None) -> None:
+    """Show the stimulus as background and fit the axes to its pixel extent."""
+    w, h = stimulus.size
+    ax.imshow(stimulus.image, extent=[0, w, 0, h], aspect=aspect)
+    ax.set_xlim(0, w)
+    ax.set_ylim(0, h)
+    ax.set_xlabel("X (pixels, scaled)")
+    ax.set_ylabel("Y (pixels, scaled)")
+
+
+def scatter_fixations(
+    ax: Axes,
+    fix: pd.DataFrame,
+    stimulus: Stimulus,
+    *,
+    color: str = "red",
+    size_divisor: float = 5,
+    **kwargs,
+):
+    """Overlay fixations as circles sized by their duration."""
+    kwargs.setdefault("alpha", 0.6)
+    kwargs.setdefault("edgecolors", "white")
+    return ax.scatter(
+        fix[col.X_PX],
+        stimulus.height - fix[col.Y_PX],  # Invert Y to match image coordinate system
+        s=fix[col.GAZE_EVENT_DURATION] / size_divisor,
+        c=color,
+        **kwargs,
+    )
+
+
+def draw_heatmap(
+    ax: Axes,
+    grid: np.ndarray,
+    stimulus: Stimulus,
+    *,
+    cmap: str = "jet",
+    alpha: float = 0.5,
+    threshold: float = 0.05,
+    bounds: tuple[float, float, float, float] = (0.0, 0.0, 1.0, 1.0),
+):
+    """Overlay a density ``grid`` on the stimulus.
+
+    Cells below ``threshold`` times the maximum stay transparent so the
+    stimulus remains visible where nobody looked. ``bounds`` is the
+    normalized ``(x0, y0, x1, y1)`` part of the stimulus the grid covers,
+    with ``y`` from the top.
+    """
+    peak = float(grid.max()) if grid.size else 0.0
+    masked = np.ma.masked_less_equal(grid, peak * threshold)
+    w, h = stimulus.size
+    x0, y0, x1, y1 = bounds
+    return ax.imshow(
+        masked, extent=[x0 * w, x1 * w, h - y1 * h, h - y0 * h], cmap=cmap, alpha=alpha, vmin=0, vmax=peak or 1,
+        aspect=ax.get_aspect(), interpolation="bilinear",
+    )
+
+
+@stage("build figure")
+def participant_figure(
+    fix: pd.DataFrame,
+    stimulus: Stimulus,
+    participant: str,
+    mode: str = "scatter",
+    sigma: float | None = None,
+    fig: Figure | None = None,
+) -> Figure:
+    """Figure with the fixations of a single participant.
+
+    Draws into ``fig`` when given, otherwise into a new Agg figure.
+    """
+    fig = fig if fig is not None else new_figure((6, 6))
+    ax = fig.add_subplot()
+    draw_stimulus(ax, stimulus)
+    if mode == "heatmap":
+        from .heatmap import DEFAULT_SIGMA, density
+
+        draw_heatmap(ax, density(fix, stimulus, sigma or DEFAULT_SIGMA), stimulus)
+        ax.set_title(f"Fixation heatmap of {participant} on '{stimulus.name}'", fontsize=14)
+    else:
+        scatter_fixations(ax, fix, stimulus)
+        ax.set_title(f"Fixations of {participant} on '{stimulus.name}'", fontsize=14)
+    fig.tight_layout()
+    return fig
+
+
+@stage("build figure")
+def summary_figure(
+    fix: pd.DataFrame,
+    stimulus: Stimulus,
+    *,
+    colors: list[str] = SUMMARY_COLORS,
+    legend_limit: int = 30,
+    mode: str = "scatter",
+    sigma: float | None = None,
+    fig: Figure | None = None,
+) -> Figure:
+    """Figure with the fixations of all participants, one color each.
+
+    Colors come from the participant's categorical code, so all fixations are
+    drawn by a single scatter instead of one filtered copy per participant.
+    The legend lists at most ``legend_limit`` participants. In ``heatmap``
+    mode the pooled density of all participants is drawn instead.
+    """
+    participants = fix[col.PARTICIPANT].astype("category").cat.remove_unused_categories()
+    names = participants.cat.categories
+    palette = np.asarray(colors)
+    codes = participants.cat.codes.to_numpy()
+
+    # Slightly larger figure for full image
+    fig = fig if fig is not None else new_figure((8, 8))
+    ax = fig.add_subplot()
+    draw_stimulus(ax, stimulus, aspect="auto")
+    if mode == "heatmap":
+        from .heatmap import DEFAULT_SIGMA, density
+
+        draw_heatmap(ax, density(fix, stimulus, sigma or DEFAULT_SIGMA), stimulus)
+        ax.set_title(f"Fixation heatmap of all participants on {stimulus.name}", fontsize=14)
+        fig.subplots_adjust(top=0.95, bottom=0.1)
+        return fig
+
+    scatter_fixations(
+        ax, fix, stimulus,
+        color=palette[codes % len(palette)], size_divisor=10, linewidths=0.5,
+    )
+    ax.set_title(f"Fixations of all participants on {stimulus.name}", fontsize=14)
+
+    if len(names) <= legend_limit:
+        handles = [
+            Line2D(
+                [], [], marker="o", linestyle="", markeredgecolor="white",
+                markerfacecolor=palette[i % len(palette)], alpha=0.6, label=name,
+            )
+            for i, name in enumerate(names)
+        ]
+        # Legend outside plot
+        ax.legend(
+            handles=handles,
+            title="Participants",
+            loc="center left",
+            bbox_to_anchor=(1.05, 0.5),
+            fontsize=9,
+            title_fontsize=10,
+            frameon=True,
+        )
+    # Ensure layout fits both image and legend
+    fig.subplots_adjust(right=0.8, top=0.95, bottom=0.1)
+    return fig
+
+
+@stage("build figure")
+def pyramid_figure(
+    grid: np.ndarray,
+    bounds: tuple[float, float, float, float],
+    stimulus: Stimulus,
+    title: str,
+    *,
+    fig: Figure | None = None,
+) -> Figure:
+    """Heatmap figure of a density ``grid`` from a :class:`~gazeplot.pyramid.GridPyramid`.
+
+    The axes are limited to ``bounds`` (see :func:`draw_heatmap`), so a
+    zoomed view shows only that part of the stimulus.
+    """
+    fig = fig if fig is not None else new_figure((8, 8))
+    ax = fig.add_subplot()
+    draw_stimulus(ax, stimulus, aspect="auto")
+    draw_heatmap(ax, grid, stimulus, bounds=bounds)
+    w, h = stimulus.size
+    x0, y0, x1, y1 = bounds
+    ax.set_xlim(x0 * w, x1 * w)
+    ax.set_ylim(h - y1 * h, h - y0 * h)
+    ax.set_title(title, fontsize=14)
+    fig.subplots_adjust(top=0.95, bottom=0.1)
+    return fig
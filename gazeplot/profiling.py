@@ -0,0 +1,148 @@
+"""Per-stage timing and memory instrumentation.
+
+Pipeline stages wrap their work in :func:`stage`. While a :class:`Profiler` is
+active (``with Profiler() as prof: ...`` or ``gazeplot --profile``), each stage
+records wall time, CPU time, how far the stage raised the process' peak RSS
+and the number of rows it produced; otherwise :func:`stage` costs next to
+nothing. Repeated stages (e.g. one render per participant) are summed, except
+for the peak RSS growth, which is the largest of any call. The peak RSS of the
+whole process is reported once, next to the stages.
+
+Only the calling process is measured: figures rendered in batch worker
+processes show up as a single ``batch`` stage unless ``-j 1`` is used.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+_active: Profiler | None = None
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process in MiB (``None`` if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+@dataclass
+class StageRecord:
+    """Accumulated measurements of one named stage."""
+
+    name: str
+    calls: int = 0
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    peak_rss_growth_mb: float | None = None  # rise of the process peak RSS
+    rows: int | None = None
+
+
+class _Rows:
+    """Handle yielded by :func:`stage` to report the rows a stage produced."""
+
+    __slots__ = ("rows",)
+
+    def __init__(self) -> None:
+        self.rows: int | None = None
+
+
+class Profiler:
+    """Collects :class:`StageRecord` s while active; optionally runs cProfile."""
+
+    def __init__(self, cprofile: bool = False):
+        self.stages: dict[str, StageRecord] = {}
+        self._cprofile = cProfile.Profile() if cprofile else None
+        self._started = 0.0
+        self._cpu_started = 0.0
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+
+    def __enter__(self) -> Profiler:
+        global _active
+        _active = self
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        global _active
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        self.wall_s = time.perf_counter() - self._started
+        self.cpu_s = time.process_time() - self._cpu_started
+        _active = None
+
+    def record(
+        self, name: str, wall: float, cpu: float, rows: int | None, peak_before: float | None
+    ) -> None:
+        entry = self.stages.setdefault(name, StageRecord(name))
+        entry.calls += 1
+        entry.wall_s += wall
+        entry.cpu_s += cpu
+        peak = peak_rss_mb()
+        if peak is not None and peak_before is not None:
+            entry.peak_rss_growth_mb = max(entry.peak_rss_growth_mb or 0.0, peak - peak_before)
+        if rows is not None:
+            entry.rows = (entry.rows or 0) + rows
+
+    def report(self) -> dict:
+        """JSON-serializable summary of all stages."""
+        return {
+            "pid": os.getpid(),
+            "wall_s": self.wall_s,
+            "cpu_s": self.cpu_s,
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": [asdict(entry) for entry in self.stages.values()],
+        }
+
+    def write_report(self, path: str | os.PathLike) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.report(), fh, indent=1)
+
+    def dump_cprofile(self, path: str | os.PathLike) -> None:
+        """Write cProfile stats (for pstats, snakeviz, flameprof or gprof2dot)."""
+        if self._cprofile is None:
+            raise ValueError("Profiler was created without cprofile=True!")
+        self._cprofile.dump_stats(os.fspath(path))
+
+
+@contextmanager
+def stage(name: str):
+    """Measure the enclosed block as pipeline stage ``name``.
+
+    Yields a handle whose ``rows`` attribute the block may set::
+
+        with stage("load") as st:
+            df = ...
+            st.rows = len(df)
+    """
+    rows = _Rows()
+    profiler = _active
+    if profiler is None:
+        yield rows
+        return
+    peak = peak_rss_mb()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield rows
+    finally:
+        profiler.record(
+            name, time.perf_counter() - wall, time.process_time() - cpu, rows.rows, peak
+        )
@@ -0,0 +1,285 @@
+"""Precomputed multi-resolution fixation grids (a heatmap pyramid).
+
+:func:`build_pyramid` bins the fixations of every participant on one stimulus
+once into a fixation-count and a dwell-time grid. Level 0 has one cell per
+``cell`` stimulus pixels; every further level halves the resolution, so a cell
+of level k is the sum of 2×2 cells of level k - 1. A participant looks at a
+few hundred cells at most, so the per-participant grids are stored sparse, in
+compressed rows (one row per participant), next to the dense cohort total::
+
+    <stimulus>.grid/
+        meta.json          stimulus, size, cell size, level shapes, participants
+        indptr<k>.npy      int64, cells of participant i are [indptr[i], indptr[i + 1])
+        cells<k>.npy       uint32 flat cell index (row * columns + column)
+        count<k>.npy       uint32 fixation count of each stored cell
+        dwell<k>.npy       float32 dwell time (ms) of each stored cell
+        total_count<k>.npy dense counts of all participants
+        total_dwell<k>.npy
+
+:class:`GridPyramid` memory-maps the arrays. The heatmap of the whole cohort
+is the stored total, so its cost depends only on the grid size. A participant
+subset adds the stored cells of its members, which at coarse levels are
+bounded by the grid size as well, rather than re-binning their fixations.
+Zoomed views read the level that matches the requested output resolution and
+crop it.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import shutil
+import tempfile
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import columns as col
+from .heatmap import DEFAULT_SIGMA, smooth
+from .profiling import stage
+
+FORMAT_VERSION = 1
+SUFFIX = ".grid"
+DEFAULT_CELL = 4  # stimulus pixels per level 0 cell
+DEFAULT_LEVELS = 5
+COUNT = "count"
+DWELL = "dwell"
+KINDS = (COUNT, DWELL)
+
+_DTYPES = {COUNT: np.uint32, DWELL: np.float32}
+
+
+def level_shapes(size: tuple[int, int], cell: int, levels: int) -> list[tuple[int, int]]:
+    """``(rows, columns)`` of each level for a stimulus of ``size`` = ``(width, height)``."""
+    w, h = size
+    shapes = [(math.ceil(h / cell), math.ceil(w / cell))]
+    for _ in range(1, levels):
+        rows, cols = shapes[-1]
+        shapes.append((math.ceil(rows / 2), math.ceil(cols / 2)))
+    return shapes
+
+
+def build_pyramid(
+    fix: pd.DataFrame,
+    size: tuple[int, int],
+    directory: str | os.PathLike,
+    *,
+    stimulus: str | None = None,
+    cell: int = DEFAULT_CELL,
+    levels: int = DEFAULT_LEVELS,
+) -> GridPyramid:
+    """Write the count and dwell pyramid of the fixations ``fix`` to ``directory``.
+
+    ``fix`` holds the fixations on one stimulus of ``size`` = ``(width,
+    height)`` pixels. Every level is one sort of the fixations by participant
+    and cell, so the cost grows with the number of fixations, not with the
+    number of cells times participants.
+    """
+    directory = Path(directory)
+    shapes = level_shapes(size, cell, levels)
+    participants = fix[col.PARTICIPANT].astype("category").cat.remove_unused_categories()
+    names = [str(name) for name in participants.cat.categories]
+
+    w, h = size
+    x = fix[col.FIXATION_X].to_numpy(dtype=np.float64) * w
+    y = fix[col.FIXATION_Y].to_numpy(dtype=np.float64) * h
+    inside = (x >= 0) & (x < w) & (y >= 0) & (y < h)
+    codes = participants.cat.codes.to_numpy().astype(np.int64)[inside]
+    rows0 = (y[inside] // cell).astype(np.int64)
+    cols0 = (x[inside] // cell).astype(np.int64)
+    dwell = fix[col.GAZE_EVENT_DURATION].to_numpy(dtype=np.float64)[inside]
+
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(dir=directory.parent, prefix=directory.name, suffix=".tmp"))
+    try:
+        with stage("build pyramid") as st:
+            for level, (rows, cols) in enumerate(shapes):
+                cells = (rows0 >> level) * cols + (cols0 >> level)
+                keys, inverse = np.unique(codes * (rows * cols) + cells, return_inverse=True)
+                counts = np.bincount(inverse, minlength=len(keys))
+                sums = np.bincount(inverse, dwell, minlength=len(keys))
+                indptr = np.searchsorted(keys // (rows * cols), np.arange(len(names) + 1))
+                flat = keys % (rows * cols)
+                np.save(tmp / f"indptr{level}.npy", indptr.astype(np.int64))
+                np.save(tmp / f"cells{level}.npy", flat.astype(np.uint32))
+                np.save(tmp / f"{COUNT}{level}.npy", counts.astype(_DTYPES[COUNT]))
+                np.save(tmp / f"{DWELL}{level}.npy", sums.astype(_DTYPES[DWELL]))
+                for kind, values in ((COUNT, counts), (DWELL, sums)):
+                    total = np.bincount(flat, values, minlength=rows * cols).reshape(rows, cols)
+                    np.save(tmp / f"total_{kind}{level}.npy", total.astype(_DTYPES[kind]))
+            st.rows = len(fix)
+
+        meta = {
+            "version": FORMAT_VERSION,
+            "stimulus": stimulus,
+            "size": [w, h],
+            "cell": cell,
+            "shapes": [list(shape) for shape in shapes],
+            "participants": names,
+            "fixations": int(inside.sum()),
+        }
+        (tmp / "meta.json").write_text(json.dumps(meta, indent=1))
+        if directory.exists():
+            shutil.rmtree(directory)
+        os.replace(tmp, directory)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return GridPyramid(directory)
+
+
+class GridPyramid:
+    """Read-only, memory-mapped view of a pyramid written by :func:`build_pyramid`."""
+
+    def __init__(self, directory: str | os.PathLike):
+        self.directory = Path(directory)
+        self.meta = json.loads((self.directory / "meta.json").read_text())
+        if self.meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{self.directory}: unsupported pyramid version")
+        self._index = {name: i for i, name in enumerate(self.meta["participants"])}
+        self._arrays: dict[str, np.ndarray] = {}
+
+    def __repr__(self) -> str:
+        return f"GridPyramid({str(self.directory)!r}, participants={len(self.participants)})"
+
+    @property
+    def participants(self) -> list[str]:
+        return list(self.meta["participants"])
+
+    @property
+    def stimulus(self) -> str | None:
+        return self.meta["stimulus"]
+
+    @property
+    def size(self) -> tuple[int, int]:
+        """``(width, height)`` of the stimulus in pixels."""
+        w, h = self.meta["size"]
+        return w, h
+
+    @property
+    def levels(self) -> int:
+        return len(self.meta["shapes"])
+
+    def shape(self, level: int) -> tuple[int, int]:
+        rows, cols = self.meta["shapes"][level]
+        return rows, cols
+
+    def cell_size(self, level: int) -> int:
+        """Stimulus pixels per cell side at ``level``."""
+        return self.meta["cell"] * 2 ** level
+
+    def level_for(self, width: int, x0: float = 0.0, x1: float = 1.0) -> int:
+        """Coarsest level with at least ``width`` cells across ``x0 .. x1`` (normalized)."""
+        for level in reversed(range(self.levels)):
+            if self.size[0] * (x1 - x0) / self.cell_size(level) >= width:
+                return level
+        return 0
+
+    def _array(self, name: str) -> np.ndarray:
+        if name not in self._arrays:
+            self._arrays[name] = np.load(self.directory / f"{name}.npy", mmap_mode="r")
+        return self._arrays[name]
+
+    def grid(
+        self, level: int = 0, participants: Iterable[str] | None = None, kind: str = DWELL
+    ) -> np.ndarray:
+        """Sum of the ``kind`` grids of ``participants`` (default: everyone) at ``level``.
+
+        Unknown participant names raise ``KeyError``.
+        """
+        return self._sum(level, participants, kind, (slice(None), slice(None)))
+
+    def _sum(
+        self, level: int, participants: Iterable[str] | None, kind: str, cells: tuple[slice, slice]
+    ) -> np.ndarray:
+        if kind not in KINDS:
+            raise ValueError(f"Unknown grid kind {kind!r}")
+        if participants is None:
+            return np.asarray(self._array(f"total_{kind}{level}")[cells], dtype=np.float64)
+        rows = np.unique(np.fromiter((self._index[p] for p in participants), dtype=np.intp))
+        indptr = self._array(f"indptr{level}")
+        starts, stops = indptr[rows], indptr[rows + 1]
+        # Positions of the stored cells of all selected participants
+        lengths = stops - starts
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        stored = offsets + np.arange(lengths.sum())
+        shape = self.shape(level)
+        flat = self._array(f"cells{level}")[stored]
+        values = self._array(f"{kind}{level}")[stored].astype(np.float64)
+        return np.bincount(flat, values, minlength=math.prod(shape)).reshape(shape)[cells]
+
+    def _cells(self, bounds: Sequence[float], level: int) -> tuple[slice, slice]:
+        """Row and column slices of the cells of ``level`` overlapping ``bounds``."""
+        x0, y0, x1, y1 = bounds
+        rows, cols = self.shape(level)
+        w, h = self.size
+        cell = self.cell_size(level)
+        r0, c0 = min(rows - 1, math.floor(y0 * h / cell)), min(cols - 1, math.floor(x0 * w / cell))
+        r1 = max(r0 + 1, min(rows, math.ceil(y1 * h / cell)))
+        c1 = max(c0 + 1, min(cols, math.ceil(x1 * w / cell)))
+        return slice(r0, r1), slice(c0, c1)
+
+    def _bounds(self, cells: tuple[slice, slice], level: int) -> tuple[float, float, float, float]:
+        """Normalized ``(x0, y0, x1, y1)`` of ``cells``; the last cell may overhang the stimulus."""
+        rows, cols = cells
+        w, h = self.size
+        cell = self.cell_size(level)
+        return (
+            cols.start * cell / w, rows.start * cell / h,
+            min(1.0, cols.stop * cell / w), min(1.0, rows.stop * cell / h),
+        )
+
+    def view(
+        self,
+        bounds: Sequence[float] = (0.0, 0.0, 1.0, 1.0),
+        level: int = 0,
+        participants: Iterable[str] | None = None,
+        kind: str = DWELL,
+    ) -> tuple[np.ndarray, tuple[float, float, float, float]]:
+        """Crop of :meth:`grid` covering ``bounds`` = ``(x0, y0, x1, y1)``, normalized.
+
+        ``y`` runs from the top of the stimulus. Returns the crop and its
+        bounds snapped outwards to whole cells.
+        """
+        cells = self._cells(bounds, level)
+        return self._sum(level, participants, kind, cells), self._bounds(cells, level)
+
+    def density(
+        self,
+        bounds: Sequence[float] = (0.0, 0.0, 1.0, 1.0),
+        level: int = 0,
+        participants: Iterable[str] | None = None,
+        kind: str = DWELL,
+        sigma: float = DEFAULT_SIGMA,
+    ) -> tuple[np.ndarray, tuple[float, float, float, float]]:
+        """Smoothed :meth:`view`; ``sigma`` is in stimulus pixels.
+
+        The view is smoothed with a margin of three sigma around it, so
+        fixations just outside a zoomed view still contribute to its edges.
+        """
+        with stage("heatmap") as st:
+            scaled = sigma / self.cell_size(level)
+            rows, cols = self._cells(bounds, level)
+            height, width = self.shape(level)
+            margin = math.ceil(3 * scaled)
+            outer = (
+                slice(max(0, rows.start - margin), min(height, rows.stop + margin)),
+                slice(max(0, cols.start - margin), min(width, cols.stop + margin)),
+            )
+            grid = self._sum(level, participants, kind, outer).astype(np.float32)
+            grid = smooth(grid, scaled)[
+                rows.start - outer[0].start:rows.stop - outer[0].start,
+                cols.start - outer[1].start:cols.stop - outer[1].start,
+            ]
+            st.rows = grid.size
+        return grid, self._bounds((rows, cols), level)
+
+
+def pyramid_path(directory: str | os.PathLike, stimulus: str) -> Path:
+    """Location of the pyramid of ``stimulus`` inside ``directory``."""
+    from .plot import slugify
+
+    return Path(directory) / f"{slugify(stimulus)}{SUFFIX}"
@@ -0,0 +1,191 @@
+"""Quality stage: tracking ratio, sample validity and calibration accuracy.
+
+The export marks every eye tracker sample with ``Validity left/right`` and
+repeats the calibration and validation results of the recording on each row.
+:func:`recording_quality` reports these per recording, and
+:class:`QualityRules` turns them into exclusion rules:
+
+- ``min_tracking``: share of eye tracker samples with at least one valid eye
+  (``EyesNotFound`` gaps lower it); recordings below are dropped.
+- ``max_accuracy``: ``Average validation accuracy (degrees)``; recordings
+  with a larger error are dropped (recordings without validation are kept).
+- ``min_validity``: share of valid samples within a fixation; fixations
+  below are dropped.
+
+:func:`quality_mask` evaluates the rules as one boolean row mask, which
+:func:`gazeplot.filters.fixation_mask` combines with the stimulus and
+participant predicates, so excluded recordings never reach the event,
+rendering or statistics stages. Streamed exports see one block at a time;
+:class:`QualityTally` keeps the counts the rules need and applies them to
+the finished event table instead.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from . import columns as col
+from .events import EVENT_KEYS
+
+RECORDING_KEYS = [col.PARTICIPANT, col.RECORDING]
+
+# Columns the rules read in addition to the plot columns
+QUALITY_COLUMNS = [
+    col.SENSOR,
+    col.VALIDITY_LEFT,
+    col.VALIDITY_RIGHT,
+    col.CALIBRATION_ACCURACY,
+    col.VALIDATION_ACCURACY,
+]
+
+# Columns of the quality report
+EYE_SAMPLES = "Eye tracker samples"
+TRACKING_RATIO = "Tracking ratio"
+EYES_NOT_FOUND = "EyesNotFound samples"
+FIXATION_VALIDITY = "Mean fixation validity"
+EXCLUDED = "Excluded"
+
+_VALID = "_valid"
+_EYE = "_eye"
+
+
+@dataclass(frozen=True)
+class QualityRules:
+    """Exclusion thresholds; ``None`` disables a rule."""
+
+    min_tracking: float | None = None
+    max_accuracy: float | None = None
+    min_validity: float | None = None
+
+    def __bool__(self) -> bool:
+        return any(v is not None for v in (self.min_tracking, self.max_accuracy, self.min_validity))
+
+
+def valid_samples(df: pd.DataFrame) -> pd.Series:
+    """Whether each row is an eye tracker sample with at least one valid eye."""
+    eye = df[col.SENSOR] == col.EYE_TRACKER
+    either = (df[col.VALIDITY_LEFT] == col.VALID) | (df[col.VALIDITY_RIGHT] == col.VALID)
+    return (eye & either).fillna(False).astype(bool)
+
+
+def _eye_samples(df: pd.DataFrame) -> pd.Series:
+    return (df[col.SENSOR] == col.EYE_TRACKER).fillna(False).astype(bool)
+
+
+def _ratio(valid: pd.Series, counted: pd.Series, keys: list[str], df: pd.DataFrame) -> pd.Series:
+    """Share of ``valid`` among the ``counted`` rows of each ``keys`` group, per row."""
+    values = valid.astype(np.float32).where(counted)
+    return values.groupby([df[k] for k in keys], observed=True, sort=False).transform("mean")
+
+
+def quality_mask(df: pd.DataFrame, rules: QualityRules) -> pd.Series:
+    """Boolean mask of the rows of ``df`` that pass ``rules``.
+
+    ``df`` must hold the :data:`QUALITY_COLUMNS` and whole recordings, since
+    the tracking ratio and fixation validity are computed over all of their rows.
+    """
+    mask = pd.Series(True, index=df.index)
+    if not rules:
+        return mask
+    if rules.max_accuracy is not None:
+        mask &= ~(df[col.VALIDATION_ACCURACY] > rules.max_accuracy)
+    if rules.min_tracking is None and rules.min_validity is None:
+        return mask
+    valid = valid_samples(df)
+    eye = _eye_samples(df)
+    if rules.min_tracking is not None:
+        mask &= _ratio(valid, eye, RECORDING_KEYS, df) >= rules.min_tracking
+    if rules.min_validity is not None:
+        on_fixation = eye & (df[col.EYE_MOVEMENT_TYPE] == col.FIXATION)
+        mask &= _ratio(valid, on_fixation, EVENT_KEYS, df) >= rules.min_validity
+    return mask
+
+
+def recording_quality(df: pd.DataFrame, rules: QualityRules | None = None) -> pd.DataFrame:
+    """Per-recording quality report of the sample rows in ``df``.
+
+    Lists the number of eye tracker samples, the tracking ratio, the
+    ``EyesNotFound`` samples, the mean validity of the fixations and the
+    calibration and validation accuracy (degrees). With ``rules``, an
+    ``Excluded`` column marks the recordings :func:`quality_mask` drops
+    entirely.
+    """
+    eye = _eye_samples(df)
+    on_fixation = eye & (df[col.EYE_MOVEMENT_TYPE] == col.FIXATION)
+    valid = valid_samples(df)
+    work = pd.DataFrame({
+        **{k: df[k] for k in RECORDING_KEYS},
+        _EYE: eye,
+        _VALID: valid.where(eye),
+        EYES_NOT_FOUND: eye & (df[col.EYE_MOVEMENT_TYPE] == "EyesNotFound"),
+        FIXATION_VALIDITY: _ratio(valid, on_fixation, EVENT_KEYS, df).where(on_fixation),
+        col.CALIBRATION_ACCURACY: df[col.CALIBRATION_ACCURACY],
+        col.VALIDATION_ACCURACY: df[col.VALIDATION_ACCURACY],
+    })
+    report = work.groupby(RECORDING_KEYS, sort=True, observed=True).agg(**{
+        EYE_SAMPLES: (_EYE, "sum"),
+        TRACKING_RATIO: (_VALID, "mean"),
+        EYES_NOT_FOUND: (EYES_NOT_FOUND, "sum"),
+        FIXATION_VALIDITY: (FIXATION_VALIDITY, "mean"),
+        col.CALIBRATION_ACCURACY: (col.CALIBRATION_ACCURACY, "first"),
+        col.VALIDATION_ACCURACY: (col.VALIDATION_ACCURACY, "first"),
+    })
+    if rules is not None:
+        kept = df.loc[quality_mask(df, rules), RECORDING_KEYS].drop_duplicates()
+        kept = pd.MultiIndex.from_frame(kept)
+        report[EXCLUDED] = ~report.index.isin(kept)
+    return report.reset_index()
+
+
+class QualityTally:
+    """Counts for applying :class:`QualityRules` to an export read in blocks.
+
+    Feed every block and its fixation mask to :meth:`update`, then filter
+    the finished event table with :meth:`apply`.
+    """
+
+    def __init__(self, rules: QualityRules):
+        self.rules = rules
+        self._recordings: list[pd.DataFrame] = []
+        self._events: list[pd.DataFrame] = []
+
+    def update(self, chunk: pd.DataFrame, fixations: pd.Series) -> None:
+        valid = valid_samples(chunk)
+        eye = _eye_samples(chunk)
+        if self.rules.min_tracking is not None:
+            counts = pd.DataFrame({k: chunk[k] for k in RECORDING_KEYS})[eye]
+            counts[_VALID] = valid[eye]
+            self._recordings.append(
+                counts.groupby(RECORDING_KEYS, observed=True).agg(**{
+                    _VALID: (_VALID, "sum"), _EYE: (_VALID, "size"),
+                })
+            )
+        if self.rules.min_validity is not None:
+            rows = fixations & eye
+            counts = pd.DataFrame({k: chunk[k] for k in EVENT_KEYS})[rows]
+            counts[_VALID] = valid[rows]
+            self._events.append(
+                counts.groupby(EVENT_KEYS, observed=True).agg(**{
+                    _VALID: (_VALID, "sum"), _EYE: (_VALID, "size"),
+                })
+            )
+
+    @staticmethod
+    def _passing(parts: list[pd.DataFrame], threshold: float) -> pd.Index:
+        counts = pd.concat(parts)
+        counts = counts.groupby(level=list(range(counts.index.nlevels)), observed=True).sum()
+        return counts.index[counts[_VALID] / counts[_EYE] >= threshold]
+
+    def apply(self, events: pd.DataFrame) -> pd.DataFrame:
+        """The rows of the event table ``events`` that pass the rules."""
+        keep = np.ones(len(events), dtype=bool)
+        if self.rules.min_tracking is not None and self._recordings:
+            passing = self._passing(self._recordings, self.rules.min_tracking)
+            keep &= pd.MultiIndex.from_frame(events[RECORDING_KEYS]).isin(passing)
+        if self.rules.min_validity is not None and self._events:
+            passing = self._passing(self._events, self.rules.min_validity)
+            keep &= pd.MultiIndex.from_frame(events[EVENT_KEYS]).isin(passing)
+        return events[keep].reset_index(drop=True)
@@ -0,0 +1,196 @@
+"""Compact fixation container for code that loops over fixations in Python.
+
+Iterating over the rows of a fixation table with pandas (``iterrows``,
+``itertuples``, ``df.loc[i]``) builds a Series or tuple per row and converts
+every value on the way. :class:`FixationArray` keeps the same fixations as one
+NumPy array per field (a struct of arrays) instead: participant, recording and
+stimulus as small integer codes into name tuples, the event index and
+timestamps as ``int64``, the duration as ``float32`` like the export and the
+centroid as ``float64``.
+
+The fixations are ordered by participant and start time, so the fixations of
+a participant are one contiguous block and a time range within it is found by
+binary search. :meth:`FixationArray.participant` and plain slices return views
+that share the arrays; :meth:`FixationArray.between` returns a view for a
+single participant and a copy otherwise. Iterating yields :class:`Fixation`
+records, small ``__slots__`` objects built from column chunks converted with
+``tolist``, so a loop over millions of fixations pays for one object per
+fixation and no pandas call.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import numpy as np
+import pandas as pd
+
+from . import columns as col
+
+FIELDS = ("participant", "recording", "stimulus", "index", "start", "end", "duration", "x", "y")
+
+_NAMED = {"participant": col.PARTICIPANT, "recording": col.RECORDING, "stimulus": col.STIMULUS}
+_VALUES = {
+    "index": (col.EYE_MOVEMENT_INDEX, np.int64),
+    "start": (col.START, np.int64),
+    "end": (col.END, np.int64),
+    "duration": (col.GAZE_EVENT_DURATION, np.float32),
+    "x": (col.FIXATION_X, np.float64),
+    "y": (col.FIXATION_Y, np.float64),
+}
+# Attribute of each field in FixationArray; names are stored as codes
+_ARRAYS = {name: f"{name}_codes" if name in _NAMED else name for name in FIELDS}
+_CHUNK = 65_536  # rows converted to Python objects at once while iterating
+
+
+class Fixation:
+    """One fixation event; ``x`` and ``y`` are normalized (``MCSnorm``), times in ms."""
+
+    __slots__ = FIELDS
+
+    def __init__(self, participant, recording, stimulus, index, start, end, duration, x, y):
+        self.participant = participant
+        self.recording = recording
+        self.stimulus = stimulus
+        self.index = index
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.x = x
+        self.y = y
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in FIELDS)
+        return f"Fixation({values})"
+
+
+class FixationArray:
+    """Struct-of-arrays fixation table; build one with :meth:`from_frame`.
+
+    ``participant_codes``, ``recording_codes`` and ``stimulus_codes`` index
+    the ``*_names`` tuples, whose last entry is ``None`` for missing names.
+    The other fields are arrays of the same name.
+    """
+
+    __slots__ = (
+        *_ARRAYS.values(), "participant_names", "recording_names", "stimulus_names", "_offsets"
+    )
+
+    def __init__(self, arrays: dict[str, np.ndarray], names: dict[str, tuple[str | None, ...]]):
+        for name, attr in _ARRAYS.items():
+            setattr(self, attr, arrays[name])
+        for name in _NAMED:
+            setattr(self, f"{name}_names", names[name])
+        # Start of each participant's block; participant codes are sorted
+        self._offsets = np.searchsorted(
+            self.participant_codes, np.arange(len(self.participant_names) + 1)
+        )
+
+    @classmethod
+    def from_frame(cls, fix: pd.DataFrame) -> FixationArray:
+        """Container of the fixation table ``fix`` (see :mod:`gazeplot.events`)."""
+        arrays: dict[str, np.ndarray] = {}
+        names: dict[str, tuple[str | None, ...]] = {}
+        for name, column in _NAMED.items():
+            values = fix[column].astype("category")
+            names[name] = (*map(str, values.cat.categories), None)
+            codes = values.cat.codes.to_numpy().astype(np.int32)
+            codes[codes < 0] = len(names[name]) - 1
+            arrays[name] = codes
+        for name, (column, dtype) in _VALUES.items():
+            arrays[name] = fix[column].to_numpy(dtype=dtype)
+        order = np.lexsort((arrays["start"], arrays["participant"]))
+        return cls({name: values[order] for name, values in arrays.items()}, names)
+
+    def _take(self, rows) -> FixationArray:
+        names = {name: getattr(self, f"{name}_names") for name in _NAMED}
+        return FixationArray({name: getattr(self, attr)[rows] for name, attr in _ARRAYS.items()}, names)
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def __repr__(self) -> str:
+        return f"FixationArray({len(self)} fixations, {len(self.participants)} participants)"
+
+    def __getitem__(self, item):
+        """A :class:`Fixation` for an integer; a view for a slice; a copy for a mask.
+
+        Integer index arrays are sorted first, which keeps the participant
+        and time order every :class:`FixationArray` relies on.
+        """
+        if isinstance(item, (int, np.integer)):
+            i = range(len(self))[item]
+            return Fixation(*(self._value(name, i) for name in FIELDS))
+        if isinstance(item, slice):
+            if item.step not in (None, 1):
+                raise ValueError("FixationArray slices must be contiguous")
+            return self._take(item)
+        rows = np.asarray(item)
+        if rows.dtype != bool:
+            rows = np.sort(rows)
+        return self._take(rows)
+
+    def _value(self, name: str, i: int):
+        value = getattr(self, _ARRAYS[name])[i].item()
+        if name in _NAMED:
+            return getattr(self, f"{name}_names")[value]
+        return value
+
+    def __iter__(self) -> Iterator[Fixation]:
+        lookups = {name: getattr(self, f"{name}_names") for name in _NAMED}
+        for first in range(0, len(self), _CHUNK):
+            chunk = slice(first, first + _CHUNK)
+            columns = []
+            for name in FIELDS:
+                values = getattr(self, _ARRAYS[name])[chunk].tolist()
+                if name in lookups:
+                    values = map(lookups[name].__getitem__, values)
+                columns.append(values)
+            yield from map(Fixation, *columns)
+
+    @property
+    def participants(self) -> list[str | None]:
+        """Participants with at least one fixation, in order."""
+        counts = np.diff(self._offsets)
+        return [self.participant_names[code] for code in np.flatnonzero(counts)]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, attr).nbytes for attr in _ARRAYS.values())
+
+    def participant(self, name: str) -> FixationArray:
+        """View of the fixations of participant ``name`` (empty when there are none)."""
+        try:
+            code = self.participant_names.index(name)
+        except ValueError:
+            return self[0:0]
+        return self[self._offsets[code]:self._offsets[code + 1]]
+
+    def iter_participants(self) -> Iterator[tuple[str | None, FixationArray]]:
+        """``(participant, view)`` pairs in participant order."""
+        for code in range(len(self._offsets) - 1):
+            first, last = self._offsets[code], self._offsets[code + 1]
+            if last > first:
+                yield self.participant_names[code], self[first:last]
+
+    def between(self, start: float, end: float) -> FixationArray:
+        """Fixations that start in ``[start, end)`` (``Recording timestamp`` ms).
+
+        Within one participant the start times are sorted, so the range is
+        found by binary search and returned as a view; across participants
+        it is a vectorized mask.
+        """
+        if len(self.participants) <= 1:
+            lo, hi = np.searchsorted(self.start, [start, end])
+            return self[int(lo):int(hi)]
+        return self._take((self.start >= start) & (self.start < end))
+
+    def to_frame(self) -> pd.DataFrame:
+        """The fixations as a table with the export column names."""
+        frame = {}
+        for name, column in _NAMED.items():
+            codes, names = getattr(self, _ARRAYS[name]), getattr(self, f"{name}_names")
+            codes = np.where(codes == len(names) - 1, -1, codes)
+            frame[column] = pd.Categorical.from_codes(codes, categories=list(names[:-1]))
+        frame.update({column: getattr(self, name) for name, (column, _) in _VALUES.items()})
+        return pd.DataFrame(frame)
@@ -0,0 +1,87 @@
+"""Reusable headless renderer for per-participant figures.
+
+Building a figure — axes, the decoded stimulus as ``imshow`` background,
+labels and layout — dominates the cost of a single plot. ``FigureRenderer``
+builds one Agg figure per stimulus and, for every participant, only swaps
+the data of the fixation artists before saving. pyplot is never imported.
+"""
+
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import columns as col
+from .plot import draw_heatmap, draw_stimulus, new_figure
+from .profiling import stage
+from .stimulus import Stimulus
+
+
+class FigureRenderer:
+    """One reusable figure for rendering many participants on ``stimulus``."""
+
+    def __init__(
+        self,
+        stimulus: Stimulus,
+        *,
+        mode: str = "scatter",
+        sigma: float | None = None,
+        figsize: tuple[float, float] = (6, 6),
+        size_divisor: float = 5,
+    ):
+        self.stimulus = stimulus
+        self.mode = mode
+        self.sigma = sigma
+        self.size_divisor = size_divisor
+        with stage("build figure"):
+            self.figure = new_figure(figsize)
+            self.ax = self.figure.add_subplot()
+            draw_stimulus(self.ax, stimulus)
+
+            if mode == "heatmap":
+                empty = np.zeros((stimulus.height, stimulus.width), dtype=np.float32)
+                self.artist = draw_heatmap(self.ax, empty, stimulus)
+            else:
+                self.artist = self.ax.scatter(
+                    [], [], c="red", edgecolors="white", alpha=0.6
+                )
+            self.title = self.ax.set_title(" ", fontsize=14)
+            self.figure.tight_layout()
+
+    def update(self, fix: pd.DataFrame, participant: str) -> None:
+        """Show the fixations of ``participant`` (``fix`` holds only theirs)."""
+        with stage("draw") as st:
+            self._update(fix, participant)
+            st.rows = len(fix)
+
+    def _update(self, fix: pd.DataFrame, participant: str) -> None:
+        w, h = self.stimulus.size
+        if self.mode == "heatmap":
+            from .heatmap import DEFAULT_SIGMA, density
+
+            grid = density(fix, self.stimulus, self.sigma or DEFAULT_SIGMA)
+            peak = float(grid.max()) if grid.size else 0.0
+            self.artist.set_data(np.ma.masked_less_equal(grid, peak * 0.05))
+            self.artist.set_clim(0, peak or 1)
+            self.title.set_text(f"Fixation heatmap of {participant} on '{self.stimulus.name}'")
+        else:
+            x = fix[col.FIXATION_X].to_numpy(dtype=np.float64) * w
+            y = fix[col.FIXATION_Y].to_numpy(dtype=np.float64) * h
+            # Invert Y to match image coordinate system
+            self.artist.set_offsets(np.column_stack([x, h - y]))
+            self.artist.set_sizes(fix[col.GAZE_EVENT_DURATION].to_numpy() / self.size_divisor)
+            self.title.set_text(f"Fixations of {participant} on '{self.stimulus.name}'")
+
+    def save(self, path: str | os.PathLike, dpi: float | None = None) -> None:
+        """Write the current figure; the format follows the file extension."""
+        with stage("save"):
+            self.figure.savefig(path, dpi=dpi)
+
+    def render(
+        self, fix: pd.DataFrame, participant: str, path: str | os.PathLike, dpi: float | None = None
+    ) -> None:
+        """:meth:`update` and :meth:`save` in one call."""
+        self.update(fix, participant)
+        self.save(path, dpi)
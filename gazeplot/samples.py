@@ -0,0 +1,306 @@
+"""Memory-mapped store of the raw gaze samples of a recording.
+
+Sample-level analyses (own fixation filters, pupillometry) need the eye
+tracker rows of an export, not the fixation events. :func:`convert_recording`
+streams an export once and writes its numeric sample columns as a
+struct-of-arrays directory::
+
+    <recording>-<path hash>.gaze/
+        meta.json        row count, columns, stimulus intervals, source hash
+        timestamp.i8     "Recording timestamp" in ms, ascending (the index)
+        stimulus.i2      code of "Presented Stimulus name" (-1: none)
+        <column>.f4      one float32 array per sample column
+
+:class:`SampleStore` memory-maps these files. Time windows are located by a
+binary search on the timestamp index and returned as zero-copy NumPy views,
+so only the pages of the requested window are ever read from disk.
+
+The validity columns are stored as 1.0 (valid), 0.0 (invalid) or NaN.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from collections.abc import Iterable, Sequence
+from contextlib import ExitStack
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import columns as col
+from .cache import _atomic_write, default_cache_dir, file_digest
+from .loader import ENCODING
+from .profiling import stage
+from .schema import dtypes_for
+
+FORMAT_VERSION = 1
+SUFFIX = ".gaze"
+DEFAULT_CHUNKSIZE = 200_000
+
+SAMPLE_COLUMNS = [
+    col.GAZE_X,
+    col.GAZE_Y,
+    col.GAZE_X_NORM,
+    col.GAZE_Y_NORM,
+    col.PUPIL_LEFT,
+    col.PUPIL_RIGHT,
+    col.VALIDITY_LEFT,
+    col.VALIDITY_RIGHT,
+    col.EYE_Z_LEFT,
+    col.EYE_Z_RIGHT,
+]
+
+_VALIDITY = {col.VALIDITY_LEFT, col.VALIDITY_RIGHT}
+_TIMESTAMP_FILE = "timestamp.i8"
+_STIMULUS_FILE = "stimulus.i2"
+
+
+def default_store_dir() -> Path:
+    """``samples`` below the recording cache directory."""
+    return default_cache_dir() / "samples"
+
+
+def store_path(path: str | os.PathLike, directory: str | os.PathLike | None = None) -> Path:
+    """Store directory of the export at ``path`` inside ``directory``.
+
+    The name carries a hash of the resolved path, so exports of the same
+    name in different directories get separate stores.
+    """
+    directory = Path(directory) if directory is not None else default_store_dir()
+    path = Path(path).resolve()
+    tag = hashlib.sha256(str(path).encode()).hexdigest()[:8]
+    return directory / f"{path.stem}-{tag}{SUFFIX}"
+
+
+def _file_name(column: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", column).strip("_").lower() + ".f4"
+
+
+def _as_float32(series: pd.Series) -> np.ndarray:
+    if series.name in _VALIDITY:
+        valid = (series == col.VALID).to_numpy(dtype=np.float32, na_value=np.nan)
+        return np.where(series.isna().to_numpy(), np.float32(np.nan), valid)
+    return series.to_numpy(dtype=np.float32, na_value=np.nan)
+
+
+def _intervals(codes: np.ndarray, names: Sequence[str]) -> dict[str, list[list[int]]]:
+    """Row ranges ``[start, stop)`` of each stimulus, from runs of equal codes."""
+    if len(codes) == 0:
+        return {}
+    edges = np.flatnonzero(np.diff(codes)) + 1
+    starts = np.concatenate([[0], edges])
+    stops = np.concatenate([edges, [len(codes)]])
+    runs: dict[str, list[list[int]]] = {}
+    for start, stop in zip(starts.tolist(), stops.tolist()):
+        code = int(codes[start])
+        if code >= 0:
+            runs.setdefault(names[code], []).append([start, stop])
+    return runs
+
+
+def convert_recording(
+    path: str | os.PathLike,
+    directory: str | os.PathLike | None = None,
+    columns: Sequence[str] = SAMPLE_COLUMNS,
+    *,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    force: bool = False,
+) -> SampleStore:
+    """Write the eye tracker samples of the export at ``path`` to a store.
+
+    The export is read in blocks of ``chunksize`` rows and every block is
+    appended to the column files, so memory stays bounded for any file size.
+    An existing store of the same file content and columns is reused unless
+    ``force`` is set; the content is only hashed again when the mtime or size
+    of the export changed since the store was written.
+    """
+    target = store_path(path, directory)
+    stat = Path(path).stat()
+    columns = list(columns)
+    digest = None
+    if not force and (target / "meta.json").exists():
+        store = SampleStore(target)
+        meta = store.meta
+        if store.columns == columns:
+            if meta.get("mtime_ns") == stat.st_mtime_ns and meta.get("size") == stat.st_size:
+                return store
+            digest = file_digest(path)
+            if meta.get("sha256") == digest:
+                # Touched but unchanged: remember the new stat for next time
+                meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                payload = json.dumps(meta, indent=1)
+                _atomic_write(target / "meta.json", lambda tmp: Path(tmp).write_text(payload))
+                return store
+    if digest is None:
+        digest = file_digest(path)
+
+    names = [col.RECORDING_TIMESTAMP, col.SENSOR, col.PARTICIPANT, col.RECORDING, col.STIMULUS]
+    names += [name for name in columns if name not in names]
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(dir=target.parent, prefix=target.name, suffix=".tmp"))
+    stimuli: dict[str, int] = {}
+    rows = 0
+    participant = recording = None
+    try:
+        with stage("convert samples") as st, ExitStack() as files:
+            out = {
+                name: files.enter_context(open(tmp / name, "wb"))
+                for name in [_TIMESTAMP_FILE, _STIMULUS_FILE, *map(_file_name, columns)]
+            }
+            reader = files.enter_context(pd.read_csv(
+                path, sep="\t", usecols=names, dtype=dtypes_for(names),
+                encoding=ENCODING, chunksize=chunksize,
+            ))
+            for chunk in reader:
+                chunk = chunk.loc[chunk[col.SENSOR] == col.EYE_TRACKER]
+                if chunk.empty:
+                    continue
+                if participant is None:
+                    participant = str(chunk[col.PARTICIPANT].iloc[0])
+                    recording = str(chunk[col.RECORDING].iloc[0])
+                stimulus = chunk[col.STIMULUS].astype(object)
+                for name in stimulus.dropna().unique():
+                    stimuli.setdefault(str(name), len(stimuli))
+                codes = stimulus.map(stimuli).fillna(-1).to_numpy(dtype=np.int16)
+                chunk[col.RECORDING_TIMESTAMP].to_numpy(np.int64).tofile(out[_TIMESTAMP_FILE])
+                codes.tofile(out[_STIMULUS_FILE])
+                for name in columns:
+                    _as_float32(chunk[name]).tofile(out[_file_name(name)])
+                rows += len(chunk)
+            st.rows = rows
+
+        codes = np.fromfile(tmp / _STIMULUS_FILE, dtype=np.int16)
+        meta = {
+            "version": FORMAT_VERSION,
+            "source": Path(path).name,
+            "sha256": digest,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "rows": rows,
+            "participant": participant,
+            "recording": recording,
+            "columns": {name: _file_name(name) for name in columns},
+            "stimuli": list(stimuli),
+            "intervals": _intervals(codes, list(stimuli)),
+        }
+        (tmp / "meta.json").write_text(json.dumps(meta, indent=1))
+        if target.exists():
+            shutil.rmtree(target)
+        os.replace(tmp, target)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return SampleStore(target)
+
+
+def convert_recordings(
+    paths: Iterable[str | os.PathLike],
+    directory: str | os.PathLike | None = None,
+    columns: Sequence[str] = SAMPLE_COLUMNS,
+    *,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    force: bool = False,
+) -> list[SampleStore]:
+    """:func:`convert_recording` for each export in ``paths``."""
+    return [
+        convert_recording(path, directory, columns, chunksize=chunksize, force=force)
+        for path in paths
+    ]
+
+
+class SampleStore:
+    """Read-only, memory-mapped view of a store written by :func:`convert_recording`."""
+
+    def __init__(self, directory: str | os.PathLike):
+        self.directory = Path(directory)
+        self.meta = json.loads((self.directory / "meta.json").read_text())
+        if self.meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{self.directory}: unsupported sample store version")
+        self._arrays: dict[str, np.ndarray] = {}
+        self.timestamps = self._map(_TIMESTAMP_FILE, np.int64)
+
+    def _map(self, file_name: str, dtype) -> np.ndarray:
+        if file_name not in self._arrays:
+            if len(self) == 0:
+                array = np.empty(0, dtype=dtype)
+            else:
+                array = np.memmap(
+                    self.directory / file_name, dtype=dtype, mode="r", shape=(len(self),)
+                ).view(np.ndarray)
+            self._arrays[file_name] = array
+        return self._arrays[file_name]
+
+    def __len__(self) -> int:
+        return self.meta["rows"]
+
+    def __repr__(self) -> str:
+        return f"SampleStore({str(self.directory)!r}, rows={len(self)})"
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self.meta["columns"])
+
+    @property
+    def participant(self) -> str | None:
+        return self.meta["participant"]
+
+    @property
+    def recording(self) -> str | None:
+        return self.meta["recording"]
+
+    @property
+    def stimuli(self) -> list[str]:
+        return list(self.meta["stimuli"])
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        """The whole ``column`` as a read-only memory-mapped array."""
+        try:
+            file_name = self.meta["columns"][column]
+        except KeyError:
+            raise KeyError(f"{column!r} is not stored in {self.directory}") from None
+        return self._map(file_name, np.float32)
+
+    @property
+    def stimulus_codes(self) -> np.ndarray:
+        """Index into :attr:`stimuli` per sample (-1 outside any stimulus)."""
+        return self._map(_STIMULUS_FILE, np.int16)
+
+    def span(self, start: float | None = None, end: float | None = None) -> slice:
+        """Rows with ``start <= timestamp < end`` (ms); ``None`` leaves a side open."""
+        lo = 0 if start is None else int(np.searchsorted(self.timestamps, start, "left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.timestamps, end, "left"))
+        return slice(lo, max(lo, hi))
+
+    def window(
+        self,
+        start: float | None = None,
+        end: float | None = None,
+        columns: Sequence[str] | None = None,
+    ) -> dict[str, np.ndarray]:
+        """Zero-copy views of ``columns`` (default: all) between ``start`` and ``end`` ms.
+
+        The result also holds the timestamps under ``"Recording timestamp"``.
+        """
+        rows = self.span(start, end)
+        out = {col.RECORDING_TIMESTAMP: self.timestamps[rows]}
+        for name in self.columns if columns is None else columns:
+            out[name] = self[name][rows]
+        return out
+
+    def stimulus_spans(self, stimulus: str) -> list[slice]:
+        """Row ranges during which ``stimulus`` was presented."""
+        return [slice(start, stop) for start, stop in self.meta["intervals"].get(stimulus, [])]
+
+    def to_frame(self, rows: slice = slice(None), columns: Sequence[str] | None = None) -> pd.DataFrame:
+        """Copy ``rows`` of the store into a DataFrame indexed by timestamp."""
+        names = self.columns if columns is None else list(columns)
+        return pd.DataFrame(
+            {name: self[name][rows] for name in names},
+            index=pd.Index(self.timestamps[rows], name=col.RECORDING_TIMESTAMP),
+        )
@@ -0,0 +1,140 @@
+"""Scanpaths: fixations in temporal order, the saccades between them and
+AOI-to-AOI (or grid-cell) transition matrices.
+
+Everything is computed on whole arrays; group boundaries (participant and
+recording) are handled with masks instead of per-row Python loops.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from . import columns as col
+
+KEYS = [col.PARTICIPANT, col.RECORDING]
+
+# Columns of the saccade table
+FROM_INDEX = "From fixation index"
+TO_INDEX = "To fixation index"
+AMPLITUDE = "Amplitude"
+DIRECTION = "Direction"
+DURATION = "Duration"
+VELOCITY = "Velocity"
+
+_LABEL = "_label"
+
+
+def order_scanpaths(fix: pd.DataFrame) -> pd.DataFrame:
+    """Fixation events sorted in time within each participant and recording."""
+    return fix.sort_values([*KEYS, col.START], ignore_index=True)
+
+
+def _group_starts(fix: pd.DataFrame) -> np.ndarray:
+    """Mask of rows starting a new participant/recording in an ordered table."""
+    group = fix.groupby(KEYS, sort=False, observed=True).ngroup().to_numpy()
+    return np.r_[True, group[1:] != group[:-1]]
+
+
+def saccades(fix: pd.DataFrame, size: tuple[int, int] | None = None) -> pd.DataFrame:
+    """Saccades between consecutive fixations of each scanpath.
+
+    Amplitudes are in stimulus pixels when ``size = (width, height)`` is given,
+    otherwise in normalized units. ``Direction`` is in degrees,
+    counter-clockwise from the positive x axis with y pointing up, and
+    ``Velocity`` is amplitude per millisecond between the end of one fixation
+    and the start of the next.
+    """
+    fix = order_scanpaths(fix)
+    w, h = size if size is not None else (1, 1)
+    x = fix[col.FIXATION_X].to_numpy(dtype=np.float64) * w
+    y = fix[col.FIXATION_Y].to_numpy(dtype=np.float64) * h
+    start = fix[col.START].to_numpy(dtype=np.float64)
+    end = fix[col.END].to_numpy(dtype=np.float64)
+
+    # A saccade joins row i - 1 and row i unless row i starts a new scanpath
+    valid = ~_group_starts(fix)[1:]
+    dx = (x[1:] - x[:-1])[valid]
+    dy = (y[1:] - y[:-1])[valid]
+    duration = (start[1:] - end[:-1])[valid]
+    amplitude = np.hypot(dx, dy)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        velocity = np.where(duration > 0, amplitude / duration, np.nan)
+
+    to = fix.iloc[1:][valid]
+    index = fix[col.EYE_MOVEMENT_INDEX].to_numpy()
+    return pd.DataFrame(
+        {
+            col.PARTICIPANT: to[col.PARTICIPANT].to_numpy(),
+            col.RECORDING: to[col.RECORDING].to_numpy(),
+            FROM_INDEX: index[:-1][valid],
+            TO_INDEX: index[1:][valid],
+            col.START: end[:-1][valid],
+            col.END: start[1:][valid],
+            AMPLITUDE: amplitude,
+            DIRECTION: np.degrees(np.arctan2(-dy, dx)),  # flip y: image rows grow down
+            DURATION: duration,
+            VELOCITY: velocity,
+        }
+    )
+
+
+def grid_labels(fix: pd.DataFrame, nx: int = 4, ny: int = 4) -> pd.Categorical:
+    """Label each fixation with the ``nx × ny`` grid cell it falls into."""
+    x = fix[col.FIXATION_X].to_numpy(dtype=np.float64)
+    y = fix[col.FIXATION_Y].to_numpy(dtype=np.float64)
+    inside = (x >= 0) & (x <= 1) & (y >= 0) & (y <= 1)
+    cx = np.clip(np.nan_to_num(x * nx).astype(np.intp), 0, nx - 1)
+    cy = np.clip(np.nan_to_num(y * ny).astype(np.intp), 0, ny - 1)
+    codes = np.where(inside, cy * nx + cx, -1)
+    names = [f"r{r}c{c}" for r in range(ny) for c in range(nx)]
+    return pd.Categorical.from_codes(codes, categories=names)
+
+
+@dataclass
+class Transitions:
+    """Transition counts per scanpath: ``counts[g, i, j]`` = moves from label i to j."""
+
+    groups: pd.MultiIndex
+    labels: list[str]
+    counts: np.ndarray
+
+    def probabilities(self) -> np.ndarray:
+        """Row-normalized transition probabilities (rows without exits stay 0)."""
+        totals = self.counts.sum(axis=2, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(totals > 0, self.counts / totals, 0.0)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long table with one row per scanpath and non-zero transition."""
+        g, i, j = np.nonzero(self.counts)
+        frame = self.groups[g].to_frame(index=False)
+        frame["From"] = np.asarray(self.labels, dtype=object)[i]
+        frame["To"] = np.asarray(self.labels, dtype=object)[j]
+        frame["Count"] = self.counts[g, i, j]
+        return frame
+
+
+def transition_matrix(fix: pd.DataFrame, labels) -> Transitions:
+    """Count label-to-label transitions between consecutive fixations.
+
+    ``labels`` is a categorical with one entry per row of ``fix`` (e.g. from
+    :func:`gazeplot.aoi.assign_aois` or :func:`grid_labels`); missing labels
+    break the chain, so no transition is counted into or out of them.
+    Consecutive fixations with the same label count as self-transitions.
+    """
+    labels = pd.Categorical(labels)
+    fix = order_scanpaths(fix.assign(**{_LABEL: labels.codes}))
+    codes = fix[_LABEL].to_numpy()
+    k = len(labels.categories)
+
+    group = fix.groupby(KEYS, sort=False, observed=True).ngroup().to_numpy()
+    groups = pd.MultiIndex.from_frame(fix.loc[_group_starts(fix), KEYS])
+
+    src, dst = codes[:-1], codes[1:]
+    valid = (group[1:] == group[:-1]) & (src >= 0) & (dst >= 0)
+    flat = (group[1:][valid] * k + src[valid]) * k + dst[valid]
+    counts = np.bincount(flat, minlength=len(groups) * k * k).reshape(len(groups), k, k)
+    return Transitions(groups, list(labels.categories), counts)
@@ -0,0 +1,178 @@
+"""Explicit dtypes for the columns of a Tobii Pro Lab data export.
+
+Reading with a fixed schema avoids the generic ``object``/``float64`` columns
+pandas infers with ``low_memory=False``: repeated strings become categoricals,
+measurements become ``float32`` and counters ``int32``. Timestamps keep 64 bit
+so long sessions don't lose precision.
+"""
+
+from __future__ import annotations
+
+from . import columns as col
+
+CATEGORY = "category"
+
+# All columns of the export, in file order
+EXPORT_COLUMNS = [
+    "Recording timestamp",
+    "Computer timestamp",
+    "Sensor",
+    "Project name",
+    "Export date",
+    "Participant name",
+    "Recording name",
+    "Recording date",
+    "Recording date UTC",
+    "Recording start time",
+    "Recording start time UTC",
+    "Recording duration",
+    "Timeline name",
+    "Recording Fixation filter name",
+    "Recording software version",
+    "Recording resolution height",
+    "Recording resolution width",
+    "Recording monitor latency",
+    "Average calibration accuracy (mm)",
+    "Average calibration precision SD (mm)",
+    "Average calibration precision RMS (mm)",
+    "Average calibration accuracy (degrees)",
+    "Average calibration precision SD (degrees)",
+    "Average calibration precision RMS (degrees)",
+    "Average calibration accuracy (pixels)",
+    "Average calibration precision SD (pixels)",
+    "Average calibration precision RMS (pixels)",
+    "Average validation accuracy (mm)",
+    "Average validation precision SD (mm)",
+    "Average validation precision RMS (mm)",
+    "Average validation accuracy (degrees)",
+    "Average validation precision SD (degrees)",
+    "Average validation precision RMS (degrees)",
+    "Average validation accuracy (pixels)",
+    "Average validation precision SD (pixels)",
+    "Average validation precision RMS (pixels)",
+    "Eyetracker timestamp",
+    "Event",
+    "Event value",
+    "Gaze point X",
+    "Gaze point Y",
+    "Gaze point left X",
+    "Gaze point left Y",
+    "Gaze point right X",
+    "Gaze point right Y",
+    "Gaze direction left X",
+    "Gaze direction left Y",
+    "Gaze direction left Z",
+    "Gaze direction right X",
+    "Gaze direction right Y",
+    "Gaze direction right Z",
+    "Pupil diameter left",
+    "Pupil diameter right",
+    "Validity left",
+    "Validity right",
+    "Eye position left X (DACSmm)",
+    "Eye position left Y (DACSmm)",
+    "Eye position left Z (DACSmm)",
+    "Eye position right X (DACSmm)",
+    "Eye position right Y (DACSmm)",
+    "Eye position right Z (DACSmm)",
+    "Gaze point left X (DACSmm)",
+    "Gaze point left Y (DACSmm)",
+    "Gaze point right X (DACSmm)",
+    "Gaze point right Y (DACSmm)",
+    "Gaze point X (MCSnorm)",
+    "Gaze point Y (MCSnorm)",
+    "Gaze point left X (MCSnorm)",
+    "Gaze point left Y (MCSnorm)",
+    "Gaze point right X (MCSnorm)",
+    "Gaze point right Y (MCSnorm)",
+    "Presented Stimulus name",
+    "Presented Media name",
+    "Presented Media width",
+    "Presented Media height",
+    "Presented Media position X (DACSpx)",
+    "Presented Media position Y (DACSpx)",
+    "Original Media width",
+    "Original Media height",
+    "Eye movement type",
+    "Gaze event duration",
+    "Eye movement type index",
+    "Fixation point X",
+    "Fixation point Y",
+    "Fixation point X (MCSnorm)",
+    "Fixation point Y (MCSnorm)",
+    "Client area position X (DACSpx)",
+    "Client area position Y (DACSpx)",
+    "Viewport position X",
+    "Viewport position Y",
+    "Viewport width",
+    "Viewport height",
+    "Full page width",
+    "Full page height",
+    "Mouse position X",
+    "Mouse position Y",
+]
+
+_CATEGORICAL = [
+    "Sensor",
+    "Project name",
+    "Export date",
+    col.PARTICIPANT,
+    col.RECORDING,
+    "Recording date",
+    "Recording date UTC",
+    "Recording start time",
+    "Recording start time UTC",
+    "Timeline name",
+    "Recording Fixation filter name",
+    "Recording software version",
+    "Event",
+    "Event value",
+    "Validity left",
+    "Validity right",
+    col.STIMULUS,
+    "Presented Media name",
+    col.EYE_MOVEMENT_TYPE,
+]
+
+_INT64 = [col.RECORDING_TIMESTAMP, "Computer timestamp"]
+
+# Integer columns that may be empty on some rows use pandas' nullable type
+_INT32 = [
+    "Recording duration",
+    "Recording resolution height",
+    "Recording resolution width",
+    col.EYE_MOVEMENT_INDEX,
+]
+
+# Microsecond device clock, too large for float32 precision
+_FLOAT64 = ["Eyetracker timestamp"]
+
+# Every remaining export column is a numeric measurement
+SCHEMA: dict[str, str] = {
+    **{name: "float32" for name in EXPORT_COLUMNS},
+    **{name: CATEGORY for name in _CATEGORICAL},
+    **{name: "int64" for name in _INT64},
+    **{name: "Int32" for name in _INT32},
+    **{name: "float64" for name in _FLOAT64},
+}
+
+# Columns the fixation plots need; everything else is skipped while parsing
+PLOT_COLUMNS = [
+    col.RECORDING_TIMESTAMP,
+    col.PARTICIPANT,
+    col.RECORDING,
+    col.STIMULUS,
+    col.EYE_MOVEMENT_TYPE,
+    col.EYE_MOVEMENT_INDEX,
+    col.GAZE_EVENT_DURATION,
+    col.FIXATION_X,
+    col.FIXATION_Y,
+]
+
+
+def dtypes_for(columns: list[str]) -> dict[str, str]:
+    """dtype mapping for ``read_csv`` restricted to ``columns``.
+
+    Columns outside the known export schema are left to pandas' inference.
+    """
+    return {name: SCHEMA[name] for name in columns if name in SCHEMA}
@@ -0,0 +1,391 @@
+"""Local HTTP service answering fixation queries from a warm in-memory index.
+
+:class:`RecordingIndex` loads the fixations of every export in a directory
+once and splits them by participant and stimulus. A background task polls the
+directory and loads only exports that were added or changed, so new files
+show up without a restart. Rendered figures are kept in a :class:`FigureCache`
+(least recently used) keyed by the query and the content of the recordings
+behind it, so a repeated query is answered from memory.
+
+Endpoints (``GET``, parameters in the query string)::
+
+    /index                       participants, stimuli and fixation counts (JSON)
+    /fixations?participant=&stimulus=[&format=csv|json]
+    /figure.png?participant=&stimulus=[&mode=scatter|heatmap][&sigma=][&dpi=]
+    /heatmap.png?...             /figure.png with mode=heatmap
+
+``sigma`` (heatmap smoothing in image pixels) and ``dpi`` are limited to
+:data:`SIGMA_RANGE` and :data:`DPI_RANGE`; other values are answered with 400.
+
+Without ``participant`` the fixations of all participants on the stimulus
+are combined. The server speaks just enough HTTP/1.1 for browsers, ``curl``
+and notebooks and is meant for localhost only.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from . import columns as col
+from .cache import RecordingCache
+from .loader import concat_recordings
+from .paths import DATA_DIR, RECORDING_PATTERN
+from .profiling import stage
+from .quality import QualityRules
+from .stimulus import StimulusCache
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            500: "Internal Server Error"}
+
+SIGMA_RANGE = (0.5, 200.0)
+DPI_RANGE = (10, 300)
+RENDERER_CACHE_SIZE = 8  # live matplotlib figures kept for reuse
+
+
+class FigureCache:
+    """Least recently used mapping of query keys to encoded figures."""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._items: OrderedDict[tuple, bytes] = OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, key: tuple) -> bytes | None:
+        data = self._items.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def put(self, key: tuple, data: bytes) -> None:
+        self._items[key] = data
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+@dataclass
+class _Entry:
+    """Fixations of one export and the stat signature they were loaded from."""
+
+    signature: tuple[int, int]
+    fixations: dict[tuple[str, str], pd.DataFrame] = field(default_factory=dict)
+
+
+class RecordingIndex:
+    """Fixations of the exports in ``data_dir`` by participant and stimulus."""
+
+    def __init__(
+        self,
+        data_dir: str | os.PathLike = DATA_DIR,
+        pattern: str = RECORDING_PATTERN,
+        *,
+        cache: RecordingCache | None = None,
+        quality: QualityRules | None = None,
+    ):
+        self.data_dir = Path(data_dir)
+        self.pattern = pattern
+        self.cache = cache
+        self.quality = quality
+        self._entries: dict[Path, _Entry] = {}
+        self._sources: dict[tuple[str, str], list[Path]] = {}
+        # Exports that failed to load, by the stat signature they failed with
+        self._failed: dict[Path, tuple[int, int]] = {}
+        self.errors: dict[Path, str] = {}
+
+    def refresh(self) -> list[Path]:
+        """Load added or changed exports and forget removed ones; return the loaded paths.
+
+        An export that fails to load (e.g. one still being copied) is skipped
+        and retried once its size or mtime changes; the new failures are in
+        :attr:`errors` until the next refresh.
+        """
+        from .pipeline import load_fixations
+
+        self.errors = {}
+        paths = sorted(self.data_dir.glob(self.pattern))
+        removed = set(self._entries) - set(paths)
+        for gone in removed:
+            del self._entries[gone]
+        loaded = []
+        for path in paths:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # removed since the glob; forgotten on the next refresh
+            signature = (stat.st_mtime_ns, stat.st_size)
+            entry = self._entries.get(path)
+            if entry is not None and entry.signature == signature:
+                continue
+            if self._failed.get(path) == signature:
+                continue
+            try:
+                with stage("index recording"):
+                    if self.cache is not None:
+                        fix = self.cache.load_fixations(path, None, self.quality)
+                    else:
+                        fix = load_fixations([path], None, quality=self.quality)
+                    groups = fix.groupby([col.PARTICIPANT, col.STIMULUS], sort=True, observed=True)
+                    fixations = {(str(p), str(s)): sub for (p, s), sub in groups}
+            except Exception as exc:  # noqa: BLE001 - reported, retried when the file changes
+                self._failed[path] = signature
+                self.errors[path] = f"{type(exc).__name__}: {exc}"
+                continue
+            self._failed.pop(path, None)
+            self._entries[path] = _Entry(signature, fixations)
+            loaded.append(path)
+        if loaded or removed:
+            self._sources = {}
+            for path, entry in self._entries.items():
+                for key in entry.fixations:
+                    self._sources.setdefault(key, []).append(path)
+        return loaded
+
+    def keys(self) -> list[tuple[str, str]]:
+        """``(participant, stimulus)`` pairs with fixations."""
+        return sorted(self._sources)
+
+    def summary(self) -> dict:
+        counts: dict[str, dict[str, int]] = {}
+        for entry in self._entries.values():
+            for (participant, stimulus), fix in entry.fixations.items():
+                per_stimulus = counts.setdefault(participant, {})
+                per_stimulus[stimulus] = per_stimulus.get(stimulus, 0) + len(fix)
+        return {
+            "recordings": len(self._entries),
+            "participants": sorted(counts),
+            "stimuli": sorted({s for per_stimulus in counts.values() for s in per_stimulus}),
+            "fixations": counts,
+        }
+
+    def lookup(
+        self, stimulus: str, participant: str | None = None
+    ) -> tuple[list[tuple[str, str]], tuple]:
+        """Index keys matching a query and a version key of the exports behind them.
+
+        The version changes whenever one of those exports is reloaded, so it
+        can key cached results of the query.
+        """
+        if participant is not None:
+            keys = [(participant, stimulus)] if (participant, stimulus) in self._sources else []
+        else:
+            keys = [key for key in self._sources if key[1] == stimulus]
+        version = {
+            (str(path), *self._entries[path].signature)
+            for key in keys for path in self._sources[key]
+        }
+        return keys, tuple(sorted(version))
+
+    def fixations(self, keys: list[tuple[str, str]]) -> pd.DataFrame:
+        """Fixation table of the index ``keys`` (see :meth:`lookup`)."""
+        frames = [self._entries[path].fixations[key] for key in keys for path in self._sources[key]]
+        if not frames:
+            return pd.DataFrame()
+        return frames[0] if len(frames) == 1 else concat_recordings(frames)
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _request_line(line: bytes) -> tuple[str, str]:
+    """Method and target of an HTTP request line; 400 if it is malformed."""
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3 or not parts[2].startswith("HTTP/") or not parts[1].startswith("/"):
+        raise _HTTPError(400, "Malformed request line")
+    method, target, _ = parts
+    return method, target
+
+
+def _number(params: dict[str, str], name: str, convert, bounds: tuple, default=None):
+    """Query parameter ``name`` converted by ``convert``; 400 unless within ``bounds``."""
+    if name not in params:
+        return default
+    lo, hi = bounds
+    try:
+        value = convert(params[name])
+    except ValueError:
+        raise _HTTPError(400, f"{name} must be a number") from None
+    if not lo <= value <= hi:
+        raise _HTTPError(400, f"{name} must be between {lo} and {hi}")
+    return value
+
+
+class FixationServer:
+    """asyncio HTTP server over a :class:`RecordingIndex`.
+
+    pandas and matplotlib work runs on one worker thread, which keeps the
+    shared figures single-threaded while the event loop keeps accepting
+    connections.
+    """
+
+    def __init__(
+        self,
+        index: RecordingIndex,
+        stimuli: StimulusCache,
+        *,
+        cache_size: int = 128,
+        interval: float = 2.0,
+    ):
+        self.index = index
+        self.stimuli = stimuli
+        self.figures = FigureCache(cache_size)
+        self.interval = interval
+        self._renderers: OrderedDict[tuple, object] = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gazeplot")
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def poll(self) -> None:
+        """Re-scan the data directory every ``interval`` seconds.
+
+        Errors are reported and polling goes on, so a bad file or a failed
+        scan does not stop new recordings from being picked up.
+        """
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                loaded = await self._run(self.index.refresh)
+            except Exception as exc:  # noqa: BLE001 - keep polling
+                print(f"Re-scan of {self.index.data_dir} failed: {exc}", file=sys.stderr, flush=True)
+                continue
+            self._report(loaded)
+
+    def _report(self, loaded: list[Path]) -> None:
+        if loaded:
+            self.stimuli.rescan()
+        for path in loaded:
+            print(f"Indexed {path.name}", flush=True)
+        for path, error in self.index.errors.items():
+            print(f"Skipped {path.name}: {error}", file=sys.stderr, flush=True)
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8000) -> None:
+        loaded = await self._run(self.index.refresh)
+        print(f"Indexed {len(loaded)} recordings from {self.index.data_dir}", flush=True)
+        for path, error in self.index.errors.items():
+            print(f"Skipped {path.name}: {error}", file=sys.stderr, flush=True)
+        server = await asyncio.start_server(self._handle, host, port)
+        poller = asyncio.create_task(self.poll())
+        print(f"Serving on http://{host}:{port}/index (Ctrl+C to stop)", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            poller.cancel()
+            self._executor.shutdown(wait=False)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # headers are not needed
+            try:
+                method, target = _request_line(request)
+                if method != "GET":
+                    raise _HTTPError(405, "Only GET is supported")
+                status, content_type, body = 200, *await self.respond(target)
+            except _HTTPError as exc:
+                status, content_type, body = exc.status, "text/plain", f"{exc}\n".encode()
+            except Exception as exc:  # noqa: BLE001 - reported to the client
+                status, content_type = 500, "text/plain"
+                body = f"{type(exc).__name__}: {exc}\n".encode()
+            head = (
+                f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            )
+            writer.write(head.encode("latin-1") + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def respond(self, target: str) -> tuple[str, bytes]:
+        """Content type and body answering the request ``target``."""
+        try:
+            url = urlsplit(target)
+        except ValueError:
+            raise _HTTPError(400, f"Malformed request target {target!r}") from None
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        if url.path in ("/", "/index"):
+            summary = await self._run(self.index.summary)
+            return "application/json", json.dumps(summary, indent=1).encode()
+        if url.path == "/fixations":
+            keys, _ = await self._lookup(params)
+            if params.get("format", "csv") == "json":
+                return "application/json", await self._run(self._table, keys, "json")
+            return "text/csv", await self._run(self._table, keys, "csv")
+        if url.path in ("/figure.png", "/heatmap.png"):
+            mode = "heatmap" if url.path == "/heatmap.png" else params.get("mode", "scatter")
+            if mode not in ("scatter", "heatmap"):
+                raise _HTTPError(400, f"Unknown mode {mode!r}")
+            return "image/png", await self.figure(params, mode)
+        raise _HTTPError(404, f"No such endpoint: {url.path}")
+
+    async def _lookup(self, params: dict[str, str]) -> tuple[list[tuple[str, str]], tuple]:
+        stimulus = params.get("stimulus", col.DEFAULT_STIMULUS)
+        participant = params.get("participant")
+        keys, version = await self._run(self.index.lookup, stimulus, participant)
+        if not keys:
+            raise _HTTPError(404, f"No fixations of {participant or 'anyone'} on {stimulus}")
+        return keys, version
+
+    def _table(self, keys: list[tuple[str, str]], fmt: str) -> bytes:
+        fix = self.index.fixations(keys)
+        if fmt == "json":
+            return fix.to_json(orient="records").encode()
+        return fix.to_csv(index=False).encode()
+
+    async def figure(self, params: dict[str, str], mode: str) -> bytes:
+        """PNG of the queried fixations, from the figure cache when possible."""
+        keys, version = await self._lookup(params)
+        stimulus = params.get("stimulus", col.DEFAULT_STIMULUS)
+        participant = params.get("participant")
+        sigma = _number(params, "sigma", float, SIGMA_RANGE)
+        dpi = _number(params, "dpi", int, DPI_RANGE, 100)
+        key = (stimulus, participant, mode, sigma, dpi, version)
+        data = self.figures.get(key)
+        if data is None:
+            data = await self._run(self._render, keys, stimulus, participant, mode, sigma, dpi)
+            self.figures.put(key, data)
+        return data
+
+    def _render(
+        self, keys, stimulus: str, participant: str | None, mode: str, sigma, dpi: int
+    ) -> bytes:
+        from .render import FigureRenderer
+
+        if stimulus not in self.stimuli:
+            raise _HTTPError(404, f"No image for stimulus {stimulus!r}")
+        key = (stimulus, mode, sigma)
+        renderer = self._renderers.pop(key, None)
+        if renderer is None:
+            renderer = FigureRenderer(self.stimuli.get(stimulus), mode=mode, sigma=sigma)
+        # Least recently used renderers (and their figures) are dropped
+        self._renderers[key] = renderer
+        while len(self._renderers) > RENDERER_CACHE_SIZE:
+            self._renderers.popitem(last=False)
+        buffer = io.BytesIO()
+        renderer.update(self.index.fixations(keys), participant or "all participants")
+        with stage("save"):
+            renderer.figure.savefig(buffer, format="png", dpi=dpi)
+        return buffer.getvalue()
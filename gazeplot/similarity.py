@@ -0,0 +1,162 @@
+"""Pairwise scanpath similarity.
+
+Each scanpath is turned into a sequence of AOI or grid-cell labels and
+compared with a (ScanMatch-like) string-edit distance. One sequence is
+aligned against a whole block of others at once: every dynamic-programming
+row is computed for all of them with NumPy, and the insertion recurrence is
+resolved with a running minimum instead of a Python loop over columns. Row
+blocks of the N×N matrix are spread over a process pool.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .scanpath import KEYS, _LABEL, order_scanpaths
+
+_PAD = -1
+
+# Per-process state set up by _init_worker
+_padded: np.ndarray | None = None
+_lengths: np.ndarray | None = None
+_substitution: np.ndarray | None = None
+
+
+def label_sequences(
+    fix: pd.DataFrame, labels, collapse: bool = True
+) -> tuple[pd.MultiIndex, list[np.ndarray]]:
+    """Per-scanpath label code sequences in temporal order.
+
+    Fixations without a label are skipped. With ``collapse``, repeated
+    consecutive labels are merged into one (gaze on the same region).
+    Returns the participant/recording index and one ``int32`` array each.
+    """
+    labels = pd.Categorical(labels)
+    fix = order_scanpaths(fix.assign(**{_LABEL: labels.codes}))
+    fix = fix[fix[_LABEL] >= 0]
+    index, sequences = [], []
+    for key, group in fix.groupby(KEYS, sort=False, observed=True):
+        codes = group[_LABEL].to_numpy(dtype=np.int32)
+        if collapse and len(codes):
+            codes = codes[np.r_[True, codes[1:] != codes[:-1]]]
+        index.append(key)
+        sequences.append(codes)
+    return pd.MultiIndex.from_tuples(index, names=KEYS), sequences
+
+
+def grid_substitution_costs(nx: int, ny: int) -> np.ndarray:
+    """Substitution costs between grid cells: centre distance scaled to 0–1."""
+    rows, cols = np.divmod(np.arange(nx * ny), nx)
+    centres = np.column_stack([(cols + 0.5) / nx, (rows + 0.5) / ny])
+    dist = np.hypot(*(centres[:, None, :] - centres[None, :, :]).transpose(2, 0, 1))
+    return dist / dist.max() if dist.max() > 0 else dist
+
+
+def pad_sequences(sequences: list[np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    """Stack sequences into a padded ``(n, max_len)`` array plus their lengths."""
+    lengths = np.array([len(s) for s in sequences], dtype=np.intp)
+    padded = np.full((len(sequences), max(lengths.max(initial=0), 1)), _PAD, dtype=np.int32)
+    for i, seq in enumerate(sequences):
+        padded[i, : len(seq)] = seq
+    return padded, lengths
+
+
+def edit_distances(
+    a: np.ndarray,
+    padded: np.ndarray,
+    lengths: np.ndarray,
+    substitution: np.ndarray | None = None,
+) -> np.ndarray:
+    """Edit distance of sequence ``a`` to every row of ``padded``.
+
+    Insertions and deletions cost 1; substitutions cost 1 or
+    ``substitution[a_i, b_j]`` when a cost matrix is given.
+    """
+    n, m = padded.shape
+    # Work column-major (positions × sequences) so that the running minimum
+    # below runs over contiguous rows of all sequences at once
+    others = np.ascontiguousarray(padded.T)
+    safe = np.where(others == _PAD, 0, others)
+    # Unit costs stay integral; small ints halve the memory traffic per row
+    dtype = np.int32 if substitution is None else np.float64
+    steps = np.arange(m + 1, dtype=dtype)[:, None]
+    prev = np.repeat(steps, n, axis=1)
+    row = np.empty_like(prev)
+    for i, token in enumerate(a, start=1):
+        if substitution is None:
+            cost = (others != token).view(np.int8)
+        else:
+            cost = substitution[token][safe]
+        row[0] = i
+        # Deletion (from the row above) and substitution (diagonal)
+        np.minimum(prev[1:] + 1, prev[:-1] + cost, out=row[1:])
+        # Insertion: row[j] = min_k(row[k] + j - k), a running minimum
+        row -= steps
+        np.minimum.accumulate(row, axis=0, out=row)
+        row += steps
+        prev, row = row, prev
+    return prev[lengths, np.arange(n)]
+
+
+def _init_worker(padded: np.ndarray, lengths: np.ndarray, substitution: np.ndarray | None) -> None:
+    global _padded, _lengths, _substitution
+    _padded, _lengths, _substitution = padded, lengths, substitution
+
+
+def _rows(start: int, stop: int, normalize: bool) -> tuple[int, np.ndarray]:
+    """Distances of rows ``start:stop`` to the sequences after each of them."""
+    out = np.zeros((stop - start, len(_lengths)))
+    for r, i in enumerate(range(start, stop)):
+        a = _padded[i, : _lengths[i]]
+        out[r, i + 1 :] = edit_distances(a, _padded[i + 1 :], _lengths[i + 1 :], _substitution)
+    if normalize:
+        longest = np.maximum(_lengths[start:stop, None], _lengths[None, :])
+        out = np.divide(out, longest, out=np.zeros_like(out), where=longest > 0)
+    return start, out
+
+
+def distance_matrix(
+    sequences: list[np.ndarray],
+    *,
+    substitution: np.ndarray | None = None,
+    normalize: bool = True,
+    workers: int | None = None,
+    block: int = 32,
+) -> np.ndarray:
+    """N×N scanpath distance matrix.
+
+    With ``normalize`` distances are divided by the longer sequence length, so
+    0 means identical and 1 entirely different. Blocks of ``block`` rows are
+    computed by ``workers`` processes (default: CPU count; 1 runs inline).
+    """
+    padded, lengths = pad_sequences(sequences)
+    n = len(sequences)
+    result = np.zeros((n, n))
+    spans = [(start, min(start + block, n)) for start in range(0, n, block)]
+
+    if workers == 1 or len(spans) < 2:
+        _init_worker(padded, lengths, substitution)
+        parts = [_rows(start, stop, normalize) for start, stop in spans]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(),
+            initializer=_init_worker,
+            initargs=(padded, lengths, substitution),
+        ) as pool:
+            parts = list(
+                pool.map(_rows, *zip(*spans), [normalize] * len(spans))
+            )
+    for start, rows in parts:
+        result[start : start + len(rows)] = rows
+    # Only the upper triangle was computed; the distance is symmetric
+    return result + result.T
+
+
+def similarity_frame(index: pd.MultiIndex, distances: np.ndarray) -> pd.DataFrame:
+    """Label the distance matrix with participant names."""
+    names = [f"{participant}/{recording}" for participant, recording in index]
+    return pd.DataFrame(distances, index=names, columns=names)
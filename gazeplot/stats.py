@@ -0,0 +1,162 @@
+"""Per-participant and per-group fixation statistics of a whole cohort.
+
+:func:`cohort_statistics` summarizes an aggregated fixation table (see
+:mod:`gazeplot.events`) with one grouped aggregation: fixation count, mean
+and median fixation duration, total dwell time, spatial dispersion and the
+area of the convex hull of the fixation points.
+
+Dispersion is the standard distance of the fixations from their centroid,
+``sqrt(var(x) + var(y))``. Both it and the hull area are in the normalized
+``MCSnorm`` units of the fixation points, so the hull area is the fraction
+of the stimulus covered by the gaze of a group.
+
+The convex hulls of all groups are computed together: the fixations are
+sorted once by group and x. A few vectorized passes drop the points of the
+lower and upper chains that do not turn the right way, in all groups at once,
+which removes most interior fixations. A single monotone chain stack pass over
+the remaining points then finishes every group, so the total cost is
+O(n log n) for the sort plus O(n) for the passes, whatever the point layout.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import columns as col
+
+# Columns of the statistics table
+GROUP = "Group"
+FIXATION_COUNT = "Fixation count"
+MEAN_DURATION = "Mean fixation duration"
+MEDIAN_DURATION = "Median fixation duration"
+DWELL_TIME = "Total dwell time"
+DISPERSION = "Dispersion"
+HULL_AREA = "Convex hull area"
+
+KEYS = [col.PARTICIPANT, col.RECORDING]
+
+_PRUNE_PASSES = 8  # vectorized pruning passes before the sequential chain pass
+
+
+def _chain(group: np.ndarray, x: np.ndarray, y: np.ndarray, sign: int) -> np.ndarray:
+    """Indices of the lower (``sign=1``) or upper (``sign=-1``) hull chains.
+
+    ``group``, ``x`` and ``y`` must be sorted by group, then x, then y. The
+    first and last point of each group are always kept.
+    """
+    keep = np.arange(len(group))
+    # Vectorized passes over all groups drop most interior points cheaply
+    for _ in range(_PRUNE_PASSES):
+        if len(keep) <= 2:
+            return keep
+        g, px, py = group[keep], x[keep], y[keep]
+        inner = (g[1:-1] == g[:-2]) & (g[1:-1] == g[2:])
+        cross = (px[2:] - px[:-2]) * (py[1:-1] - py[:-2]) - (py[2:] - py[:-2]) * (px[1:-1] - px[:-2])
+        drop = inner & (sign * cross >= 0)
+        if not drop.any():
+            return keep
+        keep = keep[np.r_[True, ~drop, True]]
+
+    # Monotone chain stack pass over the remaining points, one group after another
+    gs, xs, ys = group[keep].tolist(), x[keep].tolist(), y[keep].tolist()
+    chain: list[int] = []
+    base = 0  # first chain entry of the current group
+    for i, (gi, xi, yi) in enumerate(zip(gs, xs, ys)):
+        if chain and gs[chain[-1]] != gi:
+            base = len(chain)
+        while len(chain) - base >= 2:
+            a, b = chain[-2], chain[-1]
+            cross = (xi - xs[a]) * (ys[b] - ys[a]) - (yi - ys[a]) * (xs[b] - xs[a])
+            if sign * cross < 0:
+                break
+            chain.pop()
+        chain.append(i)
+    return keep[np.asarray(chain, dtype=np.intp)]
+
+
+def hull_areas(group: np.ndarray, x: np.ndarray, y: np.ndarray, groups: int) -> np.ndarray:
+    """Convex hull area of the points of each group code ``0 .. groups - 1``.
+
+    Points with a missing coordinate are ignored; groups with fewer than
+    three distinct points have an area of 0.
+    """
+    valid = ~(np.isnan(x) | np.isnan(y))
+    group, x, y = group[valid], x[valid], y[valid]
+    order = np.lexsort((y, x, group))
+    group, x, y = group[order], x[order], y[order]
+    # Repeated points would make each other look collinear and both be dropped
+    unique = np.r_[True, (group[1:] != group[:-1]) | (x[1:] != x[:-1]) | (y[1:] != y[:-1])]
+    group, x, y = group[unique], x[unique], y[unique]
+
+    def shoelace(keep: np.ndarray) -> np.ndarray:
+        g, px, py = group[keep], x[keep], y[keep]
+        same = g[1:] == g[:-1]
+        terms = px[:-1] * py[1:] - px[1:] * py[:-1]
+        return np.bincount(g[1:][same], weights=terms[same], minlength=groups)
+
+    # The lower chain runs counter-clockwise, the upper one clockwise.
+    lower = shoelace(_chain(group, x, y, 1))
+    upper = shoelace(_chain(group, x, y, -1))
+    return np.abs(lower - upper) / 2
+
+
+def cohort_statistics(
+    fix: pd.DataFrame,
+    by: Sequence[str] = KEYS,
+    groups: Mapping[str, str] | pd.Series | None = None,
+) -> pd.DataFrame:
+    """Fixation statistics of ``fix`` per combination of the ``by`` columns.
+
+    ``groups`` maps participant names to a group label (condition, cohort)
+    that is added as a ``Group`` column and can be used in ``by``; the
+    participants it does not name are left out. Durations are in ms.
+    """
+    by = list(by)
+    if groups is not None:
+        labels = fix[col.PARTICIPANT].astype(object).map(groups)
+        fix = fix.assign(**{GROUP: labels.astype("category")})
+        fix = fix[fix[GROUP].notna()]
+
+    x = fix[col.FIXATION_X].to_numpy(dtype=np.float64, na_value=np.nan)
+    y = fix[col.FIXATION_Y].to_numpy(dtype=np.float64, na_value=np.nan)
+    # Population variance as E[v²] - E[v]², so everything is one aggregation
+    fix = fix.assign(_x=x, _y=y, _r2=x * x + y * y)
+    grouped = fix.groupby(by, sort=True, observed=True)
+    duration = col.GAZE_EVENT_DURATION
+    table = grouped.agg(**{
+        FIXATION_COUNT: (duration, "size"),
+        MEAN_DURATION: (duration, "mean"),
+        MEDIAN_DURATION: (duration, "median"),
+        DWELL_TIME: (duration, "sum"),
+        "_x": ("_x", "mean"),
+        "_y": ("_y", "mean"),
+        "_r2": ("_r2", "mean"),
+    })
+    variance = table.pop("_r2") - table.pop("_x") ** 2 - table.pop("_y") ** 2
+    table[DISPERSION] = np.sqrt(variance.clip(lower=0))
+    table[HULL_AREA] = hull_areas(grouped.ngroup().to_numpy(), x, y, len(table))
+    return table.reset_index()
+
+
+def load_groups(path: str | os.PathLike) -> pd.Series:
+    """Participant → group mapping from a CSV with ``Participant name`` and ``Group`` columns."""
+    table = pd.read_csv(path, dtype=str)
+    missing = {col.PARTICIPANT, GROUP} - set(table.columns)
+    if missing:
+        raise ValueError(f"{path}: missing column(s) {', '.join(sorted(missing))}")
+    return table.set_index(col.PARTICIPANT)[GROUP]
+
+
+def write_statistics(table: pd.DataFrame, path: str | os.PathLike) -> None:
+    """Write ``table`` as Parquet (``.parquet`` suffix, needs pyarrow) or CSV."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() in (".parquet", ".pq"):
+        table.to_parquet(path, index=False)
+    else:
+        table.to_csv(path, index=False)
@@ -0,0 +1,100 @@
+"""Stimulus images shown during the recordings."""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from .paths import DATA_DIR
+from .profiling import stage
+
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tif", ".tiff")
+
+
+@dataclass(frozen=True)
+class Stimulus:
+    """A decoded stimulus image together with its name."""
+
+    name: str
+    image: np.ndarray
+
+    @property
+    def width(self) -> int:
+        return self.image.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.image.shape[0]
+
+    @property
+    def size(self) -> tuple[int, int]:
+        """``(width, height)`` in pixels, like ``PIL.Image.size``."""
+        return self.width, self.height
+
+
+def load_stimulus(path: str | os.PathLike, name: str | None = None) -> Stimulus:
+    """Decode the image at ``path`` once into an array.
+
+    ``name`` defaults to the file name without extension, which matches the
+    ``Presented Stimulus name`` column for the shipped ``Question-pic.PNG``.
+    """
+    with stage("decode image"), Image.open(path) as img:
+        image = np.asarray(img)
+    if name is None:
+        name = os.path.splitext(os.path.basename(path))[0]
+    return Stimulus(name=name, image=image)
+
+
+class StimulusCache:
+    """Stimulus images by ``Presented Stimulus name``, each decoded only once.
+
+    A name is resolved through the explicit ``images`` mapping first, then to
+    the image in ``image_dir`` whose file name (with or without extension,
+    ignoring case) equals it, which is how Pro Lab names the exported media.
+    """
+
+    def __init__(
+        self,
+        image_dir: str | os.PathLike = DATA_DIR,
+        images: Mapping[str, str | os.PathLike] | None = None,
+    ):
+        self.image_dir = Path(image_dir)
+        self.images = {name: Path(path) for name, path in (images or {}).items()}
+        self._decoded: dict[str, Stimulus] = {}
+        self._index: dict[str, Path] | None = None
+
+    def resolve(self, name: str) -> Path | None:
+        """Image file of the stimulus ``name``, ``None`` when there is none."""
+        if name in self.images:
+            return self.images[name]
+        if self._index is None:
+            self._index = {}
+            if self.image_dir.is_dir():
+                for path in sorted(self.image_dir.iterdir()):
+                    if path.suffix.lower() in IMAGE_SUFFIXES:
+                        self._index.setdefault(path.name.lower(), path)
+                        self._index.setdefault(path.stem.lower(), path)
+        return self._index.get(name.lower())
+
+    def rescan(self) -> None:
+        """Look for images added to ``image_dir`` on the next :meth:`resolve`."""
+        self._index = None
+
+    def __contains__(self, name: str) -> bool:
+        return self.resolve(name) is not None
+
+    def get(self, name: str) -> Stimulus:
+        """The decoded stimulus ``name``; raises FileNotFoundError without an image."""
+        if name not in self._decoded:
+            path = self.resolve(name)
+            if path is None:
+                raise FileNotFoundError(f"No image for stimulus {name!r} in {self.image_dir}")
+            self._decoded[name] = load_stimulus(path, name)
+        return self._decoded[name]
+
+    __getitem__ = get
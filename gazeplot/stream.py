@@ -0,0 +1,94 @@
+"""Chunked ingestion for recordings larger than memory.
+
+Instead of loading a whole export and filtering afterwards, the file is read
+in blocks of ``chunksize`` rows. The stimulus, eye movement type and
+participant predicates are applied to every block while streaming and only the
+surviving fixation samples are reduced to per-event partial aggregates, so
+memory stays bounded by the chunk size plus the number of fixations.
+
+Quality rules that need a whole recording (tracking ratio, fixation validity)
+are counted block by block and applied to the finished event table.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable, Iterator
+
+import pandas as pd
+
+from . import columns as col
+from .events import combine_partials, empty_fixations, finalize_fixations, partial_fixations
+from .filters import fixation_mask
+from .loader import ENCODING, concat_recordings
+from .profiling import stage
+from .quality import QUALITY_COLUMNS, QualityRules, QualityTally
+from .schema import PLOT_COLUMNS, dtypes_for
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def iter_fixation_samples(
+    path: str | os.PathLike,
+    stimulus: str | Iterable[str] | None = col.DEFAULT_STIMULUS,
+    participants: Iterable[str] | None = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    tally: QualityTally | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Yield the fixation samples of ``path`` block by block.
+
+    With a ``tally``, the validation accuracy rule is applied per block and
+    the counts for its other rules are added to the tally.
+    """
+    participants = None if participants is None else list(participants)
+    columns = PLOT_COLUMNS if tally is None else PLOT_COLUMNS + QUALITY_COLUMNS
+    # Only the accuracy rule can be decided row by row
+    quality = None if tally is None else QualityRules(max_accuracy=tally.rules.max_accuracy)
+    reader = pd.read_csv(
+        path,
+        sep="\t",
+        usecols=columns,
+        dtype=dtypes_for(columns),
+        encoding=ENCODING,
+        chunksize=chunksize,
+    )
+    with reader:
+        for chunk in reader:
+            mask = fixation_mask(chunk, stimulus, participants, quality)
+            if tally is not None:
+                tally.update(chunk, mask)
+            fix = chunk.loc[mask]
+            if not fix.empty:
+                yield fix
+
+
+def stream_fixations(
+    paths: Iterable[str | os.PathLike],
+    stimulus: str | Iterable[str] | None = col.DEFAULT_STIMULUS,
+    participants: Iterable[str] | None = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    quality: QualityRules | None = None,
+) -> pd.DataFrame:
+    """Fixation table (one row per event) of ``paths`` read in chunks.
+
+    Equivalent to ``aggregate_fixations(select_fixations(load_recordings(paths)))``
+    but never holds more than one chunk of raw samples in memory.
+    """
+    participants = None if participants is None else list(participants)
+    if stimulus is not None and not isinstance(stimulus, str):
+        stimulus = list(stimulus)
+    tally = QualityTally(quality) if quality else None
+    with stage("stream") as st:
+        partials = [
+            partial_fixations(samples)
+            for path in paths
+            for samples in iter_fixation_samples(path, stimulus, participants, chunksize, tally)
+        ]
+        if partials:
+            events = finalize_fixations(combine_partials(concat_recordings(partials)))
+        else:
+            events = empty_fixations()
+        if tally is not None:
+            events = tally.apply(events)
+        st.rows = len(events)
+    return events
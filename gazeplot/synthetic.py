@@ -0,0 +1,402 @@
+"""Synthetic recordings in the Tobii Pro Lab export format.
+
+The generated TSVs have all 96 export columns and mimic the structure of the
+real exports in ``data/``: a calibration block before the stimulus, 60 Hz eye
+tracker samples interleaved with mouse rows, one row per recording event and
+every gaze event (fixation, saccade, unclassified, eyes not found) repeated on
+each of its samples. Fixation and saccade durations are log-normal around
+the medians of the demo recordings, fixations cluster around a few hotspots
+of the stimulus.
+
+Rows are generated and written in blocks, so recordings of 10⁸ rows need no
+more memory than one block. With the optional ``pyarrow`` package the blocks
+are written by Arrow's CSV writer, which is about ten times faster than
+``DataFrame.to_csv`` on the wide export rows.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import columns as col
+from .loader import ENCODING
+from .schema import EXPORT_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pa_csv = None
+
+DEFAULT_BLOCK = 100_000
+
+CALIBRATION = "Eyetracker Calibration"
+SACCADE = "Saccade"
+UNCLASSIFIED = "Unclassified"
+EYES_NOT_FOUND = "EyesNotFound"
+
+# Event codes used while generating; order matches MOVEMENT_TYPES
+MOVEMENT_TYPES = np.array([col.FIXATION, SACCADE, UNCLASSIFIED, EYES_NOT_FOUND], dtype=object)
+_FIX, _SAC, _UNC, _ENF = range(4)
+
+# Log-normal duration model in ms: (median, sigma, minimum, maximum)
+DURATIONS = {
+    _FIX: (220.0, 0.55, 80.0, 1500.0),
+    _SAC: (33.0, 0.30, 17.0, 100.0),
+    _UNC: (50.0, 0.40, 17.0, 200.0),
+    _ENF: (180.0, 0.60, 50.0, 1200.0),
+}
+
+# Share of the gaps between two fixations that are not a plain saccade
+GAP_PROBABILITIES = {_UNC: 0.10, _ENF: 0.06}
+
+# Columns that only hold a value on eye tracker rows
+_GAZE_COLUMNS = EXPORT_COLUMNS[
+    EXPORT_COLUMNS.index("Eyetracker timestamp") : EXPORT_COLUMNS.index(col.STIMULUS)
+]
+_GAZE_COLUMNS = [name for name in _GAZE_COLUMNS if not name.startswith("Event")]
+
+# Calibration and validation quality, as in the demo exports
+_QUALITY_COLUMNS = EXPORT_COLUMNS[
+    EXPORT_COLUMNS.index("Average calibration accuracy (mm)") : EXPORT_COLUMNS.index("Eyetracker timestamp")
+]
+_QUALITY = [2.7, 4.8, 5.1, 0.14, 0.38, 0.38, 10, 17, 19, 9.9, 1.4, 1.1, 0.93, 0.13, 0.11, 36, 5, 4]
+
+
+@dataclass(frozen=True)
+class SyntheticSpec:
+    """What a synthetic recording looks like."""
+
+    participant: str = "Participant1"
+    recording: str = "Recording1"
+    stimulus: str = col.DEFAULT_STIMULUS
+    media_size: tuple[int, int] = (404, 488)
+    media_position: tuple[int, int] = (758, 296)
+    screen_size: tuple[int, int] = (1920, 1080)
+    sample_rate: float = 60.0
+    calibration_fraction: float = 0.75
+    mouse_fraction: float = 0.04
+    hotspots: int = 6
+    project: str = "Synthetic"
+
+    @property
+    def media_name(self) -> str:
+        return f"{self.stimulus}.PNG"
+
+
+def _durations(kind: int, n: int, rng: np.random.Generator) -> np.ndarray:
+    median, sigma, low, high = DURATIONS[kind]
+    return np.clip(rng.lognormal(np.log(median), sigma, n), low, high)
+
+
+def _int_column(values: np.ndarray, valid: np.ndarray) -> pd.arrays.IntegerArray:
+    """Integer column written without a decimal point, empty where not ``valid``."""
+    return pd.arrays.IntegerArray(np.rint(np.nan_to_num(values)).astype(np.int64), ~valid)
+
+
+class _Generator:
+    """Stateful block generator; timestamps and event indices continue across blocks."""
+
+    def __init__(self, spec: SyntheticSpec, seed: int | None):
+        self.spec = spec
+        self.rng = np.random.default_rng(seed)
+        self.sample = 0  # eye tracker samples emitted so far
+        self.counters = np.zeros(len(MOVEMENT_TYPES), dtype=np.int64)
+        self.position = np.array(spec.screen_size, dtype=float) / 2
+        hotspots = self.rng.uniform(0.1, 0.9, (max(spec.hotspots, 1), 2))
+        self.hotspots = hotspots * spec.media_size + spec.media_position
+        self.computer_start = int(self.rng.integers(10**9, 4 * 10**9))
+        self.tracker_start = float(self.rng.integers(10**8, 10**9))
+
+    def events(self, n_fixations: int, on_stimulus: bool) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Alternating gap/fixation events: kinds, durations in samples and targets."""
+        rng = self.rng
+        draw = rng.random(n_fixations)
+        gaps = np.full(n_fixations, _SAC)
+        gaps[draw < GAP_PROBABILITIES[_UNC] + GAP_PROBABILITIES[_ENF]] = _UNC
+        gaps[draw < GAP_PROBABILITIES[_ENF]] = _ENF
+        kinds = np.empty(2 * n_fixations, dtype=np.int64)
+        kinds[0::2] = gaps
+        kinds[1::2] = _FIX
+
+        ms = np.empty(len(kinds))
+        for kind in DURATIONS:
+            mask = kinds == kind
+            ms[mask] = _durations(kind, int(mask.sum()), rng)
+        samples = np.maximum(np.rint(ms * self.spec.sample_rate / 1000), 1).astype(np.int64)
+
+        if on_stimulus:
+            centers = self.hotspots[rng.integers(len(self.hotspots), size=n_fixations)]
+            spread = 0.05 * np.asarray(self.spec.media_size, dtype=float)
+        else:
+            # Calibration: fixations on a 3 x 3 grid of screen targets
+            grid = (rng.integers(1, 4, (n_fixations, 2)) / 4) * self.spec.screen_size
+            centers, spread = grid, np.array([15.0, 15.0])
+        targets = centers + rng.normal(0, 1, (n_fixations, 2)) * spread
+        return kinds, samples, targets
+
+    def block(self, n_rows: int, on_stimulus: bool) -> pd.DataFrame:
+        """About ``n_rows`` rows (eye tracker and mouse) of one phase."""
+        spec, rng = self.spec, self.rng
+        mean_samples = np.mean([DURATIONS[_FIX][0], DURATIONS[_SAC][0]]) * 2 * spec.sample_rate / 1000
+        n_fixations = max(int(n_rows / (1 + spec.mouse_fraction) / mean_samples * 1.2) + 1, 1)
+        kinds, lengths, targets = self.events(n_fixations, on_stimulus)
+
+        # Per-event start/end positions: gaps move from the previous to the next fixation
+        fix_pos = targets
+        prev_pos = np.vstack([self.position, fix_pos[:-1]])
+        self.position = fix_pos[-1]
+
+        n_events = len(kinds)
+        event_index = np.empty(n_events, dtype=np.int64)
+        for kind in range(len(MOVEMENT_TYPES)):
+            mask = kinds == kind
+            event_index[mask] = self.counters[kind] + np.arange(1, mask.sum() + 1)
+            self.counters[kind] += mask.sum()
+
+        row_event = np.repeat(np.arange(n_events), lengths)
+        starts = np.cumsum(lengths) - lengths
+        offset = np.arange(len(row_event)) - starts[row_event]
+        frac = (offset + 0.5) / lengths[row_event]
+
+        pair = row_event // 2
+        is_fix = kinds[row_event] == _FIX
+        start = np.where(is_fix[:, None], fix_pos[pair], prev_pos[pair])
+        end = fix_pos[pair]
+        gaze = start + (end - start) * frac[:, None]
+        gaze[is_fix] += rng.normal(0, 6.0, (int(is_fix.sum()), 2))
+        lost = kinds[row_event] == _ENF
+        gaze[lost] = np.nan
+
+        n = len(row_event)
+        sample = self.sample + np.arange(n)
+        self.sample += n
+        frame = self._frame(
+            sample, kinds[row_event], event_index[row_event], lengths[row_event],
+            fix_pos[pair], gaze, on_stimulus,
+        )
+        return self._add_mouse_rows(frame)
+
+    def _frame(self, sample, kinds, index, lengths, fixation, gaze, on_stimulus) -> pd.DataFrame:
+        spec, rng = self.spec, self.rng
+        n = len(sample)
+        period_ms = 1000 / spec.sample_rate
+        timestamp = np.rint(sample * period_ms).astype(np.int64)
+        valid = ~np.isnan(gaze[:, 0])
+        media = np.asarray(spec.media_position, dtype=float)
+        size = np.asarray(spec.media_size, dtype=float)
+        screen = np.asarray(spec.screen_size, dtype=float)
+        eye_offset = rng.normal(0, 1, (n, 2)) * 25
+        left, right = gaze - eye_offset, gaze + eye_offset
+        is_fix = kinds == _FIX
+
+        data = {
+            col.RECORDING_TIMESTAMP: timestamp,
+            "Computer timestamp": self.computer_start + timestamp,
+            "Sensor": np.full(n, "Eye Tracker", dtype=object),
+            "Eyetracker timestamp": _int_column(
+                self.tracker_start + sample * period_ms * 1000, np.ones(n, bool)
+            ),
+            "Gaze point X": _int_column(gaze[:, 0], valid),
+            "Gaze point Y": _int_column(gaze[:, 1], valid),
+            "Gaze point left X": _int_column(left[:, 0], valid),
+            "Gaze point left Y": _int_column(left[:, 1], valid),
+            "Gaze point right X": _int_column(right[:, 0], valid),
+            "Gaze point right Y": _int_column(right[:, 1], valid),
+            "Pupil diameter left": np.where(valid, np.round(rng.normal(4.5, 0.15, n), 2), np.nan),
+            "Pupil diameter right": np.where(valid, np.round(rng.normal(4.4, 0.15, n), 2), np.nan),
+            "Validity left": np.where(valid, "Valid", "Invalid").astype(object),
+            "Validity right": np.where(valid, "Valid", "Invalid").astype(object),
+        }
+        # Direction, eye position and DACSmm gaze follow the gaze point loosely
+        for i, eye in enumerate(("left", "right")):
+            point = (left, right)[i]
+            rel = (point - screen / 2) / screen
+            data[f"Gaze direction {eye} X"] = np.round(rel[:, 0] * 0.3, 5)
+            data[f"Gaze direction {eye} Y"] = np.round(rel[:, 1] * 0.3, 5)
+            data[f"Gaze direction {eye} Z"] = np.where(valid, -0.995, np.nan)
+            data[f"Eye position {eye} X (DACSmm)"] = np.where(valid, 243.0 + 60 * i, np.nan)
+            data[f"Eye position {eye} Y (DACSmm)"] = np.where(valid, 65.0, np.nan)
+            data[f"Eye position {eye} Z (DACSmm)"] = np.where(valid, 600.0, np.nan)
+            data[f"Gaze point {eye} X (DACSmm)"] = np.round(point[:, 0] * 0.28, 1)
+            data[f"Gaze point {eye} Y (DACSmm)"] = np.round(point[:, 1] * 0.28, 1)
+
+        data[col.EYE_MOVEMENT_TYPE] = MOVEMENT_TYPES[kinds]
+        data[col.GAZE_EVENT_DURATION] = np.rint(lengths * period_ms).astype(np.int64)
+        data[col.EYE_MOVEMENT_INDEX] = index
+        data["Fixation point X"] = _int_column(fixation[:, 0], is_fix)
+        data["Fixation point Y"] = _int_column(fixation[:, 1], is_fix)
+
+        if on_stimulus:
+            norm = np.round((gaze - media) / size, 4)
+            data["Gaze point X (MCSnorm)"] = norm[:, 0]
+            data["Gaze point Y (MCSnorm)"] = norm[:, 1]
+            for eye, point in (("left", left), ("right", right)):
+                norm = np.round((point - media) / size, 4)
+                data[f"Gaze point {eye} X (MCSnorm)"] = norm[:, 0]
+                data[f"Gaze point {eye} Y (MCSnorm)"] = norm[:, 1]
+            fix_norm = np.round((fixation - media) / size, 4)
+            data[col.FIXATION_X] = np.where(is_fix, fix_norm[:, 0], np.nan)
+            data[col.FIXATION_Y] = np.where(is_fix, fix_norm[:, 1], np.nan)
+            data[col.STIMULUS] = spec.stimulus
+            data["Presented Media name"] = spec.media_name
+            data["Presented Media width"] = size[0].astype(np.int64)
+            data["Presented Media height"] = size[1].astype(np.int64)
+            data["Presented Media position X (DACSpx)"] = media[0].astype(np.int64)
+            data["Presented Media position Y (DACSpx)"] = media[1].astype(np.int64)
+            data["Original Media width"] = size[0].astype(np.int64)
+            data["Original Media height"] = size[1].astype(np.int64)
+        else:
+            data[col.STIMULUS] = CALIBRATION
+        return pd.DataFrame(data, index=pd.RangeIndex(n))
+
+    def _add_mouse_rows(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Interleave mouse rows: copies of random samples without gaze data."""
+        n_mouse = int(self.rng.binomial(len(frame), self.spec.mouse_fraction))
+        if n_mouse == 0:
+            return frame
+        rows = np.sort(self.rng.choice(len(frame), n_mouse, replace=False))
+        mouse = frame.iloc[rows].copy()
+        shift = np.minimum(mouse[col.RECORDING_TIMESTAMP].to_numpy(), 7)
+        mouse[col.RECORDING_TIMESTAMP] -= shift
+        mouse["Computer timestamp"] -= shift
+        mouse["Sensor"] = "Mouse"
+        mouse = mouse.drop(columns=mouse.columns.intersection(_GAZE_COLUMNS))
+        mouse["Mouse position X"] = _int_column(
+            self.rng.uniform(0, self.spec.screen_size[0], n_mouse), np.ones(n_mouse, bool)
+        )
+        mouse["Mouse position Y"] = _int_column(
+            self.rng.uniform(0, self.spec.screen_size[1], n_mouse), np.ones(n_mouse, bool)
+        )
+        # Mouse rows come just before the eye tracker sample they were copied from
+        order = np.concatenate([rows - 0.5, np.arange(len(frame), dtype=float)])
+        merged = pd.concat([mouse, frame], ignore_index=True)
+        return merged.iloc[np.argsort(order, kind="stable")].reset_index(drop=True)
+
+    def marker(self, event: str, value: str | None = None) -> pd.DataFrame:
+        """Single row of a recording event (no sensor data)."""
+        timestamp = int(round(self.sample * 1000 / self.spec.sample_rate))
+        return pd.DataFrame({
+            col.RECORDING_TIMESTAMP: [timestamp],
+            "Computer timestamp": [self.computer_start + timestamp],
+            "Event": [event],
+            "Event value": [value],
+        })
+
+
+def _metadata(spec: SyntheticSpec, duration_ms: int) -> dict[str, object]:
+    """Columns with one value per recording."""
+    meta: dict[str, object] = {
+        "Project name": spec.project,
+        "Export date": "01.01.2026",
+        col.PARTICIPANT: spec.participant,
+        col.RECORDING: spec.recording,
+        "Recording date": "01.01.2026",
+        "Recording date UTC": "01.01.2026",
+        "Recording start time": "10:00:00.000",
+        "Recording start time UTC": "09:00:00.000",
+        "Recording duration": duration_ms,
+        "Timeline name": "Timeline1",
+        "Recording Fixation filter name": "Tobii I-VT (Fixation)",
+        "Recording software version": "1.130.24185",
+        "Recording resolution height": spec.screen_size[1],
+        "Recording resolution width": spec.screen_size[0],
+        "Recording monitor latency": "10.00",
+    }
+    meta.update(zip(_QUALITY_COLUMNS, _QUALITY))
+    return meta
+
+
+def generate_recording(
+    rows: int,
+    spec: SyntheticSpec = SyntheticSpec(),
+    *,
+    seed: int | None = 0,
+    block: int = DEFAULT_BLOCK,
+) -> Iterator[pd.DataFrame]:
+    """Blocks of a synthetic export with ``rows`` rows in total.
+
+    Every block has the 96 export columns in file order. The first
+    ``spec.calibration_fraction`` of the rows belong to the calibration.
+    """
+    gen = _Generator(spec, seed)
+    meta = _metadata(spec, int(rows * 1000 / (spec.sample_rate * (1 + spec.mouse_fraction))))
+    n_calibration = int(rows * spec.calibration_fraction)
+    phases = [
+        (n_calibration, False, [("RecordingStart", None), ("Eye tracker Calibration start", None)], []),
+        (rows - n_calibration, True,
+         [("Eye tracker Calibration end", None), ("ImageStimulusStart", spec.stimulus)],
+         [("ImageStimulusEnd", spec.stimulus), ("RecordingEnd", None)]),
+    ]
+
+    def finish(frame: pd.DataFrame) -> pd.DataFrame:
+        return frame.assign(**meta).reindex(columns=EXPORT_COLUMNS)
+
+    for budget, on_stimulus, head, tail in phases:
+        head = head[:budget]
+        budget -= len(head)
+        tail = tail[: max(budget, 0)]
+        budget -= len(tail)
+        for event, value in head:
+            yield finish(gen.marker(event, value))
+        while budget > 0:
+            frame = gen.block(min(block, budget), on_stimulus).iloc[:budget]
+            budget -= len(frame)
+            yield finish(frame)
+        for event, value in tail:
+            yield finish(gen.marker(event, value))
+
+
+def write_recording(
+    path: str | os.PathLike,
+    rows: int,
+    spec: SyntheticSpec = SyntheticSpec(),
+    *,
+    seed: int | None = 0,
+    block: int = DEFAULT_BLOCK,
+) -> Path:
+    """Write a synthetic export of ``rows`` rows to ``path``."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    blocks = generate_recording(rows, spec, seed=seed, block=block)
+    if pa_csv is None:
+        with open(path, "w", encoding=ENCODING, newline="") as handle:
+            header = True
+            for frame in blocks:
+                frame.to_csv(handle, sep="\t", index=False, header=header, lineterminator="\n")
+                header = False
+        return path
+
+    options = pa_csv.WriteOptions(include_header=False, delimiter="\t", quoting_style="none")
+    with open(path, "wb") as handle:
+        handle.write(("\t".join(EXPORT_COLUMNS) + "\n").encode(ENCODING))
+        for frame in blocks:
+            pa_csv.write_csv(pa.Table.from_pandas(frame, preserve_index=False), handle, options)
+    return path
+
+
+def write_dataset(
+    directory: str | os.PathLike,
+    rows: int,
+    recordings: int = 5,
+    *,
+    seed: int = 0,
+    stimulus: str = col.DEFAULT_STIMULUS,
+    block: int = DEFAULT_BLOCK,
+) -> list[Path]:
+    """``recordings`` exports of ``rows`` rows each, one participant per recording."""
+    directory = Path(directory)
+    paths = []
+    for i in range(1, recordings + 1):
+        spec = SyntheticSpec(
+            participant=f"Participant{i}", recording=f"Recording{i}", stimulus=stimulus
+        )
+        target = directory / f"Synthetic Recording{i}.tsv"
+        paths.append(write_recording(target, rows, spec, seed=seed + i, block=block))
+    return paths
@@ -0,0 +1,17 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+DATA_DIR = ROOT / "data"
+
+
+@pytest.fixture(scope="session")
+def recordings() -> list[Path]:
+    """The small Tobii exports shipped in ``data/``."""
+    paths = sorted(DATA_DIR.glob("Literacy-Demo Recording*.tsv"))
+    assert paths, "data/ holds no recordings"
+    return paths
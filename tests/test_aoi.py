@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from matplotlib.path import Path as MplPath
+
+from gazeplot import columns as col
+from gazeplot.aoi import AreaOfInterest, hit_matrix
+
+POLYGONS = {
+    "triangle": [(0.1, 0.1), (0.9, 0.2), (0.4, 0.8)],
+    "concave": [(0.1, 0.1), (0.9, 0.1), (0.9, 0.9), (0.5, 0.3), (0.1, 0.9)],
+    "star": [
+        (0.5 + r * np.cos(a), 0.5 + r * np.sin(a))
+        for a, r in zip(np.linspace(0, 2 * np.pi, 10, endpoint=False), [0.45, 0.15] * 5)
+    ],
+}
+
+
+def random_points(n, seed=5):
+    rng = np.random.default_rng(seed)
+    return rng.random(n), rng.random(n)
+
+
+@pytest.mark.parametrize("name", POLYGONS)
+def test_polygon_contains_matches_matplotlib(name):
+    x, y = random_points(20_000)
+    aoi = AreaOfInterest.polygon(name, POLYGONS[name])
+    expected = MplPath(POLYGONS[name]).contains_points(np.column_stack([x, y]))
+    np.testing.assert_array_equal(aoi.contains(x, y), expected)
+
+
+def test_rect_contains_is_inclusive():
+    aoi = AreaOfInterest.rect("box", 0.2, 0.2, 0.6, 0.4)
+    x = np.array([0.2, 0.6, 0.4, 0.19, 0.4])
+    y = np.array([0.2, 0.4, 0.3, 0.3, 0.41])
+    np.testing.assert_array_equal(aoi.contains(x, y), [True, True, True, False, False])
+
+
+def test_polygon_needs_three_points():
+    with pytest.raises(ValueError):
+        AreaOfInterest.polygon("line", [(0, 0), (1, 1)])
+
+
+def test_hit_matrix_matches_direct_test():
+    x, y = random_points(5_000, seed=6)
+    x[::97] = np.nan
+    fix = pd.DataFrame({col.FIXATION_X: x, col.FIXATION_Y: y})
+    aois = [AreaOfInterest.polygon(name, points) for name, points in POLYGONS.items()]
+    aois += [AreaOfInterest.rect("left", 0.0, 0.0, 0.3, 1.0), AreaOfInterest.rect("tiny", 0.5, 0.5, 0.501, 0.501)]
+    hits = hit_matrix(fix, aois, cells=16)
+    for j, aoi in enumerate(aois):
+        with np.errstate(invalid="ignore"):
+            np.testing.assert_array_equal(hits[:, j], aoi.contains(x, y), err_msg=aoi.name)
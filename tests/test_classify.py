@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from gazeplot import columns as col
+from gazeplot.classify import (
+    DetectionParams,
+    angular_velocity,
+    classify_recordings,
+    detect_fixations,
+    dispersion_mask,
+    visual_angle,
+)
+from gazeplot.events import empty_fixations
+from gazeplot.pipeline import load_fixations
+
+PERIOD = 1000 / 60
+
+
+def gaze_stream(seed=7):
+    """60 Hz samples of three 400 ms fixations joined by 50 ms saccades."""
+    rng = np.random.default_rng(seed)
+    targets = np.array([[200.0, 200.0], [900.0, 300.0], [500.0, 800.0]])
+    parts = []
+    for i, target in enumerate(targets):
+        parts.append(target + rng.normal(0, 1.0, (24, 2)))
+        if i + 1 < len(targets):
+            parts.append(np.linspace(target, targets[i + 1], 5)[1:-1])
+    xy = np.concatenate(parts)
+    return np.arange(len(xy)) * PERIOD, xy
+
+
+@pytest.mark.parametrize("method", ["ivt", "idt"])
+def test_detect_three_fixations(method):
+    t, xy = gaze_stream()
+    starts, stops = detect_fixations(t, xy, params=DetectionParams(method=method))
+    assert len(starts) == 3
+    # Every fixation covers most of its 24 samples and nothing of the next one
+    assert np.all(stops - starts >= 20)
+    assert np.all(stops[:-1] <= starts[1:])
+    assert np.all(starts[1:] >= [24, 51])
+
+
+def test_short_gaps_are_filled():
+    t, xy = gaze_stream()
+    xy[5:8] = np.nan  # 50 ms of missing samples inside the first fixation
+    starts, stops = detect_fixations(t, xy, params=DetectionParams(method="ivt"))
+    assert len(starts) == 3
+    assert starts[0] < 5 and stops[0] > 8
+
+
+def test_angular_velocity_matches_loop():
+    t, xy = gaze_stream()
+    params = DetectionParams(window=50)
+    velocity = angular_velocity(t, xy, 600.0, params)
+    span = round(params.window / PERIOD)
+    before, after = span // 2, span - span // 2
+    for i in range(len(t)):
+        if i < before or i + after >= len(t):
+            assert np.isnan(velocity[i])
+            continue
+        step = np.hypot(*(xy[i + after] - xy[i - before]))
+        dt = (t[i + after] - t[i - before]) / 1000
+        assert velocity[i] == pytest.approx(visual_angle(step, 600.0, params.pixel_size) / dt)
+
+
+def test_dispersion_mask_matches_loop():
+    t, xy = gaze_stream()
+    params = DetectionParams(method="idt", dispersion=0.5)
+    mask = dispersion_mask(t, xy, 600.0, params)
+    width = round(params.min_duration / PERIOD) + 1
+    expected = np.zeros(len(t), dtype=bool)
+    for start in range(len(t) - width + 1):
+        window = xy[start : start + width]
+        spread = np.ptp(window[:, 0]) + np.ptp(window[:, 1])
+        if visual_angle(spread, 600.0, params.pixel_size) <= params.dispersion:
+            expected[start : start + width] = True
+    np.testing.assert_array_equal(mask, expected)
+
+
+def test_classify_recordings_without_match(recordings, tmp_path):
+    fix = classify_recordings(recordings, participants=["Nobody"], store_dir=tmp_path)
+    expected = empty_fixations()
+    assert fix.empty
+    assert list(fix.columns) == list(expected.columns)
+    assert list(map(str, fix.dtypes)) == list(map(str, expected.dtypes))
+
+
+def test_classify_recordings_on_exports(recordings, tmp_path):
+    fix = classify_recordings(recordings, DetectionParams(method="ivt"), store_dir=tmp_path)
+    tobii = load_fixations(recordings)
+    # Same filter settings as the export, so about as many fixations as Tobii found
+    assert abs(len(fix) - len(tobii)) <= 0.1 * len(tobii)
+    assert (fix[col.GAZE_EVENT_DURATION] >= 60).all()
+    assert fix[col.FIXATION_X].dropna().between(0, 1).all()
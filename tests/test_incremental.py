@@ -0,0 +1,99 @@
+import dataclasses
+import json
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from gazeplot.batch import BatchOptions, discover_recordings
+from gazeplot.incremental import MANIFEST_NAME, build, summary_name
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Two of the sample exports in a scratch directory."""
+    target = tmp_path / "data"
+    target.mkdir()
+    for name in ("Literacy-Demo Recording1.tsv", "Literacy-Demo Recording2.tsv"):
+        shutil.copy(DATA_DIR / name, target / name)
+    return target
+
+
+@pytest.fixture
+def options(tmp_path):
+    return BatchOptions(output_dir=tmp_path / "out", cache_dir=tmp_path / "cache", use_cache=False)
+
+
+def figures(output_dir):
+    return sorted(path.name for path in output_dir.iterdir() if not path.name.startswith("."))
+
+
+def test_second_build_is_a_no_op(data_dir, options):
+    first = build(discover_recordings(data_dir), options)
+    assert not first.failed
+    names = figures(options.output_dir)
+    assert summary_name(options.mode) in names
+    assert sorted(path.name for path in first.rebuilt) == names
+
+    second = build(discover_recordings(data_dir), options)
+    assert second.rebuilt == []
+    assert second.up_to_date == len(names)
+
+
+def test_touched_file_is_not_rebuilt(data_dir, options):
+    build(discover_recordings(data_dir), options)
+    path = data_dir / "Literacy-Demo Recording1.tsv"
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert build(discover_recordings(data_dir), options).rebuilt == []
+
+
+def test_changed_recording_rebuilds_its_figure_and_the_summary(data_dir, options):
+    build(discover_recordings(data_dir), options)
+    path = data_dir / "Literacy-Demo Recording1.tsv"
+    lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+    path.write_text("".join(lines[:-1]), encoding="utf-8")
+
+    report = build(discover_recordings(data_dir), options)
+    assert sorted(target.name for target in report.rebuilt) == [
+        "fixations_participant1_recording1.png",
+        summary_name(options.mode),
+    ]
+
+
+def test_removed_recording_deletes_its_figure(data_dir, options):
+    build(discover_recordings(data_dir), options)
+    assert "fixations_participant2_recording2.png" in figures(options.output_dir)
+    (data_dir / "Literacy-Demo Recording2.tsv").unlink()
+
+    report = build(discover_recordings(data_dir), options)
+    assert [target.name for target in report.rebuilt] == [summary_name(options.mode)]
+    assert "fixations_participant2_recording2.png" not in figures(options.output_dir)
+    manifest = json.loads((options.output_dir / MANIFEST_NAME).read_text())
+    assert "fixations_participant2_recording2.png" not in manifest["figures"]
+
+
+def test_builds_without_fixations_are_remembered(data_dir, options):
+    options = dataclasses.replace(options, stimulus="Nope")
+    assert build(discover_recordings(data_dir), options).rebuilt == []
+    manifest = json.loads((options.output_dir / MANIFEST_NAME).read_text())
+    assert len(manifest["empty"]) == 3  # both recordings and the summary
+    assert figures(options.output_dir) == []
+
+    second = build(discover_recordings(data_dir), options)
+    assert second.rebuilt == [] and not second.failed
+
+
+def test_outdated_manifest_figures_are_replaced(data_dir, options):
+    options.output_dir.mkdir()
+    stale = options.output_dir / "fixations_participant1.png"
+    stale.write_bytes(b"")
+    (options.output_dir / MANIFEST_NAME).write_text(
+        json.dumps({"version": 1, "figures": {stale.name: {}}})
+    )
+    build(discover_recordings(data_dir), options)
+    assert not stale.exists()
+    assert "fixations_participant1_recording1.png" in figures(options.output_dir)
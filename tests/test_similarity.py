@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from gazeplot.similarity import (
+    distance_matrix,
+    edit_distances,
+    grid_substitution_costs,
+    pad_sequences,
+)
+
+
+def reference_distance(a, b, substitution=None) -> float:
+    """Textbook Wagner–Fischer edit distance."""
+    d = [[float(i + j) if i == 0 or j == 0 else 0.0 for j in range(len(b) + 1)] for i in range(len(a) + 1)]
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            if substitution is None:
+                cost = float(a[i - 1] != b[j - 1])
+            else:
+                cost = float(substitution[a[i - 1], b[j - 1]])
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + cost)
+    return d[len(a)][len(b)]
+
+
+def random_sequences(rng, count, labels, longest=12):
+    return [rng.integers(0, labels, rng.integers(0, longest + 1)).astype(np.int32) for _ in range(count)]
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_edit_distances_match_reference(weighted):
+    rng = np.random.default_rng(1)
+    substitution = grid_substitution_costs(3, 3) if weighted else None
+    sequences = random_sequences(rng, 25, 9)
+    padded, lengths = pad_sequences(sequences)
+    for a in sequences[:8]:
+        got = edit_distances(a, padded, lengths, substitution)
+        expected = [reference_distance(a, b, substitution) for b in sequences]
+        np.testing.assert_allclose(got, expected)
+
+
+def test_edit_distance_edge_cases():
+    padded, lengths = pad_sequences([np.array([], np.int32), np.array([1, 2, 3], np.int32)])
+    np.testing.assert_array_equal(edit_distances(np.array([], np.int32), padded, lengths), [0, 3])
+    np.testing.assert_array_equal(edit_distances(np.array([1, 2, 3], np.int32), padded, lengths), [3, 0])
+
+
+def test_distance_matrix_is_normalized_and_symmetric():
+    rng = np.random.default_rng(2)
+    sequences = random_sequences(rng, 40, 5)
+    matrix = distance_matrix(sequences, workers=1, block=7)
+    raw = distance_matrix(sequences, normalize=False, workers=1, block=7)
+    np.testing.assert_array_equal(matrix, matrix.T)
+    np.testing.assert_array_equal(np.diag(matrix), 0)
+    for i in range(len(sequences)):
+        for j in range(i + 1, len(sequences)):
+            expected = reference_distance(sequences[i], sequences[j])
+            assert raw[i, j] == expected
+            longest = max(len(sequences[i]), len(sequences[j]))
+            assert matrix[i, j] == pytest.approx(expected / longest if longest else 0.0)
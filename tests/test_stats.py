@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from gazeplot import columns as col
+from gazeplot.stats import DISPERSION, FIXATION_COUNT, HULL_AREA, cohort_statistics, hull_areas
+
+
+def reference_hull_area(points) -> float:
+    """Area of the convex hull by brute force: keep the edges with all points on one side."""
+    points = sorted(set(points))
+    edges = []
+    for i, p in enumerate(points):
+        for q in points[i + 1:]:
+            sides = {
+                np.sign((q[0] - p[0]) * (r[1] - p[1]) - (q[1] - p[1]) * (r[0] - p[0]))
+                for r in points
+            } - {0}
+            if len(sides) <= 1:
+                edges.append((p, q))
+    if len(points) < 3 or not edges:
+        return 0.0
+    # Hull vertices ordered by angle around their centroid, then the shoelace formula
+    vertices = np.array(sorted({v for edge in edges for v in edge}))
+    center = vertices.mean(axis=0)
+    vertices = vertices[np.argsort(np.arctan2(*(vertices - center).T[::-1]))]
+    x, y = vertices.T
+    return abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2
+
+
+def test_hull_areas_match_brute_force():
+    rng = np.random.default_rng(3)
+    groups = 30
+    sizes = rng.integers(0, 25, groups)
+    group = np.repeat(np.arange(groups), sizes)
+    # Coarse coordinates so that duplicates and collinear points occur
+    x = rng.integers(0, 8, len(group)) / 8
+    y = rng.integers(0, 8, len(group)) / 8
+    areas = hull_areas(group, x, y, groups)
+    for g in range(groups):
+        points = list(zip(x[group == g], y[group == g]))
+        assert areas[g] == pytest.approx(reference_hull_area(points), abs=1e-12)
+
+
+@pytest.mark.parametrize("n", [3, 50, 2000])
+def test_hull_area_of_points_in_convex_position(n):
+    # Every point is a hull vertex: the worst case for chain pruning
+    angle = np.sort(np.random.default_rng(4).random(n)) * 2 * np.pi
+    x, y = 0.5 + 0.5 * np.cos(angle), 0.5 + 0.5 * np.sin(angle)
+    area = hull_areas(np.zeros(n, dtype=np.intp), x, y, 1)[0]
+    # Shoelace over the points in angular order
+    expected = abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2
+    assert area == pytest.approx(expected)
+
+
+def test_hull_area_of_degenerate_groups():
+    group = np.array([0, 0, 1, 1, 1, 2, 2, 2])
+    x = np.array([0.1, 0.2, 0.0, 0.5, 1.0, 0.3, 0.3, np.nan])
+    y = np.array([0.1, 0.2, 0.0, 0.5, 1.0, 0.3, 0.3, 0.9])
+    np.testing.assert_array_equal(hull_areas(group, x, y, 4), [0, 0, 0, 0])
+
+
+def test_cohort_statistics_on_exports(recordings):
+    from gazeplot.pipeline import load_fixations
+
+    fix = load_fixations(recordings)
+    table = cohort_statistics(fix)
+    assert table[FIXATION_COUNT].sum() == len(fix)
+    for _, row in table.iterrows():
+        sub = fix[fix[col.PARTICIPANT] == row[col.PARTICIPANT]]
+        x, y = sub[col.FIXATION_X], sub[col.FIXATION_Y]
+        assert row[DISPERSION] == pytest.approx(np.sqrt(x.var(ddof=0) + y.var(ddof=0)))
+        assert 0 < row[HULL_AREA] <= 1
+
+
+def test_cohort_statistics_by_group():
+    fix = pd.DataFrame({
+        col.PARTICIPANT: pd.Categorical(["a", "a", "a", "b", "b", "b"]),
+        col.RECORDING: pd.Categorical(["r1", "r1", "r1", "r2", "r2", "r2"]),
+        col.FIXATION_X: [0.0, 1.0, 0.0, 0.0, 0.5, 0.0],
+        col.FIXATION_Y: [0.0, 0.0, 1.0, 0.0, 0.0, 0.5],
+        col.GAZE_EVENT_DURATION: np.float32([100, 200, 300, 100, 100, 100]),
+    })
+    table = cohort_statistics(fix).set_index(col.PARTICIPANT)
+    assert table.loc["a", HULL_AREA] == pytest.approx(0.5)
+    assert table.loc["b", HULL_AREA] == pytest.approx(0.125)
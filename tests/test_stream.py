@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+from gazeplot import columns as col
+from gazeplot.events import empty_fixations
+from gazeplot.pipeline import load_fixations
+from gazeplot.quality import QualityRules
+from gazeplot.stream import stream_fixations
+
+
+def canonical(fix: pd.DataFrame) -> pd.DataFrame:
+    """``fix`` in a fixed row order with categories compared by value."""
+    fix = fix.astype({name: str for name in fix.select_dtypes("category").columns})
+    keys = [col.PARTICIPANT, col.RECORDING, col.STIMULUS, col.EYE_MOVEMENT_INDEX]
+    return fix.sort_values(keys, ignore_index=True)
+
+
+@pytest.mark.parametrize("chunksize", [1000, 100_000])
+@pytest.mark.parametrize("stimulus", [col.DEFAULT_STIMULUS, None])
+def test_streamed_equals_in_memory(recordings, chunksize, stimulus):
+    whole = load_fixations(recordings, stimulus)
+    streamed = stream_fixations(recordings, stimulus, chunksize=chunksize)
+    assert len(whole) > 0
+    pd.testing.assert_frame_equal(canonical(streamed), canonical(whole))
+
+
+@pytest.mark.parametrize(
+    "rules",
+    [QualityRules(min_tracking=0.9), QualityRules(max_accuracy=0.5, min_validity=1.0)],
+)
+def test_streamed_quality_rules_equal_in_memory(recordings, rules):
+    whole = load_fixations(recordings, quality=rules)
+    streamed = stream_fixations(recordings, chunksize=1000, quality=rules)
+    pd.testing.assert_frame_equal(canonical(streamed), canonical(whole))
+
+
+def test_participant_selection(recordings):
+    streamed = stream_fixations(recordings, participants=["Participant2"], chunksize=1000)
+    whole = load_fixations(recordings, participants=["Participant2"])
+    assert set(streamed[col.PARTICIPANT]) == {"Participant2"}
+    pd.testing.assert_frame_equal(canonical(streamed), canonical(whole))
+
+
+def test_unknown_stimulus_gives_empty_table(recordings):
+    expected = empty_fixations()
+    for fix in (stream_fixations(recordings, "Nope", chunksize=1000), load_fixations(recordings, "Nope")):
+        assert fix.empty
+        assert list(fix.columns) == list(expected.columns)
+        assert list(map(str, fix.dtypes)) == list(map(str, expected.dtypes))
+
+
+def test_quality_rules_drop_recordings(recordings):
+    kept = stream_fixations(recordings, chunksize=1000, quality=QualityRules(min_tracking=0.9))
+    assert 0 < kept[col.RECORDING].nunique() < len(recordings)